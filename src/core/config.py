@@ -1,6 +1,6 @@
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional, cast
+from typing import Dict, Any, List, Optional, cast
 from pydantic import BaseModel, Field
 from loguru import logger
 
@@ -8,13 +8,43 @@ from loguru import logger
 class HostConfig(BaseModel):
     enabled: bool = True
     max_workers: int = Field(default=5, ge=1, le=20)
-    rate_limit: float = Field(default=1.0, ge=0)
+    min_workers: int = Field(default=1, ge=1, le=20)
+    adaptive_concurrency: bool = True  # AIMD between min_workers and max_workers
+    rate_limit: float = Field(default=1.0, ge=0)  # Legacy pacing: seconds per request per worker
+    requests_per_second: float = Field(default=0.0, ge=0)  # 0 = derive from rate_limit
+    bytes_per_second: float = Field(default=0.0, ge=0)  # 0 = unlimited
+    burst: int = Field(default=0, ge=0)  # 0 = max_workers
+    # Connection pooling (aiohttp-based hosts)
+    pool_size: int = Field(default=20, ge=1, le=100)
+    keepalive_timeout: float = Field(default=30.0, ge=0)
+    dns_cache_ttl: int = Field(default=300, ge=0)
+    http2: bool = False  # Multiplex uploads over HTTP/2 (httpx-based hosts; needs the optional h2 package)
+    # Pages converted ahead of upload on hosts that reject their format (e.g. WebP on Imgbox)
+    transcode_prefetch: int = Field(default=4, ge=0, le=32)
+    upload_order: str = "natural"  # "natural" or "largest_first" (big pages first, cuts stragglers)
+    max_upload_mb: float = Field(default=0.0, ge=0)  # Optimization size budget; 0 = host's known limit
+    # Retries of transient failures (network errors, 408/429/5xx)
+    max_retries: int = Field(default=2, ge=0, le=10)
+    retry_base_delay: float = Field(default=1.0, ge=0)  # Backoff base in seconds (full jitter)
+    retry_max_delay: float = Field(default=30.0, ge=0)
+    retry_budget: float = Field(default=0.2, ge=0)  # Retries allowed per chapter as a fraction of its pages
+    # Hedging: duplicate uploads slower than the host's p95 latency (to the next failover host, if any)
+    hedge_uploads: bool = False
+    hedge_budget: float = Field(default=0.1, ge=0)  # Hedged requests per chapter as a fraction of its pages
+    hedge_min_samples: int = Field(default=20, ge=1)  # Latency samples needed before hedging starts
+    # Circuit breaker: fail fast (and fail over) while a host keeps erroring or stalling
+    circuit_breaker: bool = True
+    breaker_failure_rate: float = Field(default=0.5, gt=0, le=1)  # Failed or slow share of recent calls that opens it
+    breaker_slow_call_seconds: float = Field(default=60.0, ge=0)  # 0 = latency is not considered
+    breaker_slow_call_min_throughput: float = Field(default=50_000.0, ge=0)  # Bytes/sec added to the slow threshold per page size; 0 = fixed
+    breaker_open_seconds: float = Field(default=30.0, gt=0)  # First cool-down; doubles on failed probes
     # Common fields
     userhash: Optional[str] = ""  # Catbox
     client_id: Optional[str] = ""  # Imgur
     access_token: Optional[str] = ""  # Imgur
     api_key: Optional[str] = ""  # ImgBB, ImageChest, Pixeldrain, ImgHippo, ImgPile
     session_cookie: Optional[str] = ""  # Imgbox
+    server_cache_ttl: float = Field(default=600.0, ge=0)  # Gofile upload-server cache (seconds)
     base_url: Optional[str] = ""  # ImgPile custom instances
 
 
@@ -22,10 +52,21 @@ class AppConfig(BaseModel):
     root_folder: Path = Path.home() / "Manga"
     output_folder: Path = Path.home() / "Manga_Metadata_Output"
     selected_host: str = "Catbox"
+    failover_hosts: List[str] = Field(default_factory=list)  # Tried in order for images the selected host fails
+    mirror_uploads: bool = False  # Also upload every chapter to the first failover host (mirror group in the JSON)
     theme: str = "dark"
     language: str = "pt-BR"
     json_update_mode: str = "add"  # "add", "replace", "smart"
     folder_structure: str = "standard"  # "standard", "flat", "volume_based", "scan_manga_chapter", "scan_manga_volume_chapter"
+    upload_pipeline_depth: int = Field(default=1, ge=1, le=10)  # Chapters uploading at once; 1 = sequential (opt-in)
+    upload_ledger_enabled: bool = True  # Reuse URLs of images already uploaded to the same host
+    resumable_uploads: bool = True  # Journal per-image progress so interrupted chapters resume
+    durable_jobs: bool = True  # Keep queued and batch jobs in the config dir so they survive restarts
+    # Pre-upload optimization (recompression cached in the config dir)
+    image_optimization: bool = False
+    optimize_format: str = "keep"  # "keep", "jpeg", "webp"
+    optimize_quality: int = Field(default=85, ge=1, le=100)
+    optimize_strip_metadata: bool = True
     
     hosts: Dict[str, HostConfig] = Field(
         default_factory=lambda: {
@@ -1,21 +1,347 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, copy_context
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Sequence, Tuple, Union
 from pathlib import Path
 import asyncio
+import time
+import aiohttp
+import httpx
 from loguru import logger
 
 from core.models import UploadResult, ChapterUploadResult
 from utils.helpers import natural_sort_key
+from utils.transcode import TranscodePrefetcher, transcoder
+from .sessions import HttpClientRegistry, SessionRegistry, SessionPoolOptions
+from .ledger import UploadLedger
+from .journal import ChapterJournal
+from .telemetry import HostTelemetry, TelemetryRegistry, UploadSample
+from .retry import RetryBudget, RetryPolicy, failure_from_exception, is_retryable
+from .limiters import (
+    AdaptiveConcurrencyLimiter, CircuitBreaker, CircuitStats, ConcurrencyStats, HostRateLimiter, RateLimitStats,
+    is_congestion_signal
+)
+
+# Transcoding prefetcher of the chapter being uploaded by the current task
+_chapter_transcodes: ContextVar[Optional[TranscodePrefetcher]] = ContextVar('chapter_transcodes', default=None)
+# Retries left for the chapter being uploaded by the current task (None outside a chapter)
+_chapter_retries: ContextVar[Optional[RetryBudget]] = ContextVar('chapter_retries', default=None)
+# Hedged requests left for the chapter being uploaded by the current task (None = hedging off)
+_chapter_hedges: ContextVar[Optional[RetryBudget]] = ContextVar('chapter_hedges', default=None)
+# Whether pages of the current chapter can fail over to another host. Without
+# one, an open circuit is waited out instead of failing every remaining page.
+_chapter_fail_fast: ContextVar[bool] = ContextVar('chapter_fail_fast', default=False)
 
 
 class BaseHost(ABC):
     """Base class for all image hosting services"""
     
+    # File suffixes the host rejects; such pages are transcoded to JPEG before upload
+    unsupported_formats: frozenset = frozenset()
+    # Largest file the host accepts in bytes (0 = no known limit)
+    max_file_size: int = 0
+    # Whether the remote listing follows upload order (pages are then sent in natural order)
+    ordered_uploads: bool = False
+    # Shared by every host instance so warm connections survive across chapters and jobs
+    sessions = SessionRegistry()
+    http_clients = HttpClientRegistry()
+    # Optional process-wide (content hash, host) -> URL ledger, installed by the application
+    ledger: Optional[UploadLedger] = None
+    # Per-request upload timing, bytes and outcomes, aggregated per host name
+    telemetry_registry = TelemetryRegistry()
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.name = self.__class__.__name__.replace('Host', '')
         self.max_workers = config.get('max_workers', 5)
         self.rate_limit = config.get('rate_limit', 1.0)
+        self.min_workers = min(config.get('min_workers') or 1, self.max_workers)
+        if config.get('adaptive_concurrency', True):
+            self.concurrency = AdaptiveConcurrencyLimiter(
+                self.name, min_limit=self.min_workers, max_limit=self.max_workers
+            )
+        else:
+            self.concurrency = AdaptiveConcurrencyLimiter(
+                self.name, min_limit=self.max_workers, max_limit=self.max_workers
+            )
+        self.rate_limiter = HostRateLimiter(
+            self.name,
+            requests_per_second=self._resolve_requests_per_second(config),
+            bytes_per_second=config.get('bytes_per_second') or 0.0,
+            burst=config.get('burst') or self.max_workers,
+        )
+        self.session_options = SessionPoolOptions(
+            pool_size=config.get('pool_size') or 20,
+            keepalive_timeout=config.get('keepalive_timeout', 30.0),
+            dns_cache_ttl=config.get('dns_cache_ttl', 300),
+            http2=config.get('http2', False),
+        )
+        self.transcode_prefetch = config.get('transcode_prefetch', 4)
+        self.upload_order = config.get('upload_order', 'natural')
+        max_upload_mb = config.get('max_upload_mb') or 0
+        self.max_upload_bytes = int(max_upload_mb * 1024 * 1024) if max_upload_mb > 0 else self.max_file_size
+        self.retry_policy = RetryPolicy(
+            max_retries=config.get('max_retries', 2),
+            base_delay=config.get('retry_base_delay', 1.0),
+            max_delay=config.get('retry_max_delay', 30.0),
+        )
+        self.retry_budget = config.get('retry_budget', 0.2)
+        self.hedge_uploads = config.get('hedge_uploads', False)
+        self.hedge_budget = config.get('hedge_budget', 0.1)
+        self.hedge_min_samples = config.get('hedge_min_samples', 20)
+        self.circuit: Optional[CircuitBreaker] = None
+        if config.get('circuit_breaker', True):
+            self.circuit = CircuitBreaker(
+                self.name,
+                failure_rate=config.get('breaker_failure_rate', 0.5),
+                slow_call_seconds=config.get('breaker_slow_call_seconds', 60.0),
+                slow_call_min_throughput=config.get('breaker_slow_call_min_throughput', 50_000.0),
+                open_seconds=config.get('breaker_open_seconds', 30.0),
+            )
+    
+    def _resolve_requests_per_second(self, config: Dict[str, Any]) -> float:
+        """Host-wide request budget; the legacy per-worker delay maps to max_workers / rate_limit"""
+        requests_per_second = config.get('requests_per_second') or 0.0
+        if requests_per_second > 0:
+            return float(requests_per_second)
+        if self.rate_limit and self.rate_limit > 0:
+            return self.max_workers / self.rate_limit
+        return 0.0
+    
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        """Get the pooled aiohttp session for this host and the URL's base address"""
+        return BaseHost.sessions.get_session(self.name, url, self.session_options)
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Pooled httpx client for this host (HTTP/2 when enabled and available)"""
+        return BaseHost.http_clients.get_client(self.name, self.session_options)
+    
+    @classmethod
+    def set_ledger(cls, ledger: Optional[UploadLedger]):
+        """Install (or remove with None) the shared upload ledger"""
+        BaseHost.ledger = ledger
+    
+    @classmethod
+    async def close_sessions(cls):
+        """Close all pooled sessions and HTTP clients (called on application shutdown)"""
+        await BaseHost.sessions.close_all()
+        await BaseHost.http_clients.close_all()
+    
+    @property
+    def telemetry(self) -> HostTelemetry:
+        return BaseHost.telemetry_registry.for_host(self.name)
+    
+    def get_concurrency_stats(self) -> ConcurrencyStats:
+        """Get the adaptive concurrency state for this host"""
+        return self.concurrency.get_stats()
+    
+    def get_rate_limit_stats(self) -> RateLimitStats:
+        """Get the token-bucket state for this host"""
+        return self.rate_limiter.get_stats()
+    
+    def get_circuit_stats(self) -> Optional[CircuitStats]:
+        """Get the circuit breaker state for this host (None when disabled)"""
+        return self.circuit.get_stats() if self.circuit is not None else None
+    
+    @property
+    def is_available(self) -> bool:
+        """False while the circuit is open and requests would fail fast"""
+        return self.circuit is None or not self.circuit.is_open
+    
+    def health_score(self) -> float:
+        """Health from 0 (circuit open) to 1 (no recent failures or slow uploads)"""
+        return self.circuit.health() if self.circuit is not None else 1.0
+    
+    def needs_transcoding(self, filepath: Path) -> bool:
+        """Check whether a file is in a format this host does not accept"""
+        return filepath.suffix.lower() in self.unsupported_formats
+    
+    async def transcoded_bytes(self, filepath: Path) -> Optional[bytes]:
+        """JPEG bytes for a file in an unsupported format, or None to send the file as-is"""
+        if not self.needs_transcoding(filepath):
+            return None
+        
+        prefetcher = _chapter_transcodes.get()
+        try:
+            if prefetcher is not None:
+                return await prefetcher.get(filepath)
+            return await transcoder.to_jpeg(filepath)
+        except Exception as e:
+            logger.warning(f"Converting {filepath.name} for {self.name} failed: {e}, uploading it directly")
+            return None
+    
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a running upload is hedged: the observed p95 latency, once known"""
+        p95, samples = self.telemetry.latency_percentile(95)
+        if samples < self.hedge_min_samples or p95 <= 0:
+            return None
+        return p95
+    
+    async def upload_with_limits(self, image: Path, started: Optional[asyncio.Event] = None) -> UploadResult:
+        """
+        Upload one image through the host-wide rate budget and adaptive concurrency slots
+        
+        Transient failures (network errors, 408/429/5xx) are retried with
+        full-jitter exponential backoff, waiting at least as long as the host's
+        Retry-After; permanent ones (other 4xx, unreadable files) are returned at
+        once. Retries inside a chapter also draw on its shared retry budget.
+        
+        ``started`` is set once the request is actually sent, i.e. after any wait
+        for the rate budget or a concurrency slot.
+        """
+        ledger = BaseHost.ledger
+        if ledger is not None:
+            cached_url = await ledger.lookup(image, self.name)
+            if cached_url:
+                logger.debug(f"↺ {image.name} already on {self.name}, reusing {cached_url}")
+                return UploadResult(url=cached_url, filename=image.name, success=True, host=self.name)
+        
+        try:
+            nbytes = image.stat().st_size
+        except OSError:
+            nbytes = 0
+        
+        budget = _chapter_retries.get()
+        retries = 0
+        while True:
+            result = await self._attempt_upload(image, nbytes, retries, started)
+            if result.success or not is_retryable(result) or retries >= self.retry_policy.max_retries:
+                break
+            if result.retry_after is not None and result.retry_after > self.retry_policy.max_retry_after:
+                logger.warning(f"{self.name} asked to wait {result.retry_after:.0f}s, not retrying {image.name}")
+                break
+            if budget is not None and not budget.try_spend():
+                logger.warning(f"Retry budget of this chapter exhausted, not retrying {image.name}")
+                break
+            
+            # Back off without holding a concurrency slot
+            delay = self.retry_policy.delay(retries, result.retry_after)
+            retries += 1
+            logger.info(f"↻ Retrying {image.name} on {self.name} in {delay:.1f}s "
+                        f"(attempt {retries + 1}/{self.retry_policy.max_retries + 1}): {result.error}")
+            await asyncio.sleep(delay)
+        
+        result.retries = retries
+        result.host = self.name
+        if result.success and ledger is not None:
+            await ledger.record(image, self.name, result.url)
+        return result
+    
+    async def _attempt_upload(self, image: Path, nbytes: int, retry: int,
+                              started_event: Optional[asyncio.Event] = None) -> UploadResult:
+        """
+        One upload_image call under the rate budget and a concurrency slot
+        
+        Exceptions become failed results. While the host's circuit is open and
+        the chapter can fail over, the request is not sent at all and a failure
+        is returned at once; with no other host to go to, the cool-down and the
+        half-open probe are waited out (up to the longest Retry-After honoured).
+        """
+        circuit = self.circuit
+        if circuit is not None and not circuit.allow_request():
+            if _chapter_fail_fast.get() or not await circuit.wait_for_request(self.retry_policy.max_retry_after):
+                return UploadResult(url="", filename=image.name, success=False,
+                                    error=f"{self.name} circuit open, request not sent", host=self.name)
+        
+        recorded = False
+        dispatched = False
+        try:
+            # Host-specific budgets (e.g. API credits) and the rate budget are taken
+            # before a slot and before the timer starts, so waiting for them neither
+            # idles a slot nor counts as request latency
+            await self.before_dispatch(image)
+            dispatched = True
+            await self.rate_limiter.acquire(nbytes)
+            
+            async with self.concurrency:
+                logger.debug(f"Uploading {image.name}...")
+                if started_event is not None:
+                    started_event.set()
+                started_at = time.time()
+                started = time.monotonic()
+                try:
+                    result = await self.upload_image(image)
+                    congested = is_congestion_signal(result)
+                except Exception as e:
+                    logger.error(f"✗ Exception uploading {image.name}: {type(e).__name__}: {str(e)}")
+                    result = failure_from_exception(image.name, e)
+                    congested = True
+                
+                duration = time.monotonic() - started
+                self.concurrency.record(duration, success=result.success, congested=congested)
+                if circuit is not None:
+                    circuit.record(result.success, duration, host_fault=congested or is_retryable(result),
+                                   nbytes=nbytes)
+                recorded = True
+                self.telemetry.record(UploadSample(
+                    host=self.name, filename=image.name, started_at=started_at, duration=duration,
+                    bytes_sent=nbytes, success=result.success, status_code=result.status_code,
+                    retries=1 if retry else 0, error=result.error
+                ))
+                if result.success:
+                    logger.debug(f"✓ {image.name} uploaded successfully")
+                else:
+                    logger.warning(f"✗ {image.name} upload failed: {result.error}")
+        finally:
+            if dispatched:
+                self.after_dispatch(image)
+            if circuit is not None and not recorded:
+                # Cancelled before an outcome (e.g. a hedge lost); free the half-open probe
+                circuit.abandon()
+        return result
+    
+    async def upload_hedged(self, image: Path, backup: Optional["BaseHost"] = None) -> UploadResult:
+        """
+        Upload one image, duplicating the request when it runs longer than usual
+        
+        Once the request has been in flight for the host's p95 latency, a second
+        one is sent to ``backup`` (or this host again) while the chapter's hedge
+        budget lasts. The first successful upload wins and the other is cancelled.
+        """
+        budget = _chapter_hedges.get()
+        delay = self.hedge_delay() if budget is not None else None
+        if budget is None or delay is None:
+            return await self.upload_with_limits(image)
+        
+        started = asyncio.Event()
+        primary = asyncio.ensure_future(self.upload_with_limits(image, started))
+        hedge: Optional[asyncio.Future] = None
+        try:
+            # Time the request itself, not the wait for the rate budget or a slot
+            waiter = asyncio.ensure_future(started.wait())
+            await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=delay)
+            if primary.done() or not budget.try_spend():
+                return await primary
+            
+            target = backup or self
+            logger.info(f"⇉ {image.name} still uploading to {self.name} after {delay:.1f}s (p95), "
+                        f"hedging on {target.name}")
+            hedge = asyncio.ensure_future(target.upload_with_limits(image))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result().success:
+                        self.telemetry.record_hedge(won=task is hedge)
+                        return task.result()
+            # Neither request succeeded; report the original outcome
+            self.telemetry.record_hedge(won=False)
+            return await primary
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+            await asyncio.gather(*(task for task in (primary, hedge) if task is not None), return_exceptions=True)
+    
+    async def before_dispatch(self, image: Path):
+        """Wait for host-specific budgets before ``image`` is sent (runs outside the concurrency slot)"""
+    
+    def after_dispatch(self, image: Path):
+        """Undo ``before_dispatch`` bookkeeping once the request finished or was abandoned"""
     
     @abstractmethod
     async def upload_image(self, filepath: Path) -> UploadResult:
@@ -27,36 +353,205 @@ class BaseHost(ABC):
         """Create an album with uploaded images"""
         pass
     
-    async def upload_chapter(self, chapter_name: str, images: List[Path]) -> ChapterUploadResult:
-        """Upload all images from a chapter"""
-        logger.info(f"Starting upload for chapter '{chapter_name}' with {len(images)} images using {self.name}")
-        logger.debug(f"Host config: max_workers={self.max_workers}, rate_limit={self.rate_limit}")
+    @asynccontextmanager
+    async def chapter_session(self, chapter_name: str) -> AsyncIterator[None]:
+        """
+        Scope around one chapter's uploads and its album creation
         
-        semaphore = asyncio.Semaphore(self.max_workers)
+        Hosts that group a chapter remotely (e.g. one gallery per chapter) override
+        this to set up and tear down that state; the default does nothing.
+        """
+        yield
+    
+    async def dispatch_order(self, images: List[Path],
+                             completed: Optional[Dict[str, UploadResult]] = None) -> List[Tuple[int, Path]]:
+        """
+        ``(index, image)`` pairs in the order pages are sent
         
-        async def upload_with_limit(image: Path):
-            async with semaphore:
-                await asyncio.sleep(self.rate_limit)
-                logger.debug(f"Uploading {image.name}...")
+        Pages go out in natural order by default. With ``largest_first`` (longest
+        processing time first) the biggest pages go out first so a huge spread
+        never starts last and becomes the chapter's straggler; the small pages
+        then fill the gaps. Pages already in the journal come first, as they
+        finish instantly.
+        
+        The order is by file size alone: the host's measured bytes/sec from
+        telemetry is one rate shared by all its pages, so dividing every size by
+        it (and adding the same per-request overhead) never changes the order.
+        """
+        indexed = list(enumerate(images))
+        if self.upload_order != 'largest_first' or self.ordered_uploads or len(images) < 2:
+            return indexed
+        
+        def sizes() -> List[int]:
+            result = []
+            for image in images:
                 try:
-                    result = await self.upload_image(image)
-                    if result.success:
-                        logger.debug(f"✓ {image.name} uploaded successfully")
-                    else:
-                        logger.warning(f"✗ {image.name} upload failed: {result.error}")
-                    return result
+                    result.append(image.stat().st_size)
+                except OSError:
+                    result.append(0)
+            return result
+        
+        page_sizes = await asyncio.to_thread(sizes)
+        done = completed or {}
+        # sorted() is stable: equal sizes keep their natural order
+        return sorted(indexed, key=lambda pair: (pair[1].name not in done, -page_sizes[pair[0]]))
+    
+    async def iter_upload_images(
+        self,
+        images: List[Path],
+        journal: Optional[ChapterJournal] = None,
+        slots: Optional[asyncio.Semaphore] = None,
+        backup: Optional["BaseHost"] = None,
+        fail_fast: bool = False
+    ) -> AsyncIterator[Tuple[int, Union[UploadResult, BaseException]]]:
+        """
+        Upload images and yield ``(index, outcome)`` pairs as each one completes
+        
+        A fixed pool of ``max_workers`` dispatchers pulls pages one at a time (in
+        ``dispatch_order``) and hands outcomes over through a bounded queue, so the
+        number of coroutines and buffered results stays constant however long the
+        chapter is. Indexes always refer to ``images``.
+        
+        Args:
+            images: Pages to upload
+            journal: Progress journal; pages it already holds are not uploaded again and
+                every new outcome is persisted as soon as it completes
+            slots: Extra semaphore shared with other chapters (pipelined uploads)
+            backup: Host that receives hedged requests when ``hedge_uploads`` is on
+                (defaults to this host)
+            fail_fast: Fail pages at once while the circuit is open (the caller fails
+                them over); otherwise uploads wait for the circuit to recover
+        """
+        if not images:
+            return
+        
+        completed = await journal.begin(images) if journal is not None else {}
+        if completed:
+            logger.info(f"Resuming: {len(completed)}/{len(images)} images already uploaded to {self.name}")
+        
+        async def upload_one(image: Path) -> UploadResult:
+            if image.name in completed:
+                # Keeps the host that produced the URL (a fallback's pages stay out of this host's album)
+                return completed[image.name]
+            if slots is not None:
+                async with slots:
+                    result = await self.upload_hedged(image, backup)
+            else:
+                result = await self.upload_hedged(image, backup)
+            if journal is not None:
+                await journal.record(image, result)
+            return result
+        
+        dispatchers = max(1, min(self.max_workers, len(images)))
+        outcomes: asyncio.Queue = asyncio.Queue(maxsize=dispatchers)
+        order = await self.dispatch_order(images, completed)
+        pending = iter(order)
+        
+        async def dispatch():
+            for index, image in pending:
+                try:
+                    outcome: Union[UploadResult, BaseException] = await upload_one(image)
                 except Exception as e:
-                    logger.error(f"✗ Exception uploading {image.name}: {type(e).__name__}: {str(e)}")
-                    raise
+                    outcome = e
+                await outcomes.put((index, outcome))
+        
+        # Pages this host rejects are transcoded in the background a few pages ahead
+        to_transcode = [img for _, img in order if self.needs_transcoding(img) and img.name not in completed]
+        prefetcher = TranscodePrefetcher(to_transcode, self.transcode_prefetch) if to_transcode else None
+        context = copy_context()
+        context.run(_chapter_transcodes.set, prefetcher)
+        context.run(_chapter_retries.set, RetryBudget.for_chapter(len(images), self.retry_budget))
+        context.run(_chapter_fail_fast.set, fail_fast)
+        if self.hedge_uploads:
+            context.run(_chapter_hedges.set, RetryBudget.for_chapter(len(images), self.hedge_budget, minimum=1))
+        tasks = [context.run(asyncio.create_task, dispatch()) for _ in range(dispatchers)]
+        try:
+            for _ in range(len(images)):
+                yield await self._next_outcome(outcomes, tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if prefetcher is not None:
+                prefetcher.cancel()
+    
+    @staticmethod
+    async def _next_outcome(outcomes: asyncio.Queue, dispatchers: List[asyncio.Task]) -> Any:
+        """
+        Next item of ``outcomes``, watching the dispatchers that fill it
+        
+        A dispatcher only stops early when something escapes its per-page error
+        handling (a BaseException); its page would never be reported, so the
+        failure is raised here instead of waiting forever.
+        """
+        if not outcomes.empty():
+            return outcomes.get_nowait()
+        getter = asyncio.ensure_future(outcomes.get())
+        try:
+            while not getter.done():
+                running = [task for task in dispatchers if not task.done()]
+                await asyncio.wait([getter, *running], return_when=asyncio.FIRST_COMPLETED)
+                for task in dispatchers:
+                    if task.done():
+                        task.result()  # Re-raises a dispatcher failure (or its cancellation)
+        finally:
+            getter.cancel()
+        return getter.result()
+    
+    async def upload_images(
+        self,
+        images: List[Path],
+        journal: Optional[ChapterJournal] = None,
+        slots: Optional[asyncio.Semaphore] = None,
+        on_result: Optional[Callable[[Path, Union[UploadResult, BaseException]], None]] = None,
+        backup: Optional["BaseHost"] = None,
+        fail_fast: bool = False
+    ) -> List[Union[UploadResult, BaseException]]:
+        """
+        Upload images and return their outcomes in ``images`` order
         
-        # Upload all images concurrently
-        tasks = [upload_with_limit(img) for img in images]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        ``on_result`` is called for every page as soon as it completes, e.g. to
+        report progress.
+        """
+        results: List[Union[UploadResult, BaseException]] = [None] * len(images)  # type: ignore[list-item]
+        async for index, outcome in self.iter_upload_images(images, journal, slots, backup, fail_fast):
+            results[index] = outcome
+            if on_result is not None:
+                on_result(images[index], outcome)
+        return results
+    
+    async def upload_chapter(
+        self,
+        chapter_name: str,
+        images: List[Path],
+        journal: Optional[ChapterJournal] = None,
+        on_result: Optional[Callable[[Path, Union[UploadResult, BaseException]], None]] = None
+    ) -> ChapterUploadResult:
+        """Upload all images from a chapter (resuming from ``journal`` when given)"""
+        logger.info(f"Starting upload for chapter '{chapter_name}' with {len(images)} images using {self.name}")
+        logger.debug(f"Host config: workers={self.min_workers}-{self.max_workers} "
+                     f"(current {self.concurrency.limit}), "
+                     f"requests/s={self.rate_limiter.requests_per_second or 'unlimited'}, "
+                     f"bytes/s={self.rate_limiter.bytes_per_second or 'unlimited'}")
         
+        async with self.chapter_session(chapter_name):
+            # Upload images through a bounded pool of dispatchers
+            results = await self.upload_images(images, journal, on_result=on_result)
+            
+            result = await self.finalize_chapter(chapter_name, images, results)
+        if journal is not None:
+            await journal.finish(result)
+        return result
+    
+    async def finalize_chapter(self, chapter_name: str, images: List[Path],
+                               results: Sequence[Union[UploadResult, BaseException]]) -> ChapterUploadResult:
+        """Assemble per-image outcomes (in ``images`` order) into a chapter result and create its album"""
         # Process results with order preservation
         successful_uploads = []
         failed_uploads = []
         image_ids = []
+        retries = 0
+        failover_uploads = 0
         
         # Create list of tuples (original_filename, result) to preserve order
         upload_results = []
@@ -67,8 +562,13 @@ class BaseHost(ABC):
                 logger.error(f"Upload exception for {original_file.name}: {type(result).__name__}: {str(result)}")
                 failed_uploads.append(original_file.name)
             elif isinstance(result, UploadResult):
+                retries += result.retries
                 if result.success:
                     upload_results.append((original_file.name, result.url))
+                    if result.host not in (None, self.name):
+                        # Failed over to another host; it cannot join this host's album
+                        failover_uploads += 1
+                        continue
                     # Extract ID from URL for album creation
                     image_id = result.url.split('/')[-1]
                     image_ids.append(image_id)
@@ -93,6 +593,8 @@ class BaseHost(ABC):
                 logger.info(f"Album created: {album_url}")
         
         # Log final results
+        logger.debug(f"{self.name} concurrency after chapter: {self.concurrency.limit} "
+                     f"(range {self.concurrency.min_limit}-{self.concurrency.max_limit})")
         total_images = len(images)
         success_count = len(successful_uploads)
         failed_count = len(failed_uploads)
@@ -103,13 +605,20 @@ class BaseHost(ABC):
             logger.error(f"Chapter '{chapter_name}' upload completed with failures: {success_count}/{total_images} successful, {failed_count} failed")
             if failed_uploads:
                 logger.error(f"Failed files: {', '.join(failed_uploads)}")
+        if retries:
+            logger.info(f"Chapter '{chapter_name}' needed {retries} upload retries on {self.name}")
+        if failover_uploads:
+            logger.info(f"Chapter '{chapter_name}': {failover_uploads} images were uploaded to fallback hosts")
         
         return ChapterUploadResult(
             chapter_name=chapter_name,
             album_url=album_url,
             image_urls=successful_uploads,
             failed_uploads=failed_uploads,
-            success=len(failed_uploads) == 0
+            success=len(failed_uploads) == 0,
+            retries=retries,
+            host=self.name,
+            failover_uploads=failover_uploads
         )
     
     def __str__(self):
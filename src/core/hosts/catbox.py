@@ -1,9 +1,8 @@
-import httpx
 from pathlib import Path
 from typing import Optional, List
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .base import BaseHost
+from .retry import failure_from_exception
 from core.models import UploadResult
 
 
@@ -11,18 +10,14 @@ class CatboxHost(BaseHost):
     """Modern async Catbox.moe implementation"""
     
     API_URL = "https://catbox.moe/user/api.php"
+    max_file_size = 200 * 1024 * 1024
     
     def __init__(self, config: dict):
         super().__init__(config)
         self.userhash = config.get('userhash', '')
-        self.client = httpx.AsyncClient(timeout=300.0)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10)
-    )
     async def upload_image(self, filepath: Path) -> UploadResult:
-        """Upload image to Catbox with retry logic"""
+        """Upload image to Catbox"""
         if not filepath.exists():
             return UploadResult(
                 url="",
@@ -39,7 +34,7 @@ class CatboxHost(BaseHost):
                     'userhash': self.userhash
                 }
                 
-                response = await self.client.post(
+                response = await self.http_client.post(
                     self.API_URL,
                     data=data,
                     files=files
@@ -54,12 +49,7 @@ class CatboxHost(BaseHost):
                 )
                 
         except Exception as e:
-            return UploadResult(
-                url="",
-                filename=filepath.name,
-                success=False,
-                error=str(e)
-            )
+            return failure_from_exception(filepath.name, e)
     
     async def create_album(self, title: str, description: str, image_ids: List[str]) -> Optional[str]:
         """Create Catbox album"""
@@ -75,15 +65,9 @@ class CatboxHost(BaseHost):
                 'files': ' '.join(image_ids)
             }
             
-            response = await self.client.post(self.API_URL, data=data)
+            response = await self.http_client.post(self.API_URL, data=data)
             response.raise_for_status()
             return response.text.strip()
             
         except Exception:
             return None
-    
-    async def __aenter__(self):
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
\ No newline at end of file
@@ -1,12 +1,43 @@
+import asyncio
+import time
 import aiohttp
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Optional, List, cast
+from typing import Any, AsyncIterator, Dict, Optional, List, cast
+from urllib.parse import quote, urlparse
 from loguru import logger
 
 from .base import BaseHost
+from .retry import parse_retry_after
 from core.models import UploadResult
 
 
+class _ServerUnavailable(Exception):
+    """Upload server refused the connection or answered with a 5xx"""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _ChapterFolder:
+    """Gofile folder (and guest account token) shared by the pages of one chapter"""
+    
+    def __init__(self):
+        self.token: Optional[str] = None
+        self.folder_id: Optional[str] = None
+        self.download_page: Optional[str] = None
+        self.upload_url: Optional[str] = None
+        # Held by the first page while it creates the folder
+        self.first_upload = asyncio.Lock()
+
+
+# Folder of the chapter being uploaded by the current task (see GofileHost.chapter_session)
+_current_folder: ContextVar[Optional[_ChapterFolder]] = ContextVar('gofile_chapter_folder', default=None)
+
+
 class GofileHost(BaseHost):
     """Gofile hosting service - good for multiple files"""
     
@@ -14,22 +45,50 @@ class GofileHost(BaseHost):
         super().__init__(config)
         self.api_url = "https://store1.gofile.io/uploadFile"
         self.get_server_url = "https://api.gofile.io/getServer"
+        self.server_cache_ttl = config.get('server_cache_ttl', 600.0)
+        self._servers: List[str] = []
+        self._servers_fetched_at = 0.0
+        self._server_lock = asyncio.Lock()
     
-    async def _get_upload_server(self):
-        """Get the best upload server"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.get_server_url) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get('status') == 'ok':
-                            server = result['data']['server']
-                            return f"https://{server}.gofile.io/uploadFile"
-        except Exception as e:
-            logger.warning(f"Failed to get Gofile server, using default: {e}")
+    async def _fetch_servers(self) -> List[str]:
+        """Ask Gofile which upload servers to use, best first"""
+        session = self.get_session(self.get_server_url)
+        async with session.get(self.get_server_url) as response:
+            if response.status != 200:
+                return []
+            result = await response.json()
+        if result.get('status') != 'ok':
+            return []
         
+        data = result.get('data', {})
+        if data.get('server'):
+            return [data['server']]
+        return [server['name'] for server in data.get('servers', []) if server.get('name')]
+    
+    async def _get_upload_server(self) -> str:
+        """Get the best upload server, cached for ``server_cache_ttl`` seconds"""
+        async with self._server_lock:
+            expired = time.monotonic() - self._servers_fetched_at > self.server_cache_ttl
+            if not self._servers or expired:
+                try:
+                    self._servers = await self._fetch_servers()
+                except Exception as e:
+                    logger.warning(f"Failed to get Gofile server, using default: {e}")
+                    self._servers = []
+                self._servers_fetched_at = time.monotonic()
+            
+            if self._servers:
+                return f"https://{self._servers[0]}.gofile.io/uploadFile"
         return self.api_url
     
+    def _mark_server_failed(self, upload_url: str):
+        """Fail over to the next cached server (the list is refetched once exhausted)"""
+        server = (urlparse(upload_url).hostname or '').split('.')[0]
+        if server in self._servers:
+            self._servers.remove(server)
+            logger.warning(f"Gofile server {server} unavailable, "
+                           f"{len(self._servers)} cached alternatives left")
+    
     async def _get_direct_link(self, session: aiohttp.ClientSession, file_code: str) -> Optional[str]:
         """Get direct download link from file code"""
         try:
@@ -90,54 +149,121 @@ class GofileHost(BaseHost):
         
         return None
     
+    async def _post_file(self, upload_url: str, filepath: Path, fields: Dict[str, str]) -> Dict[str, Any]:
+        """POST one file to an upload server and return the decoded response"""
+        session = self.get_session(upload_url)
+        try:
+            with open(filepath, 'rb') as file_handle:
+                data = aiohttp.FormData()
+                for name, value in fields.items():
+                    data.add_field(name, value)
+                data.add_field(
+                    'file',
+                    file_handle,
+                    filename=filepath.name,
+                )
+                
+                async with session.post(upload_url, data=data) as response:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if response.status >= 500:
+                        raise _ServerUnavailable(f"HTTP {response.status}: {await response.text()}",
+                                                 status_code=response.status, retry_after=retry_after)
+                    if response.status != 200:
+                        return {'status': 'http_error', 'http_status': response.status,
+                                'error': await response.text(), 'retry_after': retry_after}
+                    return cast(Dict[str, Any], await response.json())
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise _ServerUnavailable(str(e) or type(e).__name__) from e
+    
+    def _direct_link_from(self, upload_url: str, data: Dict[str, Any]) -> Optional[str]:
+        """Build the direct link from the upload response, saving a getContent round-trip"""
+        file_id = data.get('fileId') or data.get('id')
+        filename = data.get('fileName') or data.get('name')
+        if not file_id or not filename:
+            return None
+        server = (urlparse(upload_url).hostname or 'store1.gofile.io').split('.')[0]
+        return f"https://{server}.gofile.io/download/{file_id}/{quote(filename)}"
+    
+    async def _upload_file(self, filepath: Path, folder: Optional[_ChapterFolder]) -> UploadResult:
+        """Upload one file, into the chapter folder when there is one"""
+        upload_url = (folder.upload_url if folder else None) or await self._get_upload_server()
+        fields = {}
+        if folder is not None and folder.folder_id:
+            fields = {'token': cast(str, folder.token), 'folderId': folder.folder_id}
+        
+        try:
+            result = await self._post_file(upload_url, filepath, fields)
+        except _ServerUnavailable as e:
+            self._mark_server_failed(upload_url)
+            if folder is not None:
+                folder.upload_url = None
+            return UploadResult(
+                filename=filepath.name,
+                url="",
+                success=False,
+                error=str(e),
+                status_code=e.status_code,
+                retry_after=e.retry_after
+            )
+        
+        if result.get('status') == 'http_error':
+            return UploadResult(
+                filename=filepath.name,
+                url="",
+                success=False,
+                error=f"HTTP {result['http_status']}: {result.get('error', '')}",
+                status_code=result['http_status'],
+                retry_after=result.get('retry_after')
+            )
+        if result.get('status') != 'ok':
+            error_msg = result.get('error', result.get('status', 'Unknown error'))
+            return UploadResult(
+                filename=filepath.name,
+                url="",
+                success=False,
+                error=f"Gofile API error: {error_msg}"
+            )
+        
+        data = result['data']
+        if folder is not None:
+            # Later pages reuse the guest account and folder created by the first one
+            folder.token = folder.token or data.get('guestToken')
+            folder.folder_id = folder.folder_id or data.get('parentFolder')
+            folder.download_page = folder.download_page or data.get('downloadPage')
+            folder.upload_url = upload_url
+            final_url = self._direct_link_from(upload_url, data) or data['downloadPage']
+        else:
+            # Try to get direct link from file info
+            file_code = data['code']
+            direct_url = await self._get_direct_link(self.get_session(upload_url), file_code)
+            final_url = direct_url if direct_url else data['downloadPage']
+        
+        logger.debug(f"Gofile upload successful: {final_url}")
+        return UploadResult(
+            filename=filepath.name,
+            url=final_url,
+            success=True
+        )
+    
+    @asynccontextmanager
+    async def chapter_session(self, chapter_name: str) -> AsyncIterator[None]:
+        """Upload every page of the chapter into one Gofile folder"""
+        token = _current_folder.set(_ChapterFolder())
+        try:
+            yield
+        finally:
+            _current_folder.reset(token)
+    
     async def upload_image(self, filepath: Path) -> UploadResult:
         """Upload image to Gofile"""
         try:
-            upload_url = await self._get_upload_server()
-
-            async with aiohttp.ClientSession() as session:
-                with open(filepath, 'rb') as file_handle:
-                    data = aiohttp.FormData()
-                    data.add_field(
-                        'file',
-                        file_handle,
-                        filename=filepath.name,
-                    )
-
-                    async with session.post(upload_url, data=data) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            if result.get('status') == 'ok':
-                                file_code = result['data']['code']
-                                download_page = result['data']['downloadPage']
-
-                                # Try to get direct link from file info
-                                direct_url = await self._get_direct_link(session, file_code)
-                                final_url = direct_url if direct_url else download_page
-
-                                logger.debug(f"Gofile upload successful: {final_url}")
-                                return UploadResult(
-                                    filename=filepath.name,
-                                    url=final_url,
-                                    success=True
-                                )
-                            else:
-                                error_msg = result.get('error', 'Unknown error')
-                                return UploadResult(
-                                    filename=filepath.name,
-                                    url="",
-                                    success=False,
-                                    error=f"Gofile API error: {error_msg}"
-                                )
-                        else:
-                            error_text = await response.text()
-                            return UploadResult(
-                                filename=filepath.name,
-                                url="",
-                                success=False,
-                                error=f"HTTP {response.status}: {error_text}"
-                            )
-                        
+            folder = _current_folder.get()
+            if folder is not None and not folder.folder_id:
+                async with folder.first_upload:
+                    if not folder.folder_id:
+                        return await self._upload_file(filepath, folder)
+            return await self._upload_file(filepath, folder)
+                    
         except Exception as e:
             logger.error(f"Gofile upload failed for {filepath.name}: {e}")
             return UploadResult(
@@ -148,6 +274,8 @@ class GofileHost(BaseHost):
             )
     
     async def create_album(self, title: str, description: str, image_ids: List[str]) -> Optional[str]:
-        """Gofile supports folders/albums but requires additional API calls"""
-        # This would require folder creation API which is more complex
-        return None
\ No newline at end of file
+        """Return the chapter folder, which pages were uploaded into"""
+        folder = _current_folder.get()
+        if folder is None or not folder.folder_id:
+            return None
+        return folder.download_page
\ No newline at end of file
@@ -4,6 +4,7 @@ from typing import Optional, List, cast
 from loguru import logger
 
 from .base import BaseHost
+from .retry import parse_retry_after
 from core.models import UploadResult
 
 
@@ -14,6 +15,7 @@ class ImageChestHost(BaseHost):
         super().__init__(config)
         self.api_key = config.get('api_key', '')
         self.api_url = "https://api.imagechest.com/v1/upload"
+        self.albums_url = "https://api.imagechest.com/v1/albums"
     
     async def upload_image(self, filepath: Path) -> UploadResult:
         """Upload image to ImageChest"""
@@ -30,44 +32,46 @@ class ImageChestHost(BaseHost):
                 'Authorization': f'Bearer {self.api_key}'
             }
 
-            async with aiohttp.ClientSession() as session:
-                with open(filepath, 'rb') as file_handle:
-                    data = aiohttp.FormData()
-                    data.add_field(
-                        'image',
-                        file_handle,
-                        filename=filepath.name,
-                        content_type='image/*',
-                    )
+            session = self.get_session(self.api_url)
+            with open(filepath, 'rb') as file_handle:
+                data = aiohttp.FormData()
+                data.add_field(
+                    'image',
+                    file_handle,
+                    filename=filepath.name,
+                    content_type='image/*',
+                )
 
-                    async with session.post(self.api_url, data=data, headers=headers) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            if result.get('success'):
-                                image_url = result['data']['url']
-                                logger.debug(f"ImageChest upload successful: {image_url}")
-                                return UploadResult(
-                                    filename=filepath.name,
-                                    url=image_url,
-                                    success=True
-                                )
-                            else:
-                                error_msg = result.get('message', 'Unknown error')
-                                return UploadResult(
-                                    filename=filepath.name,
-                                    url="",
-                                    success=False,
-                                    error=f"ImageChest API error: {error_msg}"
-                                )
+                async with session.post(self.api_url, data=data, headers=headers) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        if result.get('success'):
+                            image_url = result['data']['url']
+                            logger.debug(f"ImageChest upload successful: {image_url}")
+                            return UploadResult(
+                                filename=filepath.name,
+                                url=image_url,
+                                success=True
+                            )
                         else:
-                            error_text = await response.text()
+                            error_msg = result.get('message', 'Unknown error')
                             return UploadResult(
                                 filename=filepath.name,
                                 url="",
                                 success=False,
-                                error=f"HTTP {response.status}: {error_text}"
+                                error=f"ImageChest API error: {error_msg}"
                             )
-                        
+                    else:
+                        error_text = await response.text()
+                        return UploadResult(
+                            filename=filepath.name,
+                            url="",
+                            success=False,
+                            error=f"HTTP {response.status}: {error_text}",
+                            status_code=response.status,
+                            retry_after=parse_retry_after(response.headers.get('Retry-After'))
+                        )
+                    
         except Exception as e:
             logger.error(f"ImageChest upload failed for {filepath.name}: {e}")
             return UploadResult(
@@ -94,18 +98,18 @@ class ImageChestHost(BaseHost):
                 'images': image_ids
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.imagechest.com/v1/albums", 
-                    json=album_data, 
-                    headers=headers
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get('success'):
-                            album_url = result['data']['url']
-                            logger.debug(f"ImageChest album created: {album_url}")
-                            return cast(str, album_url)
+            session = self.get_session(self.albums_url)
+            async with session.post(
+                self.albums_url, 
+                json=album_data, 
+                headers=headers
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    if result.get('success'):
+                        album_url = result['data']['url']
+                        logger.debug(f"ImageChest album created: {album_url}")
+                        return cast(str, album_url)
         except Exception as e:
             logger.error(f"ImageChest album creation failed: {e}")
         
@@ -1,16 +1,18 @@
-import aiohttp
 from pathlib import Path
 from typing import Optional, List
-import base64
 from loguru import logger
 
 from .base import BaseHost
+from .retry import parse_retry_after
 from core.models import UploadResult
+from utils.streaming import Base64FileStream
 
 
 class ImgBBHost(BaseHost):
     """ImgBB image hosting service"""
     
+    max_file_size = 32 * 1024 * 1024
+    
     def __init__(self, config):
         super().__init__(config)
         self.api_key = config.get('api_key', '')
@@ -27,45 +29,45 @@ class ImgBBHost(BaseHost):
             )
         
         try:
-            # Read and encode image
-            with open(filepath, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
-            
-            data = {
-                'key': self.api_key,
-                'image': image_data,
-                'name': filepath.stem
-            }
+            # Stream the urlencoded base64 form body from disk
+            body = Base64FileStream.form(
+                filepath,
+                'image',
+                {'key': self.api_key, 'name': filepath.stem}
+            )
+            headers = {'Content-Type': 'application/x-www-form-urlencoded'}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.api_url, data=data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get('success'):
-                            image_url = result['data']['url']
-                            logger.debug(f"ImgBB upload successful: {image_url}")
-                            return UploadResult(
-                                filename=filepath.name,
-                                url=image_url,
-                                success=True
-                            )
-                        else:
-                            error_msg = result.get('error', {}).get('message', 'Unknown error')
-                            return UploadResult(
-                                filename=filepath.name,
-                                url="",
-                                success=False,
-                                error=f"ImgBB API error: {error_msg}"
-                            )
+            session = self.get_session(self.api_url)
+            async with session.post(self.api_url, data=body, headers=headers) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    if result.get('success'):
+                        image_url = result['data']['url']
+                        logger.debug(f"ImgBB upload successful: {image_url}")
+                        return UploadResult(
+                            filename=filepath.name,
+                            url=image_url,
+                            success=True
+                        )
                     else:
-                        error_text = await response.text()
+                        error_msg = result.get('error', {}).get('message', 'Unknown error')
                         return UploadResult(
                             filename=filepath.name,
                             url="",
                             success=False,
-                            error=f"HTTP {response.status}: {error_text}"
+                            error=f"ImgBB API error: {error_msg}"
                         )
-                        
+                else:
+                    error_text = await response.text()
+                    return UploadResult(
+                        filename=filepath.name,
+                        url="",
+                        success=False,
+                        error=f"HTTP {response.status}: {error_text}",
+                        status_code=response.status,
+                        retry_after=parse_retry_after(response.headers.get('Retry-After'))
+                    )
+                    
         except Exception as e:
             logger.error(f"ImgBB upload failed for {filepath.name}: {e}")
             return UploadResult(
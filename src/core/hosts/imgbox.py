@@ -1,7 +1,10 @@
 import asyncio
+import shutil
 import tempfile
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Optional, List, cast
+from typing import Optional, List, AsyncIterator, cast
 
 from loguru import logger
 
@@ -9,9 +12,44 @@ from .base import BaseHost
 from core.models import UploadResult
 
 
+class _ChapterGallery:
+    """Remote Imgbox gallery shared by the pages of one chapter"""
+    
+    def __init__(self, gallery):
+        self.gallery = gallery
+        self._lock = asyncio.Lock()
+    
+    @property
+    def created(self) -> bool:
+        return bool(self.gallery.created)
+    
+    async def ensure_created(self):
+        """Create the gallery once, on the first page that needs it"""
+        async with self._lock:
+            if not self.gallery.created:
+                await self.gallery.create()
+                logger.debug(f"Imgbox gallery created: {self.gallery.url}")
+    
+    async def close(self):
+        try:
+            await self.gallery.close()
+        except Exception as e:
+            logger.debug(f"Error closing Imgbox gallery: {e}")
+
+
+# Gallery of the chapter being uploaded by the current task (see ImgboxHost.chapter_session)
+_current_gallery: ContextVar[Optional[_ChapterGallery]] = ContextVar('imgbox_chapter_gallery', default=None)
+
+
 class ImgboxHost(BaseHost):
     """Imgbox hosting service using pyimgbox library with async generator support"""
     
+    # Imgbox only accepts JPEG, PNG and GIF
+    unsupported_formats = frozenset({'.webp'})
+    max_file_size = 10 * 1024 * 1024
+    # Galleries list pages in upload order
+    ordered_uploads = True
+    
     def __init__(self, config):
         super().__init__(config)
         self._pyimgbox = None
@@ -37,95 +75,6 @@ class ImgboxHost(BaseHost):
             return cast(Optional[str], self.config.session_cookie)
         return None
     
-    def _convert_webp_to_jpg(self, filepath: Path) -> tuple[Path, Optional[object]]:
-        """Convert WebP to JPG if needed (Imgbox doesn't support WebP)"""
-        if filepath.suffix.lower() != '.webp':
-            return filepath, None
-        
-        logger.debug("Converting WebP to JPG for Imgbox compatibility")
-        try:
-            from PIL import Image
-            
-            # Create temporary JPG file
-            temp_file = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-            temp_path = Path(temp_file.name)
-            temp_file.close()
-            
-            # Convert WebP to JPG
-            with Image.open(filepath) as img:
-                # Convert to RGB if needed (WebP might have transparency)
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    rgb_img = img.convert('RGB')
-                    rgb_img.save(temp_path, 'JPEG', quality=95)
-                else:
-                    img.save(temp_path, 'JPEG', quality=95)
-            
-            logger.debug(f"WebP converted to temporary JPG: {temp_path}")
-            return temp_path, temp_file
-            
-        except ImportError:
-            logger.warning("PIL not available for WebP conversion, uploading WebP directly")
-            return filepath, None
-        except Exception as e:
-            logger.warning(f"WebP conversion failed: {e}, uploading WebP directly")
-            return filepath, None
-    
-    async def _cleanup_temp_file(self, temp_file: object, temp_path: Path):
-        """Clean up temporary file with retry mechanism"""
-        if not temp_file:
-            return
-        
-        for attempt in range(3):
-            try:
-                await asyncio.sleep(0.1)  # Small delay to ensure file is released
-                temp_path.unlink()
-                logger.debug("Temporary JPG file cleaned up")
-                break
-            except Exception:
-                if attempt == 2:  # Last attempt
-                    logger.debug(f"Temporary file will be cleaned by OS: {temp_path}")
-                else:
-                    await asyncio.sleep(0.5)  # Wait before retry
-    
-    async def _collect_submissions_async(self, gallery, filepath: Path) -> List:
-        """Collect submissions using async generator"""
-        result = []
-        async for submission in gallery.add([filepath]):
-            result.append(submission)
-        return result
-    
-    def _upload_to_gallery(self, pyimgbox, filepath: Path) -> List:
-        """Upload file to Imgbox gallery using async generator"""
-        session_cookie = self._get_session_cookie()
-        
-        if session_cookie:
-            logger.debug("Using session cookie for authentication")
-        else:
-            logger.debug("Using anonymous upload")
-        
-        # Create gallery for upload
-        gallery_title = f"Upload {filepath.stem}"
-        logger.debug(f"Creating gallery with title: {gallery_title}")
-        gallery = pyimgbox.Gallery(title=gallery_title)
-        logger.debug(f"Gallery created: {gallery}")
-        
-        # Upload using async generator
-        logger.debug("Starting file upload with async generator...")
-        logger.debug(f"Adding file to gallery: {filepath}")
-        
-        # This method runs inside a worker thread (via run_in_executor).
-        # Use a dedicated event loop per call to avoid nested-loop errors.
-        loop = asyncio.new_event_loop()
-        try:
-            submissions = loop.run_until_complete(
-                self._collect_submissions_async(gallery, filepath)
-            )
-        finally:
-            loop.close()
-        
-        logger.debug(f"Upload submissions received: {submissions}")
-        return submissions
-    
     def _process_submission(self, submission, filepath: Path) -> UploadResult:
         """Process submission object and return UploadResult"""
         logger.debug(f"Processing submission: {submission}")
@@ -149,60 +98,70 @@ class ImgboxHost(BaseHost):
                 error=f"Imgbox error: {error_msg}"
             )
     
-    def _sync_upload(self, pyimgbox, filepath: Path) -> UploadResult:
-        """Synchronous upload method"""
+    @asynccontextmanager
+    async def chapter_session(self, chapter_name: str) -> AsyncIterator[None]:
+        """Share one Imgbox gallery between every page of the chapter"""
         try:
-            logger.debug(f"_sync_upload called with filepath: {filepath}")
-            
-            submissions = self._upload_to_gallery(pyimgbox, filepath)
-            
-            if submissions:
-                return self._process_submission(submissions[0], filepath)
-            else:
-                logger.error("No upload results received from Imgbox")
-                return UploadResult(
-                    filename=filepath.name,
-                    url="",
-                    success=False,
-                    error="No upload results received"
-                )
-            
-        except Exception as e:
-            logger.error(f"Upload error: {e}")
-            return UploadResult(
-                filename=filepath.name,
-                url="",
-                success=False,
-                error=str(e)
-            )
+            pyimgbox = self._get_pyimgbox()
+        except ImportError:
+            pyimgbox = None
+        
+        if pyimgbox is None:
+            # upload_image reports the missing dependency per page
+            yield
+            return
+        
+        if self._get_session_cookie():
+            logger.debug("Using session cookie for authentication")
+        else:
+            logger.debug("Using anonymous upload")
+        
+        logger.debug(f"Creating gallery with title: {chapter_name}")
+        chapter_gallery = _ChapterGallery(pyimgbox.Gallery(title=chapter_name))
+        token = _current_gallery.set(chapter_gallery)
+        try:
+            yield
+        finally:
+            _current_gallery.reset(token)
+            await chapter_gallery.close()
+    
+    async def _add_to_gallery(self, gallery, filepath: Path, jpeg: Optional[bytes]):
+        """Upload a file, or its JPEG conversion, to a gallery"""
+        if jpeg is None:
+            return await gallery.upload(str(filepath))
+        # Gallery.upload only takes paths: spool the converted bytes to a temporary JPEG of the same name
+        spool_dir = await asyncio.to_thread(tempfile.mkdtemp, prefix="imgbox-")
+        spooled = Path(spool_dir) / f"{filepath.stem}.jpg"
+        try:
+            await asyncio.to_thread(spooled.write_bytes, jpeg)
+            return await gallery.upload(str(spooled))
+        finally:
+            await asyncio.to_thread(shutil.rmtree, spool_dir, True)
+    
+    async def _submit(self, pyimgbox, filepath: Path, jpeg: Optional[bytes]):
+        """Upload a file to the chapter gallery, or to a gallery of its own outside a chapter"""
+        chapter_gallery = _current_gallery.get()
+        if chapter_gallery is not None:
+            await chapter_gallery.ensure_created()
+            return await self._add_to_gallery(chapter_gallery.gallery, filepath, jpeg)
+        
+        async with pyimgbox.Gallery(title=f"Upload {filepath.stem}") as gallery:
+            await gallery.create()
+            return await self._add_to_gallery(gallery, filepath, jpeg)
     
     async def upload_image(self, filepath: Path) -> UploadResult:
         """Upload image to Imgbox"""
         try:
             logger.debug(f"Starting Imgbox upload for: {filepath}")
             pyimgbox = self._get_pyimgbox()
-            logger.debug("pyimgbox library loaded successfully")
-            
-            # Convert WebP to JPG if needed
-            upload_path, temp_file = self._convert_webp_to_jpg(filepath)
-            
-            # Run upload in thread pool since pyimgbox is synchronous
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(
-                None, 
-                self._sync_upload, 
-                pyimgbox, 
-                upload_path
-            )
             
-            # Clean up temporary file
-            if temp_file and upload_path != filepath:
-                await self._cleanup_temp_file(temp_file, upload_path)
+            # WebP pages arrive as JPEG bytes converted (and prefetched) in the transcoding pool
+            jpeg = await self.transcoded_bytes(filepath)
             
-            # Update result with original filename
-            if result and upload_path != filepath:
-                result.filename = filepath.name
+            # pyimgbox is asyncio-native, so pages upload concurrently on the running loop
+            submission = await self._submit(pyimgbox, filepath, jpeg)
             
+            result = self._process_submission(submission, filepath)
             logger.debug(f"Upload completed with result: {result}")
             return result
             
@@ -216,8 +175,6 @@ class ImgboxHost(BaseHost):
             )
         except Exception as e:
             logger.error(f"Imgbox upload failed for {filepath.name}: {e}")
-            import traceback
-            logger.error(f"Full traceback: {traceback.format_exc()}")
             return UploadResult(
                 filename=filepath.name,
                 url="",
@@ -226,5 +183,8 @@ class ImgboxHost(BaseHost):
             )
     
     async def create_album(self, title: str, description: str, image_ids: List[str]) -> Optional[str]:
-        """Imgbox supports galleries but pyimgbox handles this automatically"""
-        return None
\ No newline at end of file
+        """Return the chapter gallery, which pages were added to while uploading"""
+        chapter_gallery = _current_gallery.get()
+        if chapter_gallery is None or not chapter_gallery.created:
+            return None
+        return chapter_gallery.gallery.url
\ No newline at end of file
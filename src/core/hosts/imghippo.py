@@ -1,9 +1,8 @@
-import httpx
 from pathlib import Path
 from typing import Optional, List, cast
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .base import BaseHost
+from .retry import failure_from_exception
 from core.models import UploadResult
 
 
@@ -16,14 +15,9 @@ class ImgHippoHost(BaseHost):
     def __init__(self, config: dict):
         super().__init__(config)
         self.api_key = config.get('api_key', '')
-        self.client = httpx.AsyncClient(timeout=300.0)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10)
-    )
     async def upload_image(self, filepath: Path) -> UploadResult:
-        """Upload image to ImgHippo with retry logic"""
+        """Upload image to ImgHippo"""
         if not filepath.exists():
             return UploadResult(
                 url="",
@@ -48,7 +42,7 @@ class ImgHippoHost(BaseHost):
                     'title': filepath.stem
                 }
                 
-                response = await self.client.post(
+                response = await self.http_client.post(
                     self.UPLOAD_URL,
                     data=data,
                     files=files
@@ -74,12 +68,7 @@ class ImgHippoHost(BaseHost):
                     )
                 
         except Exception as e:
-            return UploadResult(
-                url="",
-                filename=filepath.name,
-                success=False,
-                error=str(e)
-            )
+            return failure_from_exception(filepath.name, e)
     
     async def create_album(self, title: str, description: str, image_ids: List[str]) -> Optional[str]:
         """ImgHippo doesn't support album creation, return None"""
@@ -96,7 +85,7 @@ class ImgHippoHost(BaseHost):
                 'Url': image_url
             }
             
-            response = await self.client.post(self.DELETE_URL, data=data)
+            response = await self.http_client.post(self.DELETE_URL, data=data)
             response.raise_for_status()
             
             result = response.json()
@@ -105,9 +94,3 @@ class ImgHippoHost(BaseHost):
             
         except Exception:
             return False
-    
-    async def __aenter__(self):
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
\ No newline at end of file
@@ -1,11 +1,10 @@
-import httpx
 from pathlib import Path
 from typing import Optional, List, Any, cast
-import base64
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .base import BaseHost
+from .retry import failure_from_exception
 from core.models import UploadResult
+from utils.streaming import Base64FileStream
 
 
 class ImgPileHost(BaseHost):
@@ -15,14 +14,9 @@ class ImgPileHost(BaseHost):
         super().__init__(config)
         self.base_url = config.get('base_url', 'https://imgpile.com')
         self.api_key = config.get('api_key', '')  # Optional for some implementations
-        self.client = httpx.AsyncClient(timeout=300.0)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10)
-    )
     async def upload_image(self, filepath: Path) -> UploadResult:
-        """Upload image to ImgPile with retry logic"""
+        """Upload image to ImgPile"""
         if not filepath.exists():
             return UploadResult(
                 url="",
@@ -43,7 +37,7 @@ class ImgPileHost(BaseHost):
                 if self.api_key:
                     data['api_key'] = self.api_key
                 
-                response = await self.client.post(
+                response = await self.http_client.post(
                     upload_url,
                     data=data,
                     files=files
@@ -84,67 +78,54 @@ class ImgPileHost(BaseHost):
                 )
                 
         except Exception as e:
-            return UploadResult(
-                url="",
-                filename=filepath.name,
-                success=False,
-                error=str(e)
-            )
+            return failure_from_exception(filepath.name, e)
     
     async def _upload_base64(self, filepath: Path) -> UploadResult:
         """Fallback method using base64 encoding"""
         try:
-            with open(filepath, 'rb') as f:
-                file_data = f.read()
-                base64_data = base64.b64encode(file_data).decode('utf-8')
-                
-                # Create data URI
-                mime_type = self._get_mime_type(filepath.suffix)
-                data_uri = f"data:{mime_type};base64,{base64_data}"
-                
-                payload = {
-                    'name': filepath.stem,
-                    'source': data_uri
+            fields = {'name': filepath.stem}
+            if self.api_key:
+                fields['api_key'] = self.api_key
+            
+            # Stream the data URI JSON body from disk
+            mime_type = self._get_mime_type(filepath.suffix)
+            body = Base64FileStream.json(filepath, 'source', fields, mime_type=mime_type)
+            
+            upload_url = f"{self.base_url}/api/images"
+            response = await self.http_client.post(
+                upload_url,
+                content=body,
+                headers={
+                    'Content-Type': 'application/json',
+                    'Content-Length': str(body.content_length)
                 }
-                
-                if self.api_key:
-                    payload['api_key'] = self.api_key
-                
-                upload_url = f"{self.base_url}/api/images"
-                response = await self.client.post(
-                    upload_url,
-                    json=payload,
-                    headers={'Content-Type': 'application/json'}
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                
-                if 'id' in result:
-                    image_id = result['id']
-                    extension = result.get('extension', filepath.suffix.lstrip('.'))
-                    url = f"{self.base_url}/static/uploads/{image_id}.{extension}"
-                    
-                    return UploadResult(
-                        url=url,
-                        filename=filepath.name,
-                        success=True
-                    )
+            )
+            response.raise_for_status()
+            
+            result = response.json()
+            
+            if 'id' in result:
+                image_id = result['id']
+                extension = result.get('extension', filepath.suffix.lstrip('.'))
+                url = f"{self.base_url}/static/uploads/{image_id}.{extension}"
                 
                 return UploadResult(
-                    url="",
+                    url=url,
                     filename=filepath.name,
-                    success=False,
-                    error="Base64 upload failed"
+                    success=True
                 )
-                
-        except Exception as e:
+            
             return UploadResult(
                 url="",
                 filename=filepath.name,
                 success=False,
-                error=f"Base64 upload error: {str(e)}"
+                error="Base64 upload failed"
             )
+            
+        except Exception as e:
+            result = failure_from_exception(filepath.name, e)
+            result.error = f"Base64 upload error: {result.error}"
+            return result
     
     def _get_mime_type(self, extension: str) -> str:
         """Get MIME type for file extension"""
@@ -166,14 +147,8 @@ class ImgPileHost(BaseHost):
         """Get image information by ID"""
         try:
             url = f"{self.base_url}/api/images/{image_id}"
-            response = await self.client.get(url)
+            response = await self.http_client.get(url)
             response.raise_for_status()
             return cast(dict[str, Any], response.json())
         except Exception:
             return None
-    
-    async def __aenter__(self):
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
\ No newline at end of file
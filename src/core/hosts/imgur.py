@@ -1,31 +1,33 @@
-import httpx
 from pathlib import Path
 from typing import Optional, List
-import asyncio
 import time
-from tenacity import retry, stop_after_attempt, wait_exponential
-import base64
 from loguru import logger
 
 from .base import BaseHost
+from .limiters import CreditScheduler
+from .retry import failure_from_exception, parse_retry_after
 from core.models import UploadResult
+from utils.streaming import Base64FileStream
 
 
 class ImgurHost(BaseHost):
     """Imgur.com async implementation"""
     
     API_URL = "https://api.imgur.com/3/"
+    # Credits charged per image POST: user/client budgets and the per-IP upload limit
+    UPLOAD_COSTS = {'user': 10.0, 'client': 10.0, 'post': 1.0}
+    max_file_size = 20 * 1024 * 1024
     
     def __init__(self, config: dict):
         super().__init__(config)
         self.client_id = config.get('client_id', '')
         self.access_token = config.get('access_token', '')
-        self.client = httpx.AsyncClient(timeout=300.0)
         
         # Rate limit tracking
         self.user_remaining = None
         self.user_reset = None
         self.client_remaining = None
+        self.credits = CreditScheduler(self.name)
     
     def _get_headers(self) -> dict:
         """Get appropriate headers based on auth type"""
@@ -37,18 +39,47 @@ class ImgurHost(BaseHost):
             raise ValueError("Imgur requires client_id or access_token")
     
     def _update_rate_limits(self, headers):
-        """Update rate limit info from response headers"""
+        """Update rate limit info from response headers and feed it to the credit scheduler"""
+        def header(name: str) -> Optional[int]:
+            value = headers.get(name)
+            return int(value) if value not in (None, '') else None
+        
         try:
-            self.user_remaining = int(headers.get('X-RateLimit-UserRemaining', 0))
-            self.user_reset = int(headers.get('X-RateLimit-UserReset', 0))
-            self.client_remaining = int(headers.get('X-RateLimit-ClientRemaining', 0))
+            user_remaining = header('X-RateLimit-UserRemaining')
+            user_reset = header('X-RateLimit-UserReset')  # Unix time
+            client_remaining = header('X-RateLimit-ClientRemaining')
+            post_reset = header('X-Post-Rate-Limit-Reset')  # Seconds from now
+            
+            self.credits.update('user', user_remaining, header('X-RateLimit-UserLimit'), user_reset)
+            self.credits.update('client', client_remaining, header('X-RateLimit-ClientLimit'))
+            self.credits.update(
+                'post',
+                header('X-Post-Rate-Limit-Remaining'),
+                header('X-Post-Rate-Limit-Limit'),
+                time.time() + post_reset if post_reset is not None else None
+            )
         except (TypeError, ValueError) as exc:
             logger.debug(f"Could not parse Imgur rate-limit headers: {exc}")
+            return
+        
+        if user_remaining is not None:
+            self.user_remaining = user_remaining
+        if user_reset is not None:
+            self.user_reset = user_reset
+        if client_remaining is not None:
+            self.client_remaining = client_remaining
+    
+    def get_credit_stats(self) -> dict:
+        """Get the Imgur credit budgets and scheduler counters"""
+        return self.credits.get_stats()
+    
+    async def before_dispatch(self, image: Path):
+        """Reserve credits before sending so concurrent workers never overspend the budget"""
+        await self.credits.reserve(self.UPLOAD_COSTS)
+    
+    def after_dispatch(self, image: Path):
+        self.credits.release(self.UPLOAD_COSTS)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=2, min=5, max=30)
-    )
     async def upload_image(self, filepath: Path) -> UploadResult:
         """Upload image to Imgur"""
         if not filepath.exists():
@@ -59,28 +90,34 @@ class ImgurHost(BaseHost):
                 error="File not found"
             )
         
-        # Check rate limits
-        if self.client_remaining is not None and self.client_remaining < 5 and self.user_reset is not None:
-            wait_time = max(10, self.user_reset - time.time())
-            await asyncio.sleep(wait_time)
-        
         try:
-            # Read and encode image
-            with open(filepath, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode()
+            # Stream the base64 JSON body from disk instead of encoding it in memory
+            body = Base64FileStream.json(filepath, 'image', {'type': 'base64'})
+            headers = self._get_headers()
+            headers['Content-Type'] = 'application/json'
+            headers['Content-Length'] = str(body.content_length)
             
-            response = await self.client.post(
+            response = await self.http_client.post(
                 f"{self.API_URL}image",
-                headers=self._get_headers(),
-                json={'image': image_data, 'type': 'base64'}
+                headers=headers,
+                content=body
             )
             
             self._update_rate_limits(response.headers)
             
             if response.status_code == 429:  # Rate limited
-                retry_after = int(response.headers.get('Retry-After', 60))
-                await asyncio.sleep(retry_after)
-                raise Exception("Rate limited")
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is None:
+                    retry_after = 60.0
+                self.credits.block_for(retry_after)
+                return UploadResult(
+                    url="",
+                    filename=filepath.name,
+                    success=False,
+                    error=f"HTTP 429: rate limited, retry after {retry_after:.0f}s",
+                    status_code=429,
+                    retry_after=retry_after
+                )
             
             response.raise_for_status()
             data = response.json()
@@ -101,12 +138,7 @@ class ImgurHost(BaseHost):
                 )
                 
         except Exception as e:
-            return UploadResult(
-                url="",
-                filename=filepath.name,
-                success=False,
-                error=str(e)
-            )
+            return failure_from_exception(filepath.name, e)
     
     async def create_album(self, title: str, description: str, image_ids: List[str]) -> Optional[str]:
         """Create Imgur album (requires auth)"""
@@ -117,7 +149,7 @@ class ImgurHost(BaseHost):
             return None
         
         try:
-            response = await self.client.post(
+            response = await self.http_client.post(
                 f"{self.API_URL}album",
                 headers=self._get_headers(),
                 json={
@@ -140,9 +172,3 @@ class ImgurHost(BaseHost):
             logger.debug(f"Imgur album creation failed: {exc}")
         
         return None
-    
-    async def __aenter__(self):
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
\ No newline at end of file
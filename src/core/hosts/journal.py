@@ -0,0 +1,216 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from core.models import UploadResult, ChapterUploadResult
+
+
+class UploadJournal:
+    """
+    Durable per-image progress journal for chapter uploads, backed by SQLite
+
+    Every image outcome is committed as soon as it completes, keyed by
+    (manga, chapter, host, filename), so an interrupted chapter can later be
+    resumed without re-uploading the pages that already landed. Each page also
+    records the host that produced its URL (``uploaded_by``), as pages failed
+    over to another host are journaled under the chapter's own host. Entries
+    for a chapter are dropped once it finishes without failures.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chapters (
+                manga TEXT NOT NULL,
+                chapter TEXT NOT NULL,
+                host TEXT NOT NULL,
+                state TEXT NOT NULL,
+                total_images INTEGER,
+                album_url TEXT,
+                updated_at REAL,
+                PRIMARY KEY (manga, chapter, host)
+            );
+            CREATE TABLE IF NOT EXISTS images (
+                manga TEXT NOT NULL,
+                chapter TEXT NOT NULL,
+                host TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                state TEXT NOT NULL,
+                url TEXT,
+                error TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                updated_at REAL,
+                uploaded_by TEXT,
+                PRIMARY KEY (manga, chapter, host, filename)
+            );
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(images)")}
+        if "uploaded_by" not in columns:
+            # Journals written before fallback pages were journaled
+            self._conn.execute("ALTER TABLE images ADD COLUMN uploaded_by TEXT")
+        self._conn.commit()
+        logger.debug(f"Upload journal opened: {db_path}")
+
+    def chapter(self, manga: str, chapter: str, host: str) -> "ChapterJournal":
+        """Get the journal handle for one chapter on one host"""
+        return ChapterJournal(self, manga, chapter, host)
+
+    def get_resumable_chapters(self, manga: str, host: str) -> List[str]:
+        """Names of chapters of ``manga`` left unfinished on ``host``"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chapter FROM chapters WHERE manga = ? AND host = ? AND state != 'completed' "
+                "ORDER BY updated_at",
+                (manga, host)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_progress(self, manga: str, chapter: str, host: str) -> Dict[str, Any]:
+        """Get journaled image counts for a chapter"""
+        with self._lock:
+            chapter_row = self._conn.execute(
+                "SELECT state, total_images FROM chapters WHERE manga = ? AND chapter = ? AND host = ?",
+                (manga, chapter, host)
+            ).fetchone()
+            counts = dict(self._conn.execute(
+                "SELECT state, COUNT(*) FROM images WHERE manga = ? AND chapter = ? AND host = ? GROUP BY state",
+                (manga, chapter, host)
+            ).fetchall())
+        return {
+            "state": chapter_row[0] if chapter_row else None,
+            "total_images": chapter_row[1] if chapter_row else 0,
+            "uploaded": counts.get("uploaded", 0),
+            "failed": counts.get("failed", 0),
+        }
+
+    def discard(self, manga: str, chapter: str, host: str):
+        """Forget a chapter's progress so its next upload starts from scratch"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM images WHERE manga = ? AND chapter = ? AND host = ?", (manga, chapter, host)
+            )
+            self._conn.execute(
+                "DELETE FROM chapters WHERE manga = ? AND chapter = ? AND host = ?", (manga, chapter, host)
+            )
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
+
+    # Blocking helpers (called through asyncio.to_thread)
+
+    def _begin_sync(self, key: tuple, images: List[Path]) -> Dict[str, UploadResult]:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO chapters (manga, chapter, host, state, total_images, updated_at) "
+                "VALUES (?, ?, ?, 'in_progress', ?, ?) "
+                "ON CONFLICT (manga, chapter, host) DO UPDATE SET "
+                "state = 'in_progress', updated_at = excluded.updated_at, "
+                # Failover re-enters a chapter in progress with only its failed pages
+                "total_images = CASE WHEN chapters.state = 'in_progress' "
+                "THEN MAX(chapters.total_images, excluded.total_images) ELSE excluded.total_images END",
+                (*key, len(images), time.time())
+            )
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT filename, url, size, mtime_ns, uploaded_by FROM images "
+                "WHERE manga = ? AND chapter = ? AND host = ? AND state = 'uploaded'",
+                key
+            ).fetchall()
+
+        journaled = {filename: entry for filename, *entry in rows}
+        completed = {}
+        for image in images:
+            entry = journaled.get(image.name)
+            if entry is None:
+                continue
+            url, size, mtime_ns, uploaded_by = entry
+            try:
+                stat = image.stat()
+            except OSError:
+                continue
+            # A page edited since it was uploaded must be sent again
+            if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                completed[image.name] = UploadResult(url=url, filename=image.name, success=True,
+                                                     host=uploaded_by or key[2])
+        return completed
+
+    def _record_sync(self, key: tuple, image: Path, result: UploadResult):
+        try:
+            stat = image.stat()
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            size, mtime_ns = None, None
+        state = "uploaded" if result.success else "failed"
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO images "
+                "(manga, chapter, host, filename, state, url, error, size, mtime_ns, updated_at, uploaded_by) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, image.name, state, result.url or None, result.error, size, mtime_ns, time.time(),
+                 result.host)
+            )
+            self._conn.commit()
+
+    def _finish_sync(self, key: tuple, result: ChapterUploadResult):
+        with self._lock:
+            if result.success:
+                self._conn.execute(
+                    "DELETE FROM images WHERE manga = ? AND chapter = ? AND host = ?", key
+                )
+            self._conn.execute(
+                "UPDATE chapters SET state = ?, album_url = ?, updated_at = ? "
+                "WHERE manga = ? AND chapter = ? AND host = ?",
+                ("completed" if result.success else "partial", result.album_url, time.time(), *key)
+            )
+            self._conn.commit()
+
+
+class ChapterJournal:
+    """Journal handle for a single (manga, chapter, host) upload"""
+
+    def __init__(self, journal: UploadJournal, manga: str, chapter: str, host: str):
+        self.journal = journal
+        self.manga = manga
+        self.chapter = chapter
+        self.host = host
+
+    @property
+    def key(self) -> tuple:
+        return (self.manga, self.chapter, self.host)
+
+    async def begin(self, images: List[Path]) -> Dict[str, UploadResult]:
+        """Mark the chapter in progress and return the pages already uploaded (by filename)"""
+        try:
+            return await asyncio.to_thread(self.journal._begin_sync, self.key, images)
+        except sqlite3.Error as exc:
+            logger.warning(f"Upload journal unavailable for '{self.chapter}', starting from scratch: {exc}")
+            return {}
+
+    async def record(self, image: Path, result: UploadResult):
+        """Persist the outcome of one image"""
+        try:
+            await asyncio.to_thread(self.journal._record_sync, self.key, image, result)
+        except sqlite3.Error as exc:
+            logger.warning(f"Could not journal {image.name}: {exc}")
+
+    async def finish(self, result: ChapterUploadResult):
+        """Close the chapter; progress is kept only if some pages failed"""
+        try:
+            await asyncio.to_thread(self.journal._finish_sync, self.key, result)
+        except sqlite3.Error as exc:
+            logger.warning(f"Could not close journal for '{self.chapter}': {exc}")
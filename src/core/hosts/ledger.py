@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(filepath: Path) -> str:
+    """Hash file contents with BLAKE2b (blocking; run it off the event loop)"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(filepath, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadLedger:
+    """
+    Persistent (content hash, host) -> URL ledger backed by SQLite
+
+    File hashes are memoized by (path, size, mtime) so unchanged pages are not
+    re-read on later runs. All database and hashing work runs in a worker
+    thread to keep the event loop responsive.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS uploads (
+                content_hash TEXT NOT NULL,
+                host TEXT NOT NULL,
+                url TEXT NOT NULL,
+                filename TEXT,
+                size INTEGER,
+                uploaded_at REAL,
+                PRIMARY KEY (content_hash, host)
+            );
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+        self._hits = 0
+        self._misses = 0
+        logger.debug(f"Upload ledger opened: {db_path}")
+
+    # Blocking helpers (called through asyncio.to_thread)
+
+    def _hash_sync(self, filepath: Path) -> Tuple[str, int]:
+        stat = filepath.stat()
+        key = str(filepath.resolve())
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (key, stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        if row:
+            return row[0], stat.st_size
+
+        content_hash = hash_file(filepath)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+                (key, stat.st_size, stat.st_mtime_ns, content_hash)
+            )
+            self._conn.commit()
+        return content_hash, stat.st_size
+
+    def _lookup_sync(self, filepath: Path, host: str) -> Optional[str]:
+        content_hash, _ = self._hash_sync(filepath)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url FROM uploads WHERE content_hash = ? AND host = ?",
+                (content_hash, host)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _record_sync(self, filepath: Path, host: str, url: str):
+        content_hash, size = self._hash_sync(filepath)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads (content_hash, host, url, filename, size, uploaded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (content_hash, host, url, filepath.name, size, time.time())
+            )
+            self._conn.commit()
+
+    # Async API
+
+    async def content_hash(self, filepath: Path) -> str:
+        """Get the content hash of a file"""
+        content_hash, _ = await asyncio.to_thread(self._hash_sync, filepath)
+        return content_hash
+
+    async def lookup(self, filepath: Path, host: str) -> Optional[str]:
+        """Return the URL of identical bytes already uploaded to ``host``, if any"""
+        try:
+            url = await asyncio.to_thread(self._lookup_sync, filepath, host)
+        except (OSError, sqlite3.Error) as exc:
+            logger.debug(f"Upload ledger lookup skipped for {filepath.name}: {exc}")
+            return None
+
+        if url:
+            self._hits += 1
+        else:
+            self._misses += 1
+        return url
+
+    async def record(self, filepath: Path, host: str, url: str):
+        """Remember a successful upload"""
+        try:
+            await asyncio.to_thread(self._record_sync, filepath, host, url)
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning(f"Could not record {filepath.name} in upload ledger: {exc}")
+
+    def forget_host(self, host: str) -> int:
+        """Drop every entry for a host (e.g. after its uploads were purged)"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM uploads WHERE host = ?", (host,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get ledger size and hit/miss counters for this session"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+        return {
+            "entries": entries,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
@@ -4,6 +4,7 @@ from typing import Optional, List
 from loguru import logger
 
 from .base import BaseHost
+from .retry import parse_retry_after
 from core.models import UploadResult
 
 
@@ -17,44 +18,46 @@ class LensdumpHost(BaseHost):
     async def upload_image(self, filepath: Path) -> UploadResult:
         """Upload image to Lensdump"""
         try:
-            async with aiohttp.ClientSession() as session:
-                with open(filepath, 'rb') as file_handle:
-                    data = aiohttp.FormData()
-                    data.add_field(
-                        'source',
-                        file_handle,
-                        filename=filepath.name,
-                        content_type='image/*',
-                    )
+            session = self.get_session(self.api_url)
+            with open(filepath, 'rb') as file_handle:
+                data = aiohttp.FormData()
+                data.add_field(
+                    'source',
+                    file_handle,
+                    filename=filepath.name,
+                    content_type='image/*',
+                )
 
-                    async with session.post(self.api_url, data=data) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            if result.get('status_code') == 200:
-                                image_url = result['image']['url']
-                                logger.debug(f"Lensdump upload successful: {image_url}")
-                                return UploadResult(
-                                    filename=filepath.name,
-                                    url=image_url,
-                                    success=True
-                                )
-                            else:
-                                error_msg = result.get('error', {}).get('message', 'Unknown error')
-                                return UploadResult(
-                                    filename=filepath.name,
-                                    url="",
-                                    success=False,
-                                    error=f"Lensdump API error: {error_msg}"
-                                )
+                async with session.post(self.api_url, data=data) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        if result.get('status_code') == 200:
+                            image_url = result['image']['url']
+                            logger.debug(f"Lensdump upload successful: {image_url}")
+                            return UploadResult(
+                                filename=filepath.name,
+                                url=image_url,
+                                success=True
+                            )
                         else:
-                            error_text = await response.text()
+                            error_msg = result.get('error', {}).get('message', 'Unknown error')
                             return UploadResult(
                                 filename=filepath.name,
                                 url="",
                                 success=False,
-                                error=f"HTTP {response.status}: {error_text}"
+                                error=f"Lensdump API error: {error_msg}"
                             )
-                        
+                    else:
+                        error_text = await response.text()
+                        return UploadResult(
+                            filename=filepath.name,
+                            url="",
+                            success=False,
+                            error=f"HTTP {response.status}: {error_text}",
+                            status_code=response.status,
+                            retry_after=parse_retry_after(response.headers.get('Retry-After'))
+                        )
+                    
         except Exception as e:
             logger.error(f"Lensdump upload failed for {filepath.name}: {e}")
             return UploadResult(
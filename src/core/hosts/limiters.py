@@ -0,0 +1,635 @@
+import asyncio
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from enum import Enum
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from loguru import logger
+
+from core.models import UploadResult
+
+
+_CONGESTION_STATUS_RE = re.compile(r"\b(429|5\d\d)\b")
+_TIMEOUT_MARKERS = ("timeout", "timed out")
+
+
+def is_congestion_signal(result: Optional[UploadResult]) -> bool:
+    """Check whether an upload outcome means the host is overloaded (429/5xx/timeout)"""
+    if result is None:
+        return True
+    if result.success:
+        return False
+    if result.status_code is not None:
+        return result.status_code == 429 or result.status_code >= 500
+
+    error = (result.error or "").lower()
+    if not error:
+        # httpx timeouts stringify to an empty message
+        return True
+    return bool(_CONGESTION_STATUS_RE.search(error)) or any(marker in error for marker in _TIMEOUT_MARKERS)
+
+
+@dataclass
+class ConcurrencyStats:
+    """Snapshot of an adaptive limiter state"""
+    host: str
+    limit: int
+    min_limit: int
+    max_limit: int
+    in_flight: int
+    successes: int
+    failures: int
+    congestion_events: int
+    increases: int
+    decreases: int
+    avg_latency: float
+    min_latency: float
+    error_rate: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limiter for a single host
+
+    The number of upload slots grows additively (about one slot per full
+    window of healthy completions) while latency stays close to the best
+    observed latency and the error rate is low, and shrinks multiplicatively
+    on congestion signals (429, 5xx, timeouts). At most one decrease is
+    applied per observed round-trip so a burst of failures from requests
+    already in flight does not collapse the limit to the minimum.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        min_limit: int = 1,
+        max_limit: int = 5,
+        initial_limit: Optional[int] = None,
+        backoff_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        max_error_rate: float = 0.1
+    ):
+        self.name = name
+        self.min_limit = max(1, min(min_limit, max_limit))
+        self.max_limit = max(self.min_limit, max_limit)
+        if initial_limit is None:
+            initial_limit = (self.min_limit + self.max_limit + 1) // 2
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+        self._avg_latency = 0.0
+        self._min_latency = 0.0
+        self._error_rate = 0.0
+        self._last_decrease = 0.0
+
+        self._successes = 0
+        self._failures = 0
+        self._congestion_events = 0
+        self._increases = 0
+        self._decreases = 0
+
+    @property
+    def limit(self) -> int:
+        """Current number of concurrent upload slots"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self):
+        """Wait for a free upload slot"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self):
+        """Return an upload slot"""
+        async with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._condition.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.release()
+
+    def record(self, latency: float, success: bool, congested: bool = False):
+        """
+        Feed an upload outcome into the controller (call while holding the slot)
+
+        Args:
+            latency: Wall time of the request in seconds
+            success: Whether the upload succeeded
+            congested: Whether the failure was a congestion signal (429/5xx/timeout)
+        """
+        previous_limit = self.limit
+        self._error_rate = 0.9 * self._error_rate + 0.1 * (0.0 if success else 1.0)
+
+        if success:
+            self._successes += 1
+            self._avg_latency = latency if self._avg_latency == 0 else 0.8 * self._avg_latency + 0.2 * latency
+            if self._min_latency == 0 or latency < self._min_latency:
+                self._min_latency = latency
+            else:
+                # Let the baseline drift up slowly so a permanently slower host can still grow
+                self._min_latency += (latency - self._min_latency) * 0.01
+
+            healthy_latency = latency <= self._min_latency * self.latency_tolerance
+            if healthy_latency and self._error_rate <= self.max_error_rate and self._limit < self.max_limit:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / max(1.0, self._limit))
+        else:
+            self._failures += 1
+            if congested:
+                self._congestion_events += 1
+                now = time.monotonic()
+                window = max(self._avg_latency, 0.1)
+                if now - self._last_decrease >= window and self._limit > self.min_limit:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff_factor)
+                    self._last_decrease = now
+
+        current_limit = self.limit
+        if current_limit > previous_limit:
+            # Waiters are woken by the release() that follows every record()
+            self._increases += 1
+            logger.debug(f"{self.name}: concurrency increased to {current_limit}")
+        elif current_limit < previous_limit:
+            self._decreases += 1
+            logger.info(f"{self.name}: host congestion detected, concurrency reduced to {current_limit}")
+
+    def get_stats(self) -> ConcurrencyStats:
+        """Get a snapshot of the limiter state"""
+        return ConcurrencyStats(
+            host=self.name,
+            limit=self.limit,
+            min_limit=self.min_limit,
+            max_limit=self.max_limit,
+            in_flight=self._in_flight,
+            successes=self._successes,
+            failures=self._failures,
+            congestion_events=self._congestion_events,
+            increases=self._increases,
+            decreases=self._decreases,
+            avg_latency=self._avg_latency,
+            min_latency=self._min_latency,
+            error_rate=self._error_rate
+        )
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every caller of a host
+
+    Callers may take more tokens than the bucket holds (e.g. a large image on a
+    bytes/sec bucket); the bucket then goes into debt and the caller waits for
+    the deficit to refill. The lock keeps waiters in FIFO order.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Take tokens, waiting only if the budget is exhausted; returns seconds waited"""
+        async with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+
+            wait_time = -self._tokens / self.rate
+            await asyncio.sleep(wait_time)
+            self._refill()
+            return wait_time
+
+
+@dataclass
+class RateLimitStats:
+    """Snapshot of a host rate limiter"""
+    host: str
+    requests_per_second: float
+    bytes_per_second: float
+    burst: int
+    acquired: int
+    throttled: int
+    total_wait: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class HostRateLimiter:
+    """Requests/sec and optional bytes/sec budgets for a single host (0 disables a bucket)"""
+
+    def __init__(self, name: str, requests_per_second: float = 0.0, bytes_per_second: float = 0.0,
+                 burst: int = 1):
+        self.name = name
+        self.requests_per_second = requests_per_second
+        self.bytes_per_second = bytes_per_second
+        self.burst = max(1, burst)
+        self._requests = TokenBucket(requests_per_second, self.burst) if requests_per_second > 0 else None
+        # A bytes bucket holds one second of budget, so bursts stay within the configured bandwidth
+        self._bytes = TokenBucket(bytes_per_second, bytes_per_second) if bytes_per_second > 0 else None
+
+        self._acquired = 0
+        self._throttled = 0
+        self._total_wait = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._requests is not None or self._bytes is not None
+
+    async def acquire(self, nbytes: int = 0) -> float:
+        """Reserve budget for one request of ``nbytes``; returns seconds waited"""
+        waited = 0.0
+        if self._requests is not None:
+            waited += await self._requests.acquire(1.0)
+        if self._bytes is not None and nbytes > 0:
+            waited += await self._bytes.acquire(float(nbytes))
+
+        self._acquired += 1
+        if waited > 0:
+            self._throttled += 1
+            self._total_wait += waited
+        return waited
+
+    def get_stats(self) -> RateLimitStats:
+        """Get a snapshot of the rate limiter"""
+        return RateLimitStats(
+            host=self.name,
+            requests_per_second=self.requests_per_second,
+            bytes_per_second=self.bytes_per_second,
+            burst=self.burst,
+            acquired=self._acquired,
+            throttled=self._throttled,
+            total_wait=self._total_wait
+        )
+
+
+@dataclass
+class CreditPool:
+    """Server-reported credit budget (e.g. one X-RateLimit-* family of headers)"""
+    name: str
+    remaining: Optional[float] = None
+    limit: Optional[float] = None
+    reset_at: Optional[float] = None  # Wall-clock time (time.time()) when credits refill
+    reserved: float = 0.0
+
+    @property
+    def available(self) -> Optional[float]:
+        if self.remaining is None:
+            return None
+        return self.remaining - self.reserved
+
+
+class CreditScheduler:
+    """
+    Reserves API credits for every worker of a host before it dispatches
+
+    Budgets come from response headers through ``update``. Requests reserve
+    their cost up front, so concurrent workers cannot all spend the last
+    credits at once. A request that does not fit waits for the pool's reset.
+    Once a pool drops below ``low_watermark`` of its limit, dispatches are
+    spread evenly until the reset. The tail of a chapter then uses the rest of
+    the budget without running dry early and getting 429s.
+    """
+
+    def __init__(self, name: str, low_watermark: float = 0.2, unknown_reset_wait: float = 60.0):
+        self.name = name
+        self.low_watermark = low_watermark
+        self.unknown_reset_wait = unknown_reset_wait
+        self.pools: Dict[str, CreditPool] = {}
+        self._next_dispatch = 0.0
+        self._blocked_until = 0.0
+
+        self._reservations = 0
+        self._waits = 0
+        self._total_wait = 0.0
+
+    def _pool(self, name: str) -> CreditPool:
+        if name not in self.pools:
+            self.pools[name] = CreditPool(name)
+        return self.pools[name]
+
+    def update(self, pool: str, remaining: Optional[float], limit: Optional[float] = None,
+               reset_at: Optional[float] = None):
+        """Record the budget a response reported for ``pool``"""
+        state = self._pool(pool)
+        if remaining is not None:
+            state.remaining = remaining
+        if limit is not None:
+            state.limit = limit
+        if reset_at is not None:
+            state.reset_at = reset_at
+
+    def block_for(self, seconds: float):
+        """Hold every dispatch for ``seconds`` (e.g. after a 429 with Retry-After)"""
+        self._blocked_until = max(self._blocked_until, time.time() + seconds)
+        logger.warning(f"{self.name}: rate limited, pausing uploads for {seconds:.0f}s")
+
+    def _delay(self, costs: Dict[str, float], now: float) -> float:
+        """Seconds until ``costs`` can be dispatched (0 = now)"""
+        delay = max(0.0, self._blocked_until - now, self._next_dispatch - now)
+        for name, cost in costs.items():
+            pool = self._pool(name)
+            if pool.reset_at is not None and now >= pool.reset_at:
+                # The budget refilled; the next response reports the new balance
+                pool.remaining = pool.limit
+                pool.reset_at = None
+
+            available = pool.available
+            if available is None or available >= cost:
+                continue
+            if pool.reserved > 0:
+                # In-flight requests will report a fresher balance shortly
+                delay = max(delay, 0.5)
+            elif pool.reset_at is not None:
+                delay = max(delay, pool.reset_at - now)
+            else:
+                delay = max(delay, self.unknown_reset_wait)
+                pool.remaining = None
+        return delay
+
+    def _pace(self, costs: Dict[str, float], now: float):
+        """Spread the remaining credits of scarce pools until their reset"""
+        interval = 0.0
+        for name, cost in costs.items():
+            pool = self.pools[name]
+            available = pool.available
+            if available is None or not pool.limit or pool.reset_at is None:
+                continue
+            if available >= pool.limit * self.low_watermark:
+                continue
+            requests_left = max(1.0, available / cost)
+            interval = max(interval, (pool.reset_at - now) / requests_left)
+        self._next_dispatch = now + interval
+
+    async def reserve(self, costs: Dict[str, float]) -> float:
+        """Wait until every pool can pay its cost and reserve it; returns seconds waited"""
+        waited = 0.0
+        while True:
+            # Checking and reserving never awaits, so it is atomic on the event loop;
+            # waiters sleep independently and re-check when they wake
+            now = time.time()
+            delay = self._delay(costs, now)
+            if delay <= 0:
+                for name, cost in costs.items():
+                    self.pools[name].reserved += cost
+                self._pace(costs, now)
+                break
+            if waited == 0:
+                logger.info(f"{self.name}: credit budget low, waiting {delay:.1f}s before next upload")
+            await asyncio.sleep(delay)
+            waited += delay
+
+        self._reservations += 1
+        if waited > 0:
+            self._waits += 1
+            self._total_wait += waited
+        return waited
+
+    def release(self, costs: Dict[str, float]):
+        """Return a reservation once its response (and budget headers) arrived"""
+        for name, cost in costs.items():
+            pool = self._pool(name)
+            pool.reserved = max(0.0, pool.reserved - cost)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the known budgets and scheduling counters"""
+        return {
+            "host": self.name,
+            "pools": {name: asdict(pool) for name, pool in self.pools.items()},
+            "reservations": self._reservations,
+            "waits": self._waits,
+            "total_wait": self._total_wait,
+        }
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitStats:
+    """Snapshot of a circuit breaker"""
+    host: str
+    state: str
+    health: float  # 0 (unusable) to 1 (healthy)
+    failure_rate: float
+    slow_rate: float
+    window_calls: int
+    consecutive_failures: int
+    times_opened: int
+    rejected: int
+    open_remaining: float  # Seconds until the next probe is allowed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for a single host
+
+    Upload outcomes and latencies are kept over a sliding window of recent
+    calls. The circuit opens after ``consecutive_failures`` failures in a row or
+    once the failure rate or the rate of calls slower than ``slow_call_seconds``
+    reaches ``failure_rate``. While open, requests fail fast. After the cool-down
+    one probe is let through (half-open): success closes the circuit, failure
+    reopens it with the cool-down doubled up to ``max_open_seconds``.
+
+    A call is slow once it takes ``slow_call_seconds`` plus the time its payload
+    needs at ``slow_call_min_throughput`` bytes/sec, so large pages on a slow
+    link are not mistaken for a stalled host.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        consecutive_failures: int = 5,
+        slow_call_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 600.0,
+        slow_call_min_throughput: float = 0.0
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.consecutive_failures = consecutive_failures
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_min_throughput = slow_call_min_throughput
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max(open_seconds, max_open_seconds)
+
+        self.state = CircuitState.CLOSED
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._open_for = open_seconds
+        self._probe_in_flight = False
+        self._times_opened = 0
+        self._rejected = 0
+
+    def _refresh(self, now: float):
+        if self.state is CircuitState.OPEN and now - self._opened_at >= self._open_for:
+            self.state = CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"{self.name} circuit half-open: probing with one request")
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests are currently being rejected without a probe slot"""
+        self._refresh(time.monotonic())
+        return self.state is CircuitState.OPEN or (self.state is CircuitState.HALF_OPEN and self._probe_in_flight)
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent now (claims the probe when half-open)"""
+        self._refresh(time.monotonic())
+        if self.state is CircuitState.CLOSED:
+            return True
+        if self.state is CircuitState.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self._rejected += 1
+        return False
+
+    async def wait_for_request(self, timeout: float, poll: float = 0.25) -> bool:
+        """
+        Wait until a request may be sent instead of failing fast
+        
+        Sleeps through the cool-down and, while another request holds the
+        half-open probe, until that probe settles. Returns False if the circuit
+        is still rejecting requests after ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self._refresh(time.monotonic())
+            if self.state is CircuitState.CLOSED:
+                return True
+            if self.state is CircuitState.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            now = time.monotonic()
+            if now >= deadline:
+                self._rejected += 1
+                return False
+            if self.state is CircuitState.OPEN:
+                wait = self._opened_at + self._open_for - now
+            else:
+                wait = poll
+            await asyncio.sleep(max(0.0, min(wait, deadline - now)))
+    
+    def abandon(self):
+        """Give the probe back when an allowed request ends without an outcome (e.g. cancelled)"""
+        if self.state is CircuitState.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def slow_threshold(self, nbytes: int = 0) -> float:
+        """Latency from which a call sending ``nbytes`` counts as slow (0 = never)"""
+        if self.slow_call_seconds <= 0:
+            return 0.0
+        if self.slow_call_min_throughput > 0:
+            return self.slow_call_seconds + nbytes / self.slow_call_min_throughput
+        return self.slow_call_seconds
+
+    def record(self, success: bool, latency: float, host_fault: bool = True, nbytes: int = 0):
+        """
+        Feed one request outcome into the breaker
+
+        Args:
+            success: Whether the upload succeeded
+            latency: Wall time of the request in seconds
+            host_fault: Whether a failure is the host's fault (network, 429/5xx) rather
+                than the request's (e.g. a rejected file)
+            nbytes: Size of the request, which extends the slow-call threshold
+        """
+        failed = not success and host_fault
+        threshold = self.slow_threshold(nbytes)
+        slow = threshold > 0 and latency >= threshold
+
+        if self.state is CircuitState.HALF_OPEN:
+            self._probe_in_flight = False
+            if failed or slow:
+                self._trip(escalate=True)
+            else:
+                self.state = CircuitState.CLOSED
+                self._open_for = self.open_seconds
+                self._outcomes.clear()
+                self._consecutive = 0
+                logger.info(f"{self.name} circuit closed: host is responding again")
+            return
+        if self.state is CircuitState.OPEN:
+            return  # Stragglers from before the circuit opened
+
+        self._outcomes.append((failed, slow))
+        self._consecutive = self._consecutive + 1 if failed else 0
+        calls = len(self._outcomes)
+        if self._consecutive >= self.consecutive_failures:
+            self._trip()
+        elif calls >= self.min_calls:
+            failure_rate = sum(1 for failed, _ in self._outcomes if failed) / calls
+            slow_rate = sum(1 for _, slow in self._outcomes if slow) / calls
+            if failure_rate >= self.failure_rate or slow_rate >= self.failure_rate:
+                self._trip()
+
+    def _trip(self, escalate: bool = False):
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._open_for = min(self.max_open_seconds, self._open_for * 2) if escalate else self.open_seconds
+        self._times_opened += 1
+        self._consecutive = 0
+        logger.warning(f"{self.name} circuit open: failing fast for {self._open_for:.0f}s")
+
+    def health(self) -> float:
+        """Health score from 0 (circuit open) to 1 (no recent failures or slow calls)"""
+        self._refresh(time.monotonic())
+        if self.state is CircuitState.OPEN:
+            return 0.0
+        calls = len(self._outcomes)
+        failure_rate = sum(1 for failed, _ in self._outcomes if failed) / calls if calls else 0.0
+        slow_rate = sum(1 for _, slow in self._outcomes if slow) / calls if calls else 0.0
+        score = (1.0 - failure_rate) * (1.0 - 0.5 * slow_rate)
+        return score * 0.5 if self.state is CircuitState.HALF_OPEN else score
+
+    def get_stats(self) -> CircuitStats:
+        now = time.monotonic()
+        health = self.health()
+        calls = len(self._outcomes)
+        return CircuitStats(
+            host=self.name,
+            state=self.state.value,
+            health=health,
+            failure_rate=sum(1 for failed, _ in self._outcomes if failed) / calls if calls else 0.0,
+            slow_rate=sum(1 for _, slow in self._outcomes if slow) / calls if calls else 0.0,
+            window_calls=calls,
+            consecutive_failures=self._consecutive,
+            times_opened=self._times_opened,
+            rejected=self._rejected,
+            open_remaining=max(0.0, self._open_for - (now - self._opened_at))
+            if self.state is CircuitState.OPEN else 0.0
+        )
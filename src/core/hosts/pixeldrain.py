@@ -4,6 +4,7 @@ from typing import Optional, List
 from loguru import logger
 
 from .base import BaseHost
+from .retry import parse_retry_after
 from core.models import UploadResult
 
 
@@ -22,44 +23,46 @@ class PixeldrainHost(BaseHost):
             if self.api_key:
                 headers['Authorization'] = f'Basic {self.api_key}'
 
-            async with aiohttp.ClientSession() as session:
-                with open(filepath, 'rb') as file_handle:
-                    data = aiohttp.FormData()
-                    data.add_field(
-                        'file',
-                        file_handle,
-                        filename=filepath.name,
-                    )
+            session = self.get_session(self.api_url)
+            with open(filepath, 'rb') as file_handle:
+                data = aiohttp.FormData()
+                data.add_field(
+                    'file',
+                    file_handle,
+                    filename=filepath.name,
+                )
 
-                    async with session.post(self.api_url, data=data, headers=headers) as response:
-                        if response.status == 201:  # Pixeldrain returns 201 for successful uploads
-                            result = await response.json()
-                            file_id = result.get('id')
-                            if file_id:
-                                # Pixeldrain direct link format
-                                image_url = f"https://pixeldrain.com/api/file/{file_id}"
-                                logger.debug(f"Pixeldrain upload successful: {image_url}")
-                                return UploadResult(
-                                    filename=filepath.name,
-                                    url=image_url,
-                                    success=True
-                                )
-                            else:
-                                return UploadResult(
-                                    filename=filepath.name,
-                                    url="",
-                                    success=False,
-                                    error="No file ID in response"
-                                )
+                async with session.post(self.api_url, data=data, headers=headers) as response:
+                    if response.status == 201:  # Pixeldrain returns 201 for successful uploads
+                        result = await response.json()
+                        file_id = result.get('id')
+                        if file_id:
+                            # Pixeldrain direct link format
+                            image_url = f"https://pixeldrain.com/api/file/{file_id}"
+                            logger.debug(f"Pixeldrain upload successful: {image_url}")
+                            return UploadResult(
+                                filename=filepath.name,
+                                url=image_url,
+                                success=True
+                            )
                         else:
-                            error_text = await response.text()
                             return UploadResult(
                                 filename=filepath.name,
                                 url="",
                                 success=False,
-                                error=f"HTTP {response.status}: {error_text}"
+                                error="No file ID in response"
                             )
-                        
+                    else:
+                        error_text = await response.text()
+                        return UploadResult(
+                            filename=filepath.name,
+                            url="",
+                            success=False,
+                            error=f"HTTP {response.status}: {error_text}",
+                            status_code=response.status,
+                            retry_after=parse_retry_after(response.headers.get('Retry-After'))
+                        )
+                    
         except Exception as e:
             logger.error(f"Pixeldrain upload failed for {filepath.name}: {e}")
             return UploadResult(
@@ -0,0 +1,108 @@
+import math
+import random
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from core.models import UploadResult
+
+# Only a leading status counts ("HTTP <code>: ..." from our hosts, "Server error '<code> ...'" from
+# httpx's raise_for_status): the rest of the message may quote a response body full of numbers
+_RETRYABLE_STATUS_RE = re.compile(r"^(?:HTTP |(?:Server|Client) error ')(408|425|429|5\d\d)\b")
+# Lower-cased fragments of transient network failures (aiohttp/httpx/OS messages and exception names)
+_TRANSIENT_MARKERS = (
+    "timeout", "timed out", "cannot connect", "connection", "connecterror", "disconnected",
+    "reset by peer", "broken pipe", "temporarily", "remoteprotocolerror", "readerror",
+    "writeerror", "networkerror", "payloaderror", "server disconnected",
+)
+
+
+def is_retryable(result: UploadResult) -> bool:
+    """Classify a failed upload: True for transient (network, 408/429/5xx), False for permanent"""
+    if result.success:
+        return False
+    if result.status_code is not None:
+        return result.status_code in (408, 425, 429) or result.status_code >= 500
+
+    error = (result.error or "").lower()
+    if not error:
+        # Timeouts from both HTTP clients stringify to an empty message
+        return True
+    return bool(_RETRYABLE_STATUS_RE.match(result.error or "")) or any(marker in error for marker in _TRANSIENT_MARKERS)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        from datetime import datetime, timezone
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def failure_from_exception(filename: str, exc: BaseException) -> UploadResult:
+    """Failed UploadResult for an exception, keeping the HTTP status and Retry-After when available"""
+    response: Any = getattr(exc, 'response', None)
+    status_code = getattr(response, 'status_code', None) or getattr(exc, 'status', None)
+    headers = getattr(response, 'headers', None) or getattr(exc, 'headers', None) or {}
+    message = str(exc)
+    return UploadResult(
+        url="",
+        filename=filename,
+        success=False,
+        error=f"{type(exc).__name__}: {message}" if message else type(exc).__name__,
+        status_code=status_code if isinstance(status_code, int) else None,
+        retry_after=parse_retry_after(headers.get('Retry-After')) if hasattr(headers, 'get') else None
+    )
+
+
+@dataclass
+class RetryPolicy:
+    """Attempts and full-jitter exponential backoff for one host"""
+    max_retries: int = 2
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    max_retry_after: float = 300.0  # Longest server-requested wait we honour before giving up
+
+    def delay(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number ``retry`` (0-based)"""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+        if retry_after is not None:
+            return max(retry_after, backoff)
+        return backoff
+
+
+class RetryBudget:
+    """
+    Retries allowed for one chapter
+
+    Caps the extra load a failing host gets: once the budget is spent, failures
+    are final and the chapter finishes instead of hammering the host.
+    """
+
+    def __init__(self, total: int):
+        self.total = max(0, total)
+        self.spent = 0
+
+    @classmethod
+    def for_chapter(cls, page_count: int, ratio: float, minimum: int = 3) -> "RetryBudget":
+        """Budget proportional to the chapter size; a ratio of 0 disables retries within chapters"""
+        return cls(max(minimum, math.ceil(page_count * ratio)) if ratio > 0 else 0)
+
+    def try_spend(self) -> bool:
+        if self.spent >= self.total:
+            return False
+        self.spent += 1
+        return True
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.spent
@@ -0,0 +1,206 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Set, Tuple, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import httpx
+from loguru import logger
+
+
+def http2_available() -> bool:
+    """Whether httpx can speak HTTP/2 (needs the optional ``h2`` package)"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def _close_quietly(close: Callable[[], Awaitable[None]], label: str) -> bool:
+    try:
+        await close()
+        return True
+    except Exception as exc:
+        logger.debug(f"Error closing {label}: {exc}")
+        return False
+
+
+def _close_stale(loop: asyncio.AbstractEventLoop, close: Callable[[], Awaitable[None]], label: str,
+                 closing: Set[asyncio.Task]) -> None:
+    """
+    Close a session or client bound to another event loop instead of leaking it
+    
+    While its loop still runs (in another thread) it is closed there; otherwise
+    it is closed from the running loop, which releases whatever the stopped or
+    closed loop still allows. Closes scheduled here are tracked in ``closing``.
+    """
+    if loop.is_running() and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(_close_quietly(close, label), loop)
+        return
+    task = asyncio.get_running_loop().create_task(_close_quietly(close, label))
+    closing.add(task)
+    task.add_done_callback(closing.discard)
+
+
+@dataclass(frozen=True)
+class SessionPoolOptions:
+    """Connection pool settings for a pooled aiohttp session"""
+    pool_size: int = 20
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+    timeout: float = 300.0
+    http2: bool = False  # httpx-based hosts only
+
+
+class SessionRegistry:
+    """Process-wide registry of pooled aiohttp sessions keyed by (host, base URL)
+
+    Sessions are bound to the event loop that created them, so a session is
+    transparently recreated when it is requested from a different loop; the
+    old one is closed rather than left with its pooled connections open.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[Tuple[str, str], Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+        self._closing: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def base_url(url: str) -> str:
+        """Reduce a request URL to its scheme://netloc origin"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def get_session(self, host_name: str, url: str,
+                    options: Optional[SessionPoolOptions] = None) -> aiohttp.ClientSession:
+        """Return the warm session for host/base URL, creating it on first use"""
+        key = (host_name, self.base_url(url))
+        loop = asyncio.get_running_loop()
+
+        entry = self._sessions.get(key)
+        if entry is not None:
+            session_loop, session = entry
+            if session_loop is loop and not session.closed:
+                return session
+            if session_loop is not loop and not session.closed:
+                _close_stale(session_loop, session.close, f"session for {host_name} @ {key[1]}", self._closing)
+
+        options = options or SessionPoolOptions()
+        connector = aiohttp.TCPConnector(
+            limit=options.pool_size,
+            limit_per_host=options.pool_size,
+            keepalive_timeout=options.keepalive_timeout,
+            use_dns_cache=options.dns_cache_ttl > 0,
+            ttl_dns_cache=options.dns_cache_ttl or None,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=options.timeout),
+        )
+        self._sessions[key] = (loop, session)
+        logger.debug(f"Opened pooled session for {host_name} @ {key[1]} (pool_size={options.pool_size})")
+        return session
+
+    @property
+    def session_count(self) -> int:
+        """Number of sessions currently tracked"""
+        return len(self._sessions)
+
+    async def close_all(self):
+        """Close every session, including those bound to another event loop"""
+        loop = asyncio.get_running_loop()
+        sessions = list(self._sessions.items())
+        self._sessions.clear()
+
+        closed = 0
+        for (host_name, base_url), (session_loop, session) in sessions:
+            if session.closed:
+                continue
+            label = f"session for {host_name} @ {base_url}"
+            if session_loop is not loop:
+                _close_stale(session_loop, session.close, label, self._closing)
+            elif await _close_quietly(session.close, label):
+                closed += 1
+        if self._closing:
+            await asyncio.gather(*self._closing)
+
+        if closed:
+            logger.info(f"Closed {closed} pooled host sessions")
+
+
+class HttpClientRegistry:
+    """Process-wide registry of pooled httpx clients keyed by host name
+
+    With HTTP/2 enabled, concurrent uploads are multiplexed as streams over a
+    few connections (httpx negotiates via ALPN and silently uses HTTP/1.1 with
+    servers that lack HTTP/2). Like aiohttp sessions, clients are bound to the
+    event loop that created them, and closed when they are replaced.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self._warned_http2 = False
+
+    def _use_http2(self, host_name: str, requested: bool) -> bool:
+        if not requested:
+            return False
+        if http2_available():
+            return True
+        if not self._warned_http2:
+            logger.warning(f"HTTP/2 requested for {host_name} but the 'h2' package is not installed; "
+                           "using HTTP/1.1 (pip install 'httpx[http2]')")
+            self._warned_http2 = True
+        return False
+
+    def get_client(self, host_name: str, options: Optional[SessionPoolOptions] = None) -> httpx.AsyncClient:
+        """Return the warm client for a host, creating it on first use"""
+        loop = asyncio.get_running_loop()
+
+        entry = self._clients.get(host_name)
+        if entry is not None:
+            client_loop, client = entry
+            if client_loop is loop and not client.is_closed:
+                return client
+            if client_loop is not loop and not client.is_closed:
+                _close_stale(client_loop, client.aclose, f"HTTP client for {host_name}", self._closing)
+
+        options = options or SessionPoolOptions()
+        http2 = self._use_http2(host_name, options.http2)
+        # The connection cap still matters when a server answers with HTTP/1.1
+        limits = httpx.Limits(
+            max_connections=options.pool_size,
+            max_keepalive_connections=options.pool_size,
+            keepalive_expiry=options.keepalive_timeout,
+        )
+        client = httpx.AsyncClient(timeout=options.timeout, limits=limits, http2=http2)
+        self._clients[host_name] = (loop, client)
+        logger.debug(f"Opened pooled {'HTTP/2' if http2 else 'HTTP/1.1'} client for {host_name} "
+                     f"(pool_size={options.pool_size})")
+        return client
+
+    @property
+    def client_count(self) -> int:
+        """Number of clients currently tracked"""
+        return len(self._clients)
+
+    async def close_all(self):
+        """Close every client, including those bound to another event loop"""
+        loop = asyncio.get_running_loop()
+        clients = list(self._clients.items())
+        self._clients.clear()
+
+        closed = 0
+        for host_name, (client_loop, client) in clients:
+            if client.is_closed:
+                continue
+            label = f"HTTP client for {host_name}"
+            if client_loop is not loop:
+                _close_stale(client_loop, client.aclose, label, self._closing)
+            elif await _close_quietly(client.aclose, label):
+                closed += 1
+        if self._closing:
+            await asyncio.gather(*self._closing)
+
+        if closed:
+            logger.info(f"Closed {closed} pooled HTTP clients")
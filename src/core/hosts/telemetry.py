@@ -0,0 +1,243 @@
+import bisect
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+@dataclass
+class UploadSample:
+    """Timing and outcome of one upload_image call"""
+    host: str
+    filename: str
+    started_at: float  # Wall-clock time
+    duration: float
+    bytes_sent: int
+    success: bool
+    status_code: Optional[int] = None
+    retries: int = 0
+    error: Optional[str] = None
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second for this request"""
+        return self.bytes_sent / self.duration if self.duration > 0 else 0.0
+
+
+class RollingHistogram:
+    """
+    Log-bucketed histogram over a sliding time window
+
+    Values land in buckets growing by ``growth`` per step (about 10% relative
+    error on percentiles at the default). Counts are kept per time slot and
+    slots older than the window are dropped, so memory does not depend on the
+    number of samples.
+    """
+
+    def __init__(self, window: float = 900.0, slot: float = 60.0, minimum: float = 1e-3,
+                 maximum: float = 1e9, growth: float = 1.2):
+        self.window = window
+        self.slot = slot
+        steps = int(math.ceil(math.log(maximum / minimum, growth)))
+        self.edges = [minimum * growth ** i for i in range(steps + 1)]
+        self._slots: Deque[tuple] = deque()  # (slot start, bucket counts)
+
+    def _expire(self, now: float):
+        while self._slots and self._slots[0][0] <= now - self.window:
+            self._slots.popleft()
+
+    def add(self, value: float, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self._expire(now)
+        slot_start = now - now % self.slot
+        if not self._slots or self._slots[-1][0] != slot_start:
+            self._slots.append((slot_start, [0] * (len(self.edges) + 1)))
+        self._slots[-1][1][bisect.bisect_left(self.edges, value)] += 1
+
+    def _merged(self, now: Optional[float] = None) -> List[int]:
+        self._expire(time.time() if now is None else now)
+        merged = [0] * (len(self.edges) + 1)
+        for _, counts in self._slots:
+            for i, count in enumerate(counts):
+                merged[i] += count
+        return merged
+
+    def count(self, now: Optional[float] = None) -> int:
+        return sum(self._merged(now))
+
+    def percentile(self, q: float, now: Optional[float] = None) -> float:
+        """Approximate ``q``-th percentile (0-100) of values in the window; 0 when empty"""
+        merged = self._merged(now)
+        total = sum(merged)
+        if total == 0:
+            return 0.0
+        rank = max(1, math.ceil(total * q / 100.0))
+        seen = 0
+        for i, count in enumerate(merged):
+            seen += count
+            if seen >= rank:
+                return self.edges[min(i, len(self.edges) - 1)]
+        return self.edges[-1]
+
+
+@dataclass
+class HostTelemetryStats:
+    """Aggregated upload telemetry for one host"""
+    host: str
+    requests: int
+    successes: int
+    failures: int
+    retries: int
+    hedges: int  # Duplicate requests issued for slow uploads
+    hedge_wins: int  # Hedges that finished before the original request
+    bytes_sent: int
+    window_requests: int
+    latency_p50: float
+    latency_p95: float
+    latency_p99: float
+    throughput_p50: float  # Per-request bytes/sec
+    bytes_per_second: float  # Aggregate over the window
+    busy_workers: float  # Average uploads in flight over the window
+    error_rate: float
+    status_codes: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class HostTelemetry:
+    """Rolling per-request upload telemetry for one host"""
+
+    def __init__(self, name: str, window: float = 900.0, sample_history: int = 500):
+        self.name = name
+        self.window = window
+        self._lock = threading.Lock()
+        self.latency = RollingHistogram(window)
+        self.throughput = RollingHistogram(window, minimum=1.0, maximum=1e10)
+        self._recent: Deque[UploadSample] = deque(maxlen=sample_history)
+        # (finished_at, bytes, duration, success) over the window, for aggregate rates
+        self._window_samples: Deque[tuple] = deque()
+
+        self._requests = 0
+        self._successes = 0
+        self._failures = 0
+        self._retries = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._bytes_sent = 0
+        self._status_codes: Dict[str, int] = {}
+
+    def record(self, sample: UploadSample):
+        """Add one upload to the histograms and counters"""
+        now = sample.started_at + sample.duration
+        with self._lock:
+            self.latency.add(sample.duration, now)
+            if sample.success and sample.bytes_sent:
+                self.throughput.add(sample.throughput, now)
+            self._recent.append(sample)
+            self._window_samples.append((now, sample.bytes_sent if sample.success else 0,
+                                         sample.duration, sample.success))
+
+            self._requests += 1
+            self._retries += sample.retries
+            if sample.success:
+                self._successes += 1
+                self._bytes_sent += sample.bytes_sent
+            else:
+                self._failures += 1
+            status = str(sample.status_code) if sample.status_code is not None else ("ok" if sample.success else "error")
+            self._status_codes[status] = self._status_codes.get(status, 0) + 1
+
+    def record_hedge(self, won: bool):
+        """Count a hedged upload and whether the duplicate request won"""
+        with self._lock:
+            self._hedges += 1
+            if won:
+                self._hedge_wins += 1
+
+    def latency_percentile(self, q: float) -> Tuple[float, int]:
+        """``q``-th percentile of request latency in the window and the number of samples behind it"""
+        now = time.time()
+        with self._lock:
+            return self.latency.percentile(q, now), self.latency.count(now)
+
+    def get_stats(self) -> HostTelemetryStats:
+        """Get a snapshot of the aggregated telemetry"""
+        now = time.time()
+        with self._lock:
+            while self._window_samples and self._window_samples[0][0] <= now - self.window:
+                self._window_samples.popleft()
+            window_samples = list(self._window_samples)
+
+            if window_samples:
+                first_start = min(finished - duration for finished, _, duration, _ in window_samples)
+                elapsed = max(now - max(first_start, now - self.window), 1e-6)
+                window_bytes = sum(nbytes for _, nbytes, _, _ in window_samples)
+                busy_time = sum(duration for _, _, duration, _ in window_samples)
+                failures = sum(1 for *_, success in window_samples if not success)
+                bytes_per_second = window_bytes / elapsed
+                busy_workers = busy_time / elapsed
+                error_rate = failures / len(window_samples)
+            else:
+                bytes_per_second = busy_workers = error_rate = 0.0
+
+            return HostTelemetryStats(
+                host=self.name,
+                requests=self._requests,
+                successes=self._successes,
+                failures=self._failures,
+                retries=self._retries,
+                hedges=self._hedges,
+                hedge_wins=self._hedge_wins,
+                bytes_sent=self._bytes_sent,
+                window_requests=len(window_samples),
+                latency_p50=self.latency.percentile(50, now),
+                latency_p95=self.latency.percentile(95, now),
+                latency_p99=self.latency.percentile(99, now),
+                throughput_p50=self.throughput.percentile(50, now),
+                bytes_per_second=bytes_per_second,
+                busy_workers=busy_workers,
+                error_rate=error_rate,
+                status_codes=dict(self._status_codes)
+            )
+
+    def recent_samples(self) -> List[UploadSample]:
+        with self._lock:
+            return list(self._recent)
+
+
+class TelemetryRegistry:
+    """Per-host telemetry shared by every instance of a host"""
+
+    def __init__(self):
+        self._hosts: Dict[str, HostTelemetry] = {}
+        self._lock = threading.Lock()
+
+    def for_host(self, name: str) -> HostTelemetry:
+        with self._lock:
+            if name not in self._hosts:
+                self._hosts[name] = HostTelemetry(name)
+            return self._hosts[name]
+
+    def get_stats(self) -> Dict[str, HostTelemetryStats]:
+        with self._lock:
+            hosts = list(self._hosts.values())
+        return {telemetry.name: telemetry.get_stats() for telemetry in hosts}
+
+    def export(self, include_samples: bool = True) -> Dict[str, Any]:
+        """Serializable view of every host (aggregates plus recent raw samples)"""
+        with self._lock:
+            hosts = list(self._hosts.values())
+        data: Dict[str, Any] = {}
+        for telemetry in hosts:
+            entry: Dict[str, Any] = {"stats": telemetry.get_stats().to_dict()}
+            if include_samples:
+                entry["samples"] = [asdict(sample) for sample in telemetry.recent_samples()]
+            data[telemetry.name] = entry
+        return data
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
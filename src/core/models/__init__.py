@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 from enum import Enum
 from pathlib import Path
 from utils.helpers import natural_sort_key
@@ -201,6 +201,10 @@ class UploadResult:
     filename: str
     success: bool = True
     error: Optional[str] = None
+    status_code: Optional[int] = None  # HTTP status of the failed request, when known
+    retries: int = 0  # Extra attempts made before this outcome
+    retry_after: Optional[float] = None  # Server-requested wait (Retry-After) in seconds
+    host: Optional[str] = None  # Host that produced this outcome
 
 
 @dataclass
@@ -209,4 +213,9 @@ class ChapterUploadResult:
     album_url: str
     image_urls: List[str]
     failed_uploads: List[str]
-    success: bool = True
\ No newline at end of file
+    success: bool = True
+    bytes_saved: int = 0  # Saved by pre-upload optimization
+    retries: int = 0  # Extra upload attempts across all pages
+    host: str = ""  # Primary host of the chapter
+    failover_uploads: int = 0  # Pages uploaded to a fallback host instead
+    mirrors: Dict[str, List[str]] = field(default_factory=dict)  # Host name -> complete mirror URLs
\ No newline at end of file
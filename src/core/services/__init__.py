@@ -1,5 +1,5 @@
 from .uploader import MangaUploaderService
-from .queue import UploadQueue, Job, JobStatus
+from .queue import UploadQueue, Job, JobPriority, JobStatus
 from .github import GitHubService
 
-__all__ = ['MangaUploaderService', 'UploadQueue', 'Job', 'JobStatus', 'GitHubService']
\ No newline at end of file
+__all__ = ['MangaUploaderService', 'UploadQueue', 'Job', 'JobPriority', 'JobStatus', 'GitHubService']
\ No newline at end of file
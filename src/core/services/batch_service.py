@@ -6,12 +6,18 @@ Handles queuing, processing, and monitoring of bulk upload operations
 import asyncio
 import time
 import uuid
-from typing import Dict, List, Optional, Any, Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Callable, Sequence, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 from loguru import logger
 
-from core.models import Manga
+from core.models import Chapter, ChapterUploadResult, Manga, UploadResult
+from core.services.job_store import JobStore, BATCH_SOURCE
+
+if TYPE_CHECKING:
+    from core.config import AppConfig
+    from core.services.uploader import MangaUploaderService
 
 
 class BatchJobStatus(Enum):
@@ -46,6 +52,9 @@ class BatchJobItem:
     start_time: Optional[float] = None
     completion_time: Optional[float] = None
     upload_results: Dict[str, Any] = field(default_factory=dict)
+    metadata_path: Optional[str] = None  # JSON written for the uploaded chapters
+    hosts: List[str] = field(default_factory=list)  # Upload chain, primary first (empty = uploader default)
+    mirror: bool = False  # Mirror every chapter to the second host of the chain
     
     @property
     def duration_seconds(self) -> float:
@@ -127,7 +136,8 @@ class BatchService:
     - Statistics and performance monitoring
     """
     
-    def __init__(self, max_concurrent_jobs: int = 2, max_concurrent_items: int = 3):
+    def __init__(self, max_concurrent_jobs: int = 2, max_concurrent_items: int = 3,
+                 store: Optional[JobStore] = None):
         self.max_concurrent_jobs = max_concurrent_jobs
         self.max_concurrent_items = max_concurrent_items
         
@@ -147,6 +157,16 @@ class BatchService:
         self._job_completed_callback: Optional[Callable[[str, BatchJob], None]] = None
         self._item_completed_callback: Optional[Callable[[str, str, BatchJobItem], None]] = None
         
+        # Uploads go through the interactive uploader so hosts share their limiters
+        self.uploader: Optional["MangaUploaderService"] = None
+        self.config: Optional[Callable[[], "AppConfig"]] = None
+        
+        # Durable state
+        self.store: Optional[JobStore] = None
+        self._stored_status: Dict[str, BatchJobStatus] = {}
+        self._restored = False
+        self.set_store(store)
+        
         logger.info(f"BatchService initialized: {max_concurrent_jobs} concurrent jobs, "
                    f"{max_concurrent_items} concurrent items")
     
@@ -159,6 +179,10 @@ class BatchService:
 
             self._is_running = True
 
+            if self.store is not None and not self._restored:
+                self._restored = True
+                await self._restore_jobs()
+
             # Start worker tasks
             for i in range(self.max_concurrent_jobs):
                 task = asyncio.create_task(self._job_worker(f"worker-{i}"))
@@ -210,6 +234,10 @@ class BatchService:
                 await asyncio.gather(*self._worker_tasks, return_exceptions=True)
 
             self._worker_tasks.clear()
+            for job in self.jobs.values():
+                self._persist(job, "service stopped")
+            if self.store is not None:
+                await self.store.flush()
             if paused_jobs or returned_to_pending:
                 logger.info(
                     f"Batch service state normalized on stop: {paused_jobs} running->paused, "
@@ -221,7 +249,9 @@ class BatchService:
         self,
         title: str,
         manga_list: List[Dict[str, Any]],
-        description: str = ""
+        description: str = "",
+        hosts: Optional[Sequence[str]] = None,
+        mirror: bool = False
     ) -> str:
         """
         Create a new batch upload job
@@ -231,11 +261,18 @@ class BatchService:
             manga_list: List of manga with selected chapters
                        Format: [{"manga": Manga, "chapters": [Chapter]}]
             description: Job description
+            hosts: Upload chain of every item, primary host first (the uploader's
+                   default chain at creation time when omitted)
+            mirror: Mirror every chapter to the second host of the chain
             
         Returns:
             Job ID
         """
         job_id = str(uuid.uuid4())
+        # Items keep their chain, so later host changes do not move jobs already created
+        if hosts is None and self.uploader is not None:
+            hosts = [host.name for host in self.uploader.host_chain]
+            mirror = self.uploader.mirror
         
         # Create job items
         items = []
@@ -248,6 +285,8 @@ class BatchService:
                 manga_title=manga.title,
                 manga_path=str(manga.path),
                 chapters_selected=[ch.name for ch in selected_chapters],
+                hosts=list(hosts or []),
+                mirror=mirror,
             )
             items.append(item)
         
@@ -261,6 +300,7 @@ class BatchService:
         )
         
         self.jobs[job_id] = job
+        self._persist_new(job)
         
         logger.info(f"Created batch upload job '{title}': {len(items)} items")
         return job_id
@@ -310,6 +350,7 @@ class BatchService:
         job.metadata_template = metadata_template
         
         self.jobs[job_id] = job
+        self._persist_new(job)
         
         logger.info(f"Created batch metadata job '{title}': {len(items)} items")
         return job_id
@@ -340,6 +381,7 @@ class BatchService:
         try:
             job.status = BatchJobStatus.QUEUED
             await self.job_queue.put(job_id)
+            self._persist(job)
             logger.info(f"Job submitted to queue: {job.title}")
             return True
         except Exception as e:
@@ -364,6 +406,7 @@ class BatchService:
         job = self.jobs[job_id]
         if job.status == BatchJobStatus.RUNNING:
             job.status = BatchJobStatus.PAUSED
+            self._persist(job)
             logger.info(f"Job paused: {job.title}")
             return True
         
@@ -391,6 +434,7 @@ class BatchService:
                     item.status = BatchJobStatus.PENDING
                     item.start_time = None
                     item.completion_time = None
+            self._persist(job)
             logger.info(f"Job resumed: {job.title}")
             return True
         
@@ -418,6 +462,7 @@ class BatchService:
             for item in job.items:
                 if not item.is_complete:
                     item.status = BatchJobStatus.CANCELLED
+            self._persist(job)
             
             logger.info(f"Job cancelled: {job.title}")
             return True
@@ -436,6 +481,15 @@ class BatchService:
         """Get jobs by status"""
         return [job for job in self.jobs.values() if job.status == status]
     
+    def get_job_history(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Finished jobs from the job store (including deleted ones), most recent first"""
+        if self.store is None:
+            return []
+        history = self.store.history(BATCH_SOURCE, limit=limit, offset=offset)
+        for entry in history:
+            entry["items"] = self.store.get_items(entry["job_id"])
+        return history
+    
     def get_queue_status(self) -> Dict[str, Any]:
         """Get current queue status"""
         running_jobs = len(self.get_jobs_by_status(BatchJobStatus.RUNNING))
@@ -482,15 +536,143 @@ class BatchService:
         
         job = self.jobs[job_id]
         if job.status in [BatchJobStatus.COMPLETED, BatchJobStatus.FAILED, BatchJobStatus.CANCELLED]:
+            # The stored record stays as history
             del self.jobs[job_id]
+            self._stored_status.pop(job_id, None)
             logger.info(f"Job deleted: {job.title}")
             return True
         
         logger.warning(f"Cannot delete active job: {job.title}")
         return False
     
+    def set_uploader(self, uploader: Optional["MangaUploaderService"],
+                     config: Optional[Callable[[], "AppConfig"]] = None):
+        """
+        Upload batch items through ``uploader``
+        
+        Passing the service used for interactive uploads means batch and
+        interactive uploads share the same host instances, and so the same rate
+        limiters, concurrency limits and circuit breakers. ``config`` returns the
+        live application config: every item reads its pipeline depth and writes
+        its metadata JSON (output folder and update mode) from it the same way as
+        single-manga uploads, so saved settings apply from the next item on.
+        Without it, items upload one chapter at a time and write no JSON.
+        """
+        self.uploader = uploader
+        self.config = config
+    
+    def _upload_settings(self) -> Tuple[int, Optional[Path], str]:
+        """Pipeline depth, metadata output folder and JSON update mode from the live config"""
+        if self.config is None:
+            return 1, None, "add"
+        config = self.config()
+        return max(1, config.upload_pipeline_depth), config.output_folder, config.json_update_mode
+    
     # Private methods
     
+    def set_store(self, store: Optional[JobStore]):
+        """Persist jobs in ``store``; unfinished ones are reloaded on the next service start"""
+        self.store = store
+        self._restored = False
+    
+    @staticmethod
+    def _item_record(position: int, item: BatchJobItem) -> Dict[str, Any]:
+        return {
+            "item_id": item.item_id,
+            "position": position,
+            "manga_title": item.manga_title,
+            "manga_path": item.manga_path,
+            "chapters": item.chapters_selected,
+            "status": item.status.value,
+            "progress": item.progress,
+            "error": item.error_message,
+            "start_time": item.start_time,
+            "completion_time": item.completion_time,
+            "results": item.upload_results,
+            "metadata_path": item.metadata_path,
+            "hosts": item.hosts,
+            "mirror": item.mirror,
+        }
+    
+    def _persist_new(self, job: BatchJob):
+        if self.store is None:
+            return
+        self.store.save_job(
+            job.job_id, BATCH_SOURCE, job.job_type.value, job.status.value,
+            title=job.title,
+            payload={"description": job.description, "metadata_template": job.metadata_template},
+            created_at=job.created_time
+        )
+        self.store.save_items(job.job_id, [self._item_record(i, item) for i, item in enumerate(job.items)])
+        self._stored_status[job.job_id] = job.status
+    
+    def _persist(self, job: BatchJob, detail: Optional[str] = None):
+        """Write the job's state and its items; the status history only grows when the status changes"""
+        if self.store is None:
+            return
+        status = job.status if self._stored_status.get(job.job_id) != job.status else None
+        self.store.update_job(
+            job.job_id, status.value if status else None, detail,
+            progress=job.total_progress, started_at=job.start_time, completed_at=job.completion_time
+        )
+        self.store.save_items(job.job_id, [self._item_record(i, item) for i, item in enumerate(job.items)])
+        self._stored_status[job.job_id] = job.status
+    
+    async def _restore_jobs(self):
+        """Reload unfinished jobs; interrupted ones come back paused and queued ones pending"""
+        unfinished = (BatchJobStatus.PENDING, BatchJobStatus.QUEUED, BatchJobStatus.RUNNING, BatchJobStatus.PAUSED)
+        restored = 0
+        rows = await asyncio.to_thread(self.store.load_jobs, BATCH_SOURCE, [status.value for status in unfinished])
+        for row in rows:
+            if row["job_id"] in self.jobs:
+                continue
+            payload = row["payload"] or {}
+            items = []
+            for record in await asyncio.to_thread(self.store.get_items, row["job_id"]):
+                item = BatchJobItem(
+                    item_id=record["item_id"],
+                    manga_title=record["manga_title"],
+                    manga_path=record["manga_path"],
+                    chapters_selected=record["chapters"] or [],
+                    status=BatchJobStatus(record["status"]),
+                    progress=record["progress"],
+                    error_message=record["error"],
+                    start_time=record["start_time"],
+                    completion_time=record["completion_time"],
+                    upload_results=record["results"] or {},
+                    metadata_path=record["metadata_path"],
+                    hosts=record["hosts"] or [],
+                    mirror=bool(record["mirror"])
+                )
+                if item.status == BatchJobStatus.RUNNING:
+                    item.status = BatchJobStatus.PAUSED
+                    item.completion_time = None
+                items.append(item)
+
+            job = BatchJob(
+                job_id=row["job_id"],
+                job_type=BatchJobType(row["kind"]),
+                title=row["title"] or "",
+                description=payload.get("description", ""),
+                items=items,
+                status=BatchJobStatus(row["status"]),
+                created_time=row["created_at"],
+                start_time=row["started_at"],
+                total_progress=row["progress"],
+                metadata_template=payload.get("metadata_template")
+            )
+            if job.status == BatchJobStatus.RUNNING:
+                job.status = BatchJobStatus.PAUSED
+            elif job.status == BatchJobStatus.QUEUED:
+                job.status = BatchJobStatus.PENDING
+
+            self.jobs[job.job_id] = job
+            self._stored_status[job.job_id] = BatchJobStatus(row["status"])
+            self._persist(job, "rehydrated")
+            restored += 1
+        if restored:
+            logger.info(f"Rehydrated {restored} unfinished batch jobs")
+    
     async def _job_worker(self, worker_name: str):
         """Worker task for processing batch jobs"""
         logger.debug(f"Batch worker {worker_name} started")
@@ -544,6 +726,7 @@ class BatchService:
             # Update job status
             job.status = BatchJobStatus.RUNNING
             job.start_time = time.time()
+            self._persist(job)
             
             try:
                 if job.job_type == BatchJobType.UPLOAD:
@@ -579,6 +762,8 @@ class BatchService:
                 job.completion_time = time.time()
                 logger.error(f"Job failed: {job.title} - {e}")
             
+            self._persist(job)
+            
             # Notify completion
             if self._job_completed_callback:
                 try:
@@ -628,28 +813,45 @@ class BatchService:
             item.start_time = time.time()
             
             try:
-                # Simulate upload process (replace with actual upload logic)
-                # Load manga and chapters
-                # This would integrate with the actual upload service
-                
-                # Simulate upload with progress
-                for progress in range(0, 101, 10):
+                results = await self._upload_item(job, item)
+                if results is None:
+                    # Paused or cancelled between images
                     if job.status == BatchJobStatus.CANCELLED:
                         item.status = BatchJobStatus.CANCELLED
-                        return
-                    if job.status == BatchJobStatus.PAUSED:
+                        item.completion_time = time.time()
+                    else:
                         item.status = BatchJobStatus.PAUSED
-                        return
-                    
-                    item.progress = float(progress)
-                    await asyncio.sleep(0.1)  # Simulate work
+                        item.completion_time = None
+                    self._persist(job)
+                    return
                 
-                # Mark as completed
-                item.status = BatchJobStatus.COMPLETED
+                item.upload_results = {
+                    name: {
+                        "success": result.success,
+                        "album_url": result.album_url,
+                        "host": result.host,
+                        "image_urls": result.image_urls,
+                        "mirrors": result.mirrors,
+                        "failed": result.failed_uploads,
+                    }
+                    for name, result in results.items()
+                }
+                _, output_folder, update_mode = self._upload_settings()
+                if output_folder is not None and results:
+                    manga = Manga(title=item.manga_title, path=Path(item.manga_path), chapters=[])
+                    output_path = output_folder / manga.title / f"{manga.title}.json"
+                    saved_path = await self.uploader.generate_metadata(manga, results, output_path, update_mode)
+                    item.metadata_path = str(saved_path)
+                failed_chapters = [name for name, result in results.items() if not result.success]
                 item.completion_time = time.time()
-                item.progress = 100.0
-                
-                logger.debug(f"Upload item completed: {item.manga_title}")
+                if failed_chapters:
+                    item.status = BatchJobStatus.FAILED
+                    item.error_message = f"Failed chapters: {', '.join(failed_chapters)}"
+                    logger.error(f"Upload item failed: {item.manga_title} - {item.error_message}")
+                else:
+                    item.status = BatchJobStatus.COMPLETED
+                    item.progress = 100.0
+                    logger.debug(f"Upload item completed: {item.manga_title}")
                 
             except Exception as e:
                 item.status = BatchJobStatus.FAILED
@@ -662,6 +864,7 @@ class BatchService:
             if total_items > 0:
                 completed_items = sum(1 for i in job.items if i.status == BatchJobStatus.COMPLETED)
                 job.total_progress = (completed_items / total_items) * 100.0
+            self._persist(job)
             
             # Notify progress
             if self._job_progress_callback:
@@ -677,6 +880,61 @@ class BatchService:
                 except Exception as e:
                     logger.error(f"Error in item completion callback: {e}")
     
+    async def _upload_item(self, job: BatchJob, item: BatchJobItem) -> Optional[Dict[str, ChapterUploadResult]]:
+        """
+        Upload an item's chapters, reporting per-image progress into ``item.progress``
+        
+        Returns None when the job was paused or cancelled: the check runs after
+        every image, and pages already uploaded are picked up from the upload
+        journal when the job resumes.
+        """
+        if self.uploader is None:
+            raise RuntimeError("No uploader configured for batch uploads")
+        
+        manga_path = Path(item.manga_path)
+        manga = Manga(title=item.manga_title, path=manga_path, chapters=[])
+        chapters = [Chapter(name=name, path=manga_path / name, images=[]) for name in item.chapters_selected]
+        chapters = [chapter for chapter in chapters if chapter.images]
+        if not chapters:
+            raise ValueError("No chapters with images to upload")
+        
+        total_images = sum(len(chapter.images) for chapter in chapters)
+        finished_images = 0
+        stopped = False
+        upload: Optional[asyncio.Future] = None
+        
+        def on_image_result(image: Path, outcome: Union[UploadResult, BaseException]) -> None:
+            nonlocal finished_images, stopped
+            finished_images += 1
+            item.progress = min(99.0, 100.0 * finished_images / total_images)
+            job.total_progress = sum(i.progress for i in job.items) / len(job.items)
+            if self._job_progress_callback:
+                try:
+                    self._job_progress_callback(job.job_id, job.total_progress)
+                except Exception as e:
+                    logger.error(f"Error in progress callback: {e}")
+            
+            if job.status in (BatchJobStatus.CANCELLED, BatchJobStatus.PAUSED) and not stopped:
+                stopped = True
+                if upload is not None:
+                    upload.cancel()
+        
+        if job.status in (BatchJobStatus.CANCELLED, BatchJobStatus.PAUSED):
+            return None
+        pipeline_depth, _, _ = self._upload_settings()
+        upload = asyncio.ensure_future(self.uploader.upload_manga(
+            manga, chapters, pipeline_depth=pipeline_depth, on_result=on_image_result,
+            hosts=item.hosts or None, mirror=item.mirror
+        ))
+        try:
+            return await upload
+        except asyncio.CancelledError:
+            if not stopped:
+                raise
+            logger.info(f"Upload of {item.manga_title} stopped after {finished_images}/{total_images} images "
+                        f"({job.status.value})")
+            return None
+    
     async def _process_metadata_job(self, job: BatchJob):
         """Process batch metadata update job"""
         # Similar to upload processing but for metadata updates
@@ -0,0 +1,270 @@
+"""
+Durable Job Store
+Persists upload queue and batch jobs in SQLite so they survive restarts and crashes
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+# Job sources sharing the store
+QUEUE_SOURCE = "queue"
+BATCH_SOURCE = "batch"
+
+
+def _dump(value: Any) -> Optional[str]:
+    """JSON for a column; values that cannot be serialized are kept as their repr"""
+    if value is None:
+        return None
+    try:
+        return json.dumps(value, default=str)
+    except (TypeError, ValueError):
+        return json.dumps(repr(value))
+
+
+def _load(value: Optional[str]) -> Any:
+    return json.loads(value) if value else None
+
+
+class JobStore:
+    """
+    SQLite store for job definitions, state transitions and per-item results
+
+    Rows are written on every state change (not on progress ticks), so after a
+    crash or restart unfinished jobs can be rehydrated, and finished jobs stay
+    queryable as history long after they are dropped from memory.
+
+    Called from the event loop, writes run in submission order on a worker
+    thread (through asyncio.to_thread) so commits never block the loop; call
+    ``flush`` to wait for them. Without a running loop they are written at once.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: Optional[asyncio.Task] = None  # Last queued write; each one waits for the previous
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                seq INTEGER NOT NULL DEFAULT 0,
+                kind TEXT NOT NULL,
+                title TEXT,
+                payload TEXT,
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                grp TEXT,
+                cost REAL,
+                progress REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                result TEXT,
+                created_at REAL,
+                started_at REAL,
+                completed_at REAL,
+                updated_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (source, status);
+            CREATE INDEX IF NOT EXISTS jobs_by_completion ON jobs (source, completed_at);
+            CREATE TABLE IF NOT EXISTS job_events (
+                job_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                detail TEXT,
+                at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS job_events_by_job ON job_events (job_id);
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                manga_title TEXT,
+                manga_path TEXT,
+                chapters TEXT,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                start_time REAL,
+                completion_time REAL,
+                results TEXT,
+                metadata_path TEXT,
+                hosts TEXT,
+                mirror INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (job_id, item_id)
+            );
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(job_items)")}
+        # Stores created before items kept their upload chain
+        if "hosts" not in columns:
+            self._conn.execute("ALTER TABLE job_items ADD COLUMN hosts TEXT")
+        if "mirror" not in columns:
+            self._conn.execute("ALTER TABLE job_items ADD COLUMN mirror INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+        logger.debug(f"Job store opened: {db_path}")
+
+    def _write_sync(self, statements: List[tuple]) -> bool:
+        """Run statements in one transaction; failures are logged, never raised"""
+        try:
+            with self._lock:
+                for sql, params in statements:
+                    self._conn.execute(sql, params)
+                self._conn.commit()
+            return True
+        except sqlite3.Error as exc:
+            logger.warning(f"Job store write failed: {exc}")
+            return False
+
+    async def _write_after(self, previous: Optional[asyncio.Task], statements: List[tuple]) -> bool:
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        return await asyncio.to_thread(self._write_sync, statements)
+
+    def _write(self, statements: Iterable[tuple]) -> None:
+        """Queue statements for one transaction, after the writes already queued"""
+        statements = list(statements)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_sync(statements)
+            return
+        self._pending = loop.create_task(self._write_after(self._pending, statements))
+
+    async def flush(self):
+        """Wait until every queued write is committed"""
+        while self._pending is not None:
+            pending = self._pending
+            await asyncio.gather(pending, return_exceptions=True)
+            if self._pending is pending:
+                self._pending = None
+
+    def _read(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        try:
+            with self._lock:
+                cursor = self._conn.execute(sql, params)
+                columns = [column[0] for column in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except sqlite3.Error as exc:
+            logger.warning(f"Job store read failed: {exc}")
+            return []
+
+    @staticmethod
+    def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+        for column in ("payload", "result", "chapters", "results", "hosts"):
+            if column in row:
+                row[column] = _load(row[column])
+        return row
+
+    def save_job(self, job_id: str, source: str, kind: str, status: str, *, seq: int = 0,
+                 title: str = "", payload: Any = None, priority: int = 0, group: Optional[str] = None,
+                 cost: Optional[float] = None, created_at: Optional[float] = None):
+        """Record a job definition (replacing an earlier one with the same id)"""
+        now = time.time()
+        self._write([
+            ("INSERT OR REPLACE INTO jobs (job_id, source, seq, kind, title, payload, status, priority, "
+             "grp, cost, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+             (job_id, source, seq, kind, title, _dump(payload), status, int(priority), group, cost,
+              created_at or now, now)),
+            ("INSERT INTO job_events (job_id, status, detail, at) VALUES (?, ?, ?, ?)",
+             (job_id, status, "created", now)),
+        ])
+
+    def update_job(self, job_id: str, status: Optional[str] = None, detail: Optional[str] = None,
+                   **fields: Any):
+        """
+        Update a job's columns; a new ``status`` is also appended to its event history
+
+        Accepted fields: priority, progress, error, result, started_at, completed_at.
+        """
+        now = time.time()
+        columns = {"updated_at": now}
+        if status is not None:
+            columns["status"] = status
+        for name, value in fields.items():
+            if name not in ("priority", "progress", "error", "result", "started_at", "completed_at"):
+                raise ValueError(f"Unknown job field: {name}")
+            columns[name] = _dump(value) if name == "result" else value
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        statements = [(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*columns.values(), job_id))]
+        if status is not None:
+            statements.append(("INSERT INTO job_events (job_id, status, detail, at) VALUES (?, ?, ?, ?)",
+                               (job_id, status, detail, now)))
+        self._write(statements)
+
+    def save_items(self, job_id: str, items: List[Dict[str, Any]]):
+        """Record or update per-item state (``item_id`` plus item columns) for a job"""
+        self._write([
+            ("INSERT OR REPLACE INTO job_items (job_id, item_id, position, manga_title, manga_path, chapters, "
+             "status, progress, error, start_time, completion_time, results, metadata_path, hosts, mirror) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+             (job_id, item["item_id"], item.get("position", 0), item.get("manga_title"), item.get("manga_path"),
+              _dump(item.get("chapters")), item["status"], item.get("progress", 0.0), item.get("error"),
+              item.get("start_time"), item.get("completion_time"), _dump(item.get("results")),
+              item.get("metadata_path"), _dump(item.get("hosts")), int(bool(item.get("mirror")))))
+            for item in items
+        ])
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._read("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+        return self._decode(rows[0]) if rows else None
+
+    def get_items(self, job_id: str) -> List[Dict[str, Any]]:
+        rows = self._read("SELECT * FROM job_items WHERE job_id = ? ORDER BY position", (job_id,))
+        return [self._decode(row) for row in rows]
+
+    def get_events(self, job_id: str) -> List[Dict[str, Any]]:
+        """State transitions of a job, oldest first"""
+        return self._read("SELECT status, detail, at FROM job_events WHERE job_id = ? ORDER BY rowid", (job_id,))
+
+    def load_jobs(self, source: str, statuses: Iterable[str]) -> List[Dict[str, Any]]:
+        """Jobs of a source in the given states, in submission order (to rehydrate them)"""
+        statuses = list(statuses)
+        placeholders = ", ".join("?" for _ in statuses)
+        rows = self._read(
+            f"SELECT * FROM jobs WHERE source = ? AND status IN ({placeholders}) ORDER BY created_at, seq",
+            (source, *statuses)
+        )
+        return [self._decode(row) for row in rows]
+
+    def history(self, source: Optional[str] = None, status: Optional[str] = None,
+                limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Finished jobs, most recent first"""
+        conditions, params = ["completed_at IS NOT NULL"], []
+        if source is not None:
+            conditions.append("source = ?")
+            params.append(source)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        rows = self._read(
+            f"SELECT * FROM jobs WHERE {' AND '.join(conditions)} ORDER BY completed_at DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        )
+        return [self._decode(row) for row in rows]
+
+    def max_seq(self, source: str) -> int:
+        rows = self._read("SELECT MAX(seq) AS seq FROM jobs WHERE source = ?", (source,))
+        return (rows[0]["seq"] or 0) if rows else 0
+
+    def delete_job(self, job_id: str):
+        """Remove a job and its items and events for good"""
+        self._write([
+            ("DELETE FROM job_items WHERE job_id = ?", (job_id,)),
+            ("DELETE FROM job_events WHERE job_id = ?", (job_id,)),
+            ("DELETE FROM jobs WHERE job_id = ?", (job_id,)),
+        ])
+
+    def close(self):
+        """Close the underlying database (``flush`` first to keep writes still queued)"""
+        if self._pending is not None and not self._pending.done():
+            logger.warning("Job store closed with writes still queued")
+        with self._lock:
+            self._conn.close()
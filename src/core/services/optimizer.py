@@ -0,0 +1,215 @@
+"""
+Pre-upload Image Optimization Service
+Recompresses pages in a process pool ahead of upload and caches the results by content hash
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field, asdict
+from loguru import logger
+
+from core.hosts.ledger import hash_file
+from utils.transcode import ImageTranscoder, transcoder
+
+PIL_FORMATS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG', '.webp': 'WEBP'}
+FORMAT_SUFFIXES = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+# Marker left in a cache entry when the original file was already the best choice
+KEEP_ORIGINAL = '.original'
+OUTPUT_STEM = '.optimized'
+
+
+@dataclass
+class OptimizationOptions:
+    """How pages are recompressed before upload"""
+    output_format: str = "keep"  # "keep", "jpeg" or "webp"
+    quality: int = 85  # JPEG/WebP quality target
+    min_quality: int = 50  # Lowest quality tried to meet a size budget
+    strip_metadata: bool = True
+    png_optimize: bool = True  # Lossless zlib recompression for PNG output
+
+    def cache_key(self, max_bytes: int) -> str:
+        """Short digest identifying these settings plus the size budget"""
+        payload = json.dumps({**asdict(self), "max_bytes": max_bytes}, sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=6).hexdigest()
+
+
+@dataclass
+class ChapterOptimizationReport:
+    """Outcome of optimizing one chapter"""
+    paths: List[Path]
+    original_bytes: int = 0
+    optimized_bytes: int = 0
+    optimized_files: int = 0
+    cache_hits: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(0, self.original_bytes - self.optimized_bytes)
+
+
+def _save(img, target: str, fmt: str, options: Dict[str, Any], quality: int, extra: Dict[str, Any]) -> int:
+    params: Dict[str, Any] = dict(extra)
+    if fmt == 'JPEG':
+        params.update(quality=quality, optimize=True, progressive=True)
+    elif fmt == 'WEBP':
+        params.update(quality=quality, method=6)
+    elif fmt == 'PNG':
+        params.update(optimize=options['png_optimize'])
+    img.save(target, fmt, **params)
+    return os.path.getsize(target)
+
+
+def optimize_image(source: str, target: str, options: Dict[str, Any], max_bytes: int) -> Optional[str]:
+    """
+    Recompress ``source`` into ``target`` (runs in a worker process)
+
+    Returns the format written to ``target``, or None when the original should
+    be uploaded as-is (it is already smaller and within the size budget).
+    """
+    from PIL import Image
+
+    original_size = os.path.getsize(source)
+    source_format = PIL_FORMATS.get(Path(source).suffix.lower(), 'PNG')
+    fmt = source_format if options['output_format'] == 'keep' else options['output_format'].upper()
+
+    with Image.open(source) as img:
+        img.load()
+        extra: Dict[str, Any] = {}
+        if not options['strip_metadata']:
+            for key in ('exif', 'icc_profile'):
+                if img.info.get(key):
+                    extra[key] = img.info[key]
+
+        if fmt == 'JPEG' and img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        quality = options['quality']
+        size = _save(img, target, fmt, options, quality, extra)
+
+        if max_bytes > 0 and size > max_bytes:
+            if fmt == 'PNG':
+                # Lossless output cannot shrink further; switch to a lossy format
+                fmt = 'JPEG'
+                img = img.convert('RGB')
+                size = _save(img, target, fmt, options, quality, extra)
+            while size > max_bytes and quality > options['min_quality']:
+                quality = max(options['min_quality'], quality - 10)
+                size = _save(img, target, fmt, options, quality, extra)
+            while size > max_bytes and min(img.size) > 256:
+                img = img.resize((int(img.width * 0.85), int(img.height * 0.85)), Image.LANCZOS)
+                size = _save(img, target, fmt, options, quality, extra)
+
+    if size >= original_size and (max_bytes <= 0 or original_size <= max_bytes) and fmt == source_format:
+        os.remove(target)
+        return None
+    return fmt
+
+
+class ImageOptimizer:
+    """
+    Optimizes chapter pages ahead of upload
+
+    Outputs are cached under ``cache_dir`` by content hash and settings, so a
+    page is only recompressed once no matter how many times (or to how many
+    hosts with the same size budget) it is uploaded.
+    """
+
+    def __init__(self, cache_dir: Path, options: Optional[OptimizationOptions] = None,
+                 pool: ImageTranscoder = transcoder):
+        self.cache_dir = cache_dir
+        self.options = options or OptimizationOptions()
+        self.pool = pool
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._pending: Dict[Path, asyncio.Future] = {}
+
+    def _cached_output(self, entry: Path) -> tuple[bool, Optional[Path]]:
+        """Look up a finished cache entry: (found, optimized file or None to keep the original)"""
+        if (entry / KEEP_ORIGINAL).exists():
+            return True, None
+        outputs = list(entry.glob(f"{OUTPUT_STEM}.*")) if entry.is_dir() else []
+        if outputs:
+            return True, outputs[0]
+        return False, None
+
+    async def _produce(self, image: Path, entry: Path, max_bytes: int) -> Optional[Path]:
+        entry.mkdir(parents=True, exist_ok=True)
+        partial = entry / f".partial-{uuid.uuid4().hex}"
+        try:
+            fmt = await self.pool.run(optimize_image, str(image), str(partial), asdict(self.options), max_bytes)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+        if fmt is None:
+            (entry / KEEP_ORIGINAL).touch()
+            return None
+        suffix = image.suffix.lower() if PIL_FORMATS.get(image.suffix.lower()) == fmt else FORMAT_SUFFIXES[fmt]
+        output = entry / f"{OUTPUT_STEM}{suffix}"
+        os.replace(partial, output)
+        return output
+
+    def _named_for(self, output: Path, image: Path) -> Path:
+        """Hard link to the optimized file carrying the page's own name (hosts and sorting see it)"""
+        target = output.parent / f"{image.stem}{output.suffix}"
+        if not target.exists():
+            try:
+                os.link(output, target)
+            except FileExistsError:
+                pass
+            except OSError:
+                shutil.copyfile(output, target)
+        return target
+
+    async def optimize(self, image: Path, max_bytes: int = 0) -> tuple[Path, bool]:
+        """Return the path to upload for ``image`` and whether an earlier result was reused"""
+        content_hash = await asyncio.to_thread(hash_file, image)
+        entry = self.cache_dir / content_hash[:2] / f"{content_hash}-{self.options.cache_key(max_bytes)}"
+
+        # Identical pages optimized concurrently share one piece of work
+        pending = self._pending.get(entry)
+        reused = pending is not None
+        output: Optional[Path] = None
+        if pending is None:
+            reused, output = self._cached_output(entry)
+            if not reused:
+                pending = asyncio.ensure_future(self._produce(image, entry, max_bytes))
+                self._pending[entry] = pending
+                pending.add_done_callback(lambda _: self._pending.pop(entry, None))
+        if pending is not None:
+            output = await asyncio.shield(pending)
+
+        if output is None:
+            return image, reused
+        return self._named_for(output, image), reused
+
+    async def optimize_chapter(self, images: List[Path], max_bytes: int = 0) -> ChapterOptimizationReport:
+        """Optimize every page of a chapter; pages that fail are uploaded unchanged"""
+        report = ChapterOptimizationReport(paths=list(images))
+
+        async def run(index: int, image: Path):
+            try:
+                path, cached = await self.optimize(image, max_bytes)
+                original_size = image.stat().st_size
+                optimized_size = path.stat().st_size
+            except Exception as e:
+                logger.warning(f"Could not optimize {image.name}, uploading it unchanged: {e}")
+                report.errors.append(image.name)
+                return
+
+            report.paths[index] = path
+            report.original_bytes += original_size
+            report.optimized_bytes += optimized_size
+            if path != image:
+                report.optimized_files += 1
+            if cached:
+                report.cache_hits += 1
+
+        await asyncio.gather(*(run(i, image) for i, image in enumerate(images)))
+        return report
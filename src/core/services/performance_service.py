@@ -11,6 +11,9 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from loguru import logger
 
+from core.hosts.base import BaseHost
+from core.hosts.telemetry import TelemetryRegistry
+
 
 @dataclass
 class PerformanceMetric:
@@ -96,11 +99,13 @@ class PerformanceService:
     - Dynamic optimization recommendations
     - Automatic worker count optimization
     - System resource monitoring with warnings
+    - Per-host upload throughput and latency telemetry
     """
     
-    def __init__(self, max_history_size: int = 100):
+    def __init__(self, max_history_size: int = 100, upload_telemetry: Optional[TelemetryRegistry] = None):
         self.max_history_size = max_history_size
         self.performance_history: List[PerformanceMetric] = []
+        self.upload_telemetry = upload_telemetry or BaseHost.telemetry_registry
         
         # System monitoring
         self.system_cpu_count = psutil.cpu_count() or 1
@@ -279,6 +284,48 @@ class PerformanceService:
             "system_resources": resource_status
         }
     
+    def get_upload_telemetry(self, host: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Get rolling upload statistics (latency percentiles, bytes/sec, retries) per host"""
+        stats = self.upload_telemetry.get_stats()
+        if host is not None:
+            stats = {name: value for name, value in stats.items() if name == host}
+        return {name: value.to_dict() for name, value in stats.items()}
+    
+    def get_upload_host_ranking(self) -> List[Dict[str, Any]]:
+        """Hosts with recent uploads, fastest aggregate throughput first"""
+        ranking = []
+        for name, stats in self.upload_telemetry.get_stats().items():
+            if stats.window_requests == 0:
+                continue
+            ranking.append({
+                "host": name,
+                "bytes_per_second": stats.bytes_per_second,
+                "latency_p95": stats.latency_p95,
+                "error_rate": stats.error_rate,
+                "busy_workers": stats.busy_workers,
+            })
+        ranking.sort(key=lambda entry: (entry["error_rate"] > 0.1, -entry["bytes_per_second"]))
+        return ranking
+    
+    def export_upload_telemetry(self, export_path: Path, include_samples: bool = True) -> bool:
+        """Export per-host upload telemetry (and recent raw samples) to a JSON file"""
+        try:
+            export_data = {
+                "export_time": time.time(),
+                "hosts": self.upload_telemetry.export(include_samples=include_samples)
+            }
+            
+            import json
+            with open(export_path, 'w', encoding='utf-8') as f:
+                json.dump(export_data, f, indent=2)
+            
+            logger.info(f"Upload telemetry exported to: {export_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error exporting upload telemetry: {e}")
+            return False
+    
     def export_performance_data(self, export_path: Path) -> bool:
         """Export performance data for analysis"""
         try:
@@ -289,7 +336,8 @@ class PerformanceService:
                     "memory_gb": self.system_memory_gb
                 },
                 "performance_history": [asdict(metric) for metric in self.performance_history],
-                "analysis": asdict(self.analyze_performance())
+                "analysis": asdict(self.analyze_performance()),
+                "upload_telemetry": self.upload_telemetry.export(include_samples=False)
             }
             
             import json
@@ -1,10 +1,15 @@
 import asyncio
-from typing import List, Dict, Any, Callable, Optional
-from dataclasses import dataclass
-from enum import Enum
+import json
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import List, Deque, Dict, Any, Callable, Optional
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
 import time
 from loguru import logger
 
+from core.services.job_store import JobStore, QUEUE_SOURCE
+
 
 class JobStatus(Enum):
     PENDING = "pending"
@@ -13,6 +18,17 @@ class JobStatus(Enum):
     FAILED = "failed"
 
 
+class JobPriority(IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+    URGENT = 3
+
+
+JobListener = Callable[["Job"], None]
+JOB_EVENTS = ("progress", "completed", "failed")
+
+
 @dataclass
 class Job:
     id: str
@@ -25,42 +41,378 @@ class Job:
     created_at: Optional[float] = None
     started_at: Optional[float] = None
     completed_at: Optional[float] = None
+    progress: float = 0.0  # 0-1, reported by the task while it runs
+    priority: int = JobPriority.NORMAL
+    group: str = "default"  # Fair-share key, e.g. the manga or host
+    cost: float = 1.0  # Work units charged to the group (e.g. chapters)
+    queued_at: float = 0.0  # Monotonic time the job entered its current priority level
+    task_name: Optional[str] = None  # Registered name of the task when the job is durable
+    _done: asyncio.Event = field(default_factory=asyncio.Event, init=False, repr=False, compare=False)
+    _listeners: Dict[str, List[JobListener]] = field(default_factory=dict, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = time.time()
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+    
+    def subscribe(self, event: str, callback: JobListener) -> Callable[[], None]:
+        """
+        Call ``callback(job)`` on "progress", "completed" or "failed"
+        
+        Subscribing to the outcome of a job that already finished calls back at
+        once. Returns a function that removes the subscription.
+        """
+        if event not in JOB_EVENTS:
+            raise ValueError(f"Unknown job event: {event}")
+        if self.finished:
+            if event == self.status.value:
+                self._call(callback, event)
+            return lambda: None
+        
+        listeners = self._listeners.setdefault(event, [])
+        listeners.append(callback)
+        
+        def unsubscribe():
+            if callback in listeners:
+                listeners.remove(callback)
+        return unsubscribe
+    
+    def set_progress(self, progress: float):
+        """Report task progress (0-1) to subscribers"""
+        if self.finished:
+            return
+        self.progress = max(0.0, min(1.0, progress))
+        self._notify("progress")
+    
+    def finish(self, status: JobStatus, result: Any = None, error: Optional[str] = None):
+        """Record the outcome, wake every waiter and notify subscribers (only the first call counts)"""
+        if self.finished:
+            return
+        self.status = status
+        self.result = result
+        self.error = error
+        self.completed_at = time.time()
+        if status == JobStatus.COMPLETED:
+            self.progress = 1.0
+        self._done.set()
+        self._notify(status.value)
+        self._listeners.clear()
+    
+    async def wait(self, timeout: Optional[float] = None) -> "Job":
+        """Wait until the job completes or fails"""
+        if timeout is None:
+            await self._done.wait()
+        else:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        return self
+    
+    def _call(self, callback: JobListener, event: str):
+        try:
+            callback(self)
+        except Exception as e:
+            logger.error(f"Job {self.id} {event} listener failed: {e}")
+    
+    def _notify(self, event: str):
+        for callback in list(self._listeners.get(event, ())):
+            self._call(callback, event)
+
+
+# Job run by the current worker task, so the task can report its progress
+current_job: ContextVar[Optional[Job]] = ContextVar('current_job', default=None)
+
+
+class _PriorityLevel:
+    """Deficit round robin over the groups queued at one priority level"""
+    
+    def __init__(self):
+        self.groups: Dict[str, Deque[Job]] = OrderedDict()
+        self.active: Deque[str] = deque()  # Groups with queued jobs, in round-robin order
+        self.deficit: Dict[str, float] = {}
+        self.turn_granted = False  # Whether the group at the head already got this turn's quantum
+    
+    def __len__(self) -> int:
+        return sum(len(jobs) for jobs in self.groups.values())
+    
+    def push(self, job: Job, front: bool = False):
+        jobs = self.groups.get(job.group)
+        if jobs is None:
+            jobs = self.groups[job.group] = deque()
+            self.active.append(job.group)
+            self.deficit[job.group] = 0.0
+        if front:
+            jobs.appendleft(job)
+        else:
+            jobs.append(job)
+    
+    def remove(self, job: Job) -> bool:
+        jobs = self.groups.get(job.group)
+        if jobs is None or job not in jobs:
+            return False
+        jobs.remove(job)
+        if not jobs:
+            self._drop_group(job.group)
+        return True
+    
+    def _drop_group(self, group: str):
+        if self.active and self.active[0] == group:
+            self.turn_granted = False
+        del self.groups[group]
+        self.active.remove(group)
+        self.deficit.pop(group, None)
+    
+    def pop(self, quantum: Callable[[str], float]) -> Job:
+        """Next job: each group's turn adds its quantum and serves jobs while the deficit covers them"""
+        while True:
+            group = self.active[0]
+            jobs = self.groups[group]
+            if not self.turn_granted:
+                self.deficit[group] += quantum(group)
+                self.turn_granted = True
+            if jobs[0].cost <= self.deficit[group]:
+                job = jobs.popleft()
+                self.deficit[group] -= job.cost
+                if not jobs:
+                    self._drop_group(group)
+                return job
+            self.active.rotate(-1)
+            self.turn_granted = False
+
+
+class FairShareJobQueue:
+    """
+    Pending jobs ordered by priority, with weighted fair sharing inside a level
+    
+    Higher priority levels are always served first. Within a level, groups
+    (mangas, hosts...) take turns by deficit round robin: each turn a group
+    earns ``weight`` work units and runs jobs until their ``cost`` exceeds what
+    it has earned, so a 40-chapter backlog cannot hold back another manga's
+    single chapter. Jobs waiting longer than ``aging_seconds`` move up one
+    level so low priorities are never starved.
+    """
+    
+    def __init__(self, aging_seconds: float = 600.0):
+        self.aging_seconds = aging_seconds
+        self.weights: Dict[str, float] = {}
+        self._levels: Dict[int, _PriorityLevel] = {}
+        self._size = 0
+        self._getters: Deque[asyncio.Future] = deque()
+    
+    def qsize(self) -> int:
+        return self._size
+    
+    def empty(self) -> bool:
+        return self._size == 0
+    
+    def set_weight(self, group: str, weight: float):
+        """Share of a group relative to the others at the same priority (default 1)"""
+        if weight <= 0:
+            raise ValueError("Group weight must be positive")
+        self.weights[group] = weight
+    
+    def _quantum(self, group: str) -> float:
+        return self.weights.get(group, 1.0)
+    
+    def _level(self, priority: int) -> _PriorityLevel:
+        if priority not in self._levels:
+            self._levels[priority] = _PriorityLevel()
+        return self._levels[priority]
+    
+    def put_nowait(self, job: Job, front: bool = False):
+        job.queued_at = time.monotonic()
+        self._level(job.priority).push(job, front)
+        self._size += 1
+        while self._getters:
+            getter = self._getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                break
+    
+    def remove(self, job: Job) -> bool:
+        level = self._levels.get(job.priority)
+        if level is None or not level.remove(job):
+            return False
+        self._size -= 1
+        return True
+    
+    def reprioritize(self, job: Job, priority: int) -> bool:
+        """Move a queued job to another level, ahead of its group's other jobs there"""
+        if not self.remove(job):
+            return False
+        job.priority = priority
+        self.put_nowait(job, front=True)
+        return True
+    
+    def _age(self):
+        if self.aging_seconds <= 0:
+            return
+        now = time.monotonic()
+        top = max(JobPriority)
+        for priority in sorted(self._levels):
+            if priority >= top:
+                continue
+            stale = [job for jobs in self._levels[priority].groups.values() for job in jobs
+                     if now - job.queued_at >= self.aging_seconds]
+            for job in stale:
+                self.remove(job)
+                job.priority = priority + 1
+                self.put_nowait(job)
+    
+    def get_nowait(self) -> Job:
+        if self._size == 0:
+            raise asyncio.QueueEmpty
+        self._age()
+        priority = max(p for p, level in self._levels.items() if level.active)
+        job = self._levels[priority].pop(self._quantum)
+        self._size -= 1
+        return job
+    
+    async def get(self) -> Job:
+        while self.empty():
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except BaseException:
+                getter.cancel()
+                if not self.empty() and not getter.cancelled():
+                    self._wake_next()
+                raise
+        return self.get_nowait()
+    
+    def _wake_next(self):
+        while self._getters:
+            getter = self._getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                break
 
 
 class UploadQueue:
-    """Async queue for managing upload jobs"""
+    """Async queue for managing upload jobs (by priority, fair-shared across groups)"""
     
-    def __init__(self, max_concurrent: int = 5):
+    def __init__(self, max_concurrent: int = 5, aging_seconds: float = 600.0, store: Optional[JobStore] = None,
+                 finished_job_ttl: Optional[float] = None):
         self.max_concurrent = max_concurrent
-        self.queue: asyncio.Queue = asyncio.Queue()
+        self.queue = FairShareJobQueue(aging_seconds)
         self.jobs: Dict[str, Job] = {}
         self.workers: List[asyncio.Task] = []
         self.running = False
         self._lifecycle_lock = asyncio.Lock()
         self._job_counter = 0
         self.max_finished_jobs = 200
+        self.finished_job_ttl = finished_job_ttl  # Seconds finished jobs stay in memory (None: count cap only)
+        self._finished: "OrderedDict[str, float]" = OrderedDict()  # Job id -> completion time, oldest first
+        self.store: Optional[JobStore] = None
+        self._tasks: Dict[str, Callable] = {}
+        self._restored = False
+        self._rehydrated: List[Job] = []
+        self.set_store(store)
+    
+    def set_store(self, store: Optional[JobStore]):
+        """Persist jobs of registered tasks in ``store``; unfinished ones are rehydrated on the next start"""
+        self.store = store
+        self._restored = False
+        if store is not None:
+            self._job_counter = max(self._job_counter, store.max_seq(QUEUE_SOURCE))
+    
+    def register_task(self, name: str, task: Callable):
+        """
+        Make jobs running ``task`` durable under ``name``
+        
+        Their arguments must be JSON-serializable so the job can be rebuilt
+        after a restart.
+        """
+        self._tasks[name] = task
+    
+    def _task_name(self, task: Callable) -> Optional[str]:
+        for name, registered in self._tasks.items():
+            if registered == task:
+                return name
+        return None
+    
+    def _persist(self, job: Job, status: Optional[JobStatus] = None, detail: Optional[str] = None, **fields):
+        if self.store is not None and job.task_name is not None:
+            self.store.update_job(job.id, status.value if status else None, detail, **fields)
+    
+    def _persist_outcome(self, job: Job, detail: Optional[str] = None):
+        self._persist(job, job.status, detail, progress=job.progress, error=job.error,
+                      result=job.result, completed_at=job.completed_at)
+    
+    async def _restore_jobs(self):
+        """Queue again the jobs left pending or running by a previous session"""
+        restored = 0
+        rows = await asyncio.to_thread(self.store.load_jobs, QUEUE_SOURCE,
+                                       (JobStatus.PENDING.value, JobStatus.RUNNING.value))
+        for row in rows:
+            if row["job_id"] in self.jobs:
+                continue
+            task = self._tasks.get(row["kind"])
+            if task is None:
+                logger.warning(f"Cannot resume job {row['job_id']}: task '{row['kind']}' is not registered")
+                continue
+            payload = row["payload"] or {}
+            job = Job(
+                id=row["job_id"],
+                task=task,
+                args=tuple(payload.get("args") or ()),
+                kwargs=payload.get("kwargs") or {},
+                created_at=row["created_at"],
+                priority=JobPriority(row["priority"]),
+                group=row["grp"] or "default",
+                cost=row["cost"] if row["cost"] is not None else 1.0,
+                task_name=row["kind"]
+            )
+            self._track(job)
+            self.queue.put_nowait(job)
+            self._persist(job, JobStatus.PENDING, "rehydrated", started_at=None)
+            self._rehydrated.append(job)
+            restored += 1
+        if restored:
+            logger.info(f"Rehydrated {restored} unfinished jobs into the upload queue")
 
-    def _prune_finished_jobs(self) -> None:
-        """Keep only a bounded number of finished jobs to avoid unbounded growth."""
-        finished_jobs = [
-            (job_id, job)
-            for job_id, job in self.jobs.items()
-            if job.status in {JobStatus.COMPLETED, JobStatus.FAILED}
-        ]
+    def take_rehydrated(self) -> List[Job]:
+        """Jobs queued again from the store since the last call, so their owner can follow them"""
+        jobs, self._rehydrated = self._rehydrated, []
+        return jobs
 
-        if len(finished_jobs) <= self.max_finished_jobs:
-            return
+    def _track(self, job: Job):
+        """Register a job so its completion enters the retention order"""
+        self.jobs[job.id] = job
+        job.subscribe("completed", self._on_job_finished)
+        job.subscribe("failed", self._on_job_finished)
+
+    def _on_job_finished(self, job: Job) -> None:
+        if self.jobs.get(job.id) is job:
+            self._finished[job.id] = job.completed_at or time.time()
 
-        finished_jobs.sort(key=lambda item: item[1].completed_at or 0.0)
-        jobs_to_remove = len(finished_jobs) - self.max_finished_jobs
-        for job_id, _ in finished_jobs[:jobs_to_remove]:
+    def _prune_finished_jobs(self) -> None:
+        """
+        Keep only a bounded number of finished jobs to avoid unbounded growth
+        
+        Finished jobs are kept in completion order, so this only looks at the
+        oldest ones: constant work per finished job whatever the queue size.
+        """
+        removed = 0
+        while len(self._finished) > self.max_finished_jobs:
+            job_id, _ = self._finished.popitem(last=False)
             self.jobs.pop(job_id, None)
+            removed += 1
+
+        if self.finished_job_ttl is not None:
+            cutoff = time.time() - self.finished_job_ttl
+            while self._finished:
+                job_id, completed_at = next(iter(self._finished.items()))
+                if completed_at > cutoff:
+                    break
+                del self._finished[job_id]
+                self.jobs.pop(job_id, None)
+                removed += 1
 
-        logger.debug(f"Pruned {jobs_to_remove} finished jobs from upload queue history")
+        if removed:
+            logger.debug(f"Pruned {removed} finished jobs from upload queue history")
     
     async def start(self):
         """Start queue workers"""
@@ -71,12 +423,21 @@ class UploadQueue:
             self.running = True
             logger.info(f"Starting upload queue with {self.max_concurrent} workers")
 
+            if self.store is not None and not self._restored:
+                self._restored = True
+                await self._restore_jobs()
+
             for i in range(self.max_concurrent):
                 worker = asyncio.create_task(self._worker(f"worker-{i}"))
                 self.workers.append(worker)
     
-    async def stop(self):
-        """Stop all workers gracefully"""
+    async def stop(self, discard: bool = False):
+        """
+        Stop all workers gracefully
+        
+        Unfinished jobs fail in memory so waiters return, but durable ones stay
+        pending in the store and resume on the next start unless ``discard``.
+        """
         async with self._lifecycle_lock:
             if not self.running:
                 return
@@ -88,9 +449,9 @@ class UploadQueue:
             running_jobs = 0
             for job in self.jobs.values():
                 if job.status == JobStatus.RUNNING:
-                    job.status = JobStatus.FAILED
-                    job.error = "Queue stopped during processing"
-                    job.completed_at = time.time()
+                    job.finish(JobStatus.FAILED, error="Queue stopped during processing")
+                    if discard:
+                        self._persist_outcome(job, "discarded")
                     running_jobs += 1
             if running_jobs:
                 logger.warning(f"Stopped queue with {running_jobs} running jobs marked as failed")
@@ -104,10 +465,9 @@ class UploadQueue:
                     break
 
                 drained_jobs += 1
-                pending_job.status = JobStatus.FAILED
-                pending_job.error = "Queue stopped before processing"
-                pending_job.completed_at = time.time()
-                self.queue.task_done()
+                pending_job.finish(JobStatus.FAILED, error="Queue stopped before processing")
+                if discard:
+                    self._persist_outcome(pending_job, "discarded")
 
             if drained_jobs:
                 logger.warning(f"Stopped queue with {drained_jobs} pending jobs marked as failed")
@@ -128,10 +488,23 @@ class UploadQueue:
                     logger.warning("Workers didn't stop within timeout, forcing shutdown")
 
             self.workers.clear()
+            if self.store is not None:
+                await self.store.flush()
             logger.info("Upload queue stopped")
     
     async def add_job(self, task: Callable, *args, **kwargs) -> str:
         """Add a job to the queue"""
+        return await self.schedule_job(task, args, kwargs)
+    
+    async def schedule_job(self, task: Callable, args: tuple = (), kwargs: Optional[Dict[str, Any]] = None, *,
+                           priority: int = JobPriority.NORMAL, group: str = "default", cost: float = 1.0) -> str:
+        """
+        Add a job with a priority and a fair-share group
+        
+        Jobs of a higher priority run first; jobs of the same priority are shared
+        between groups in proportion to their weight, ``cost`` being the work
+        the job represents (e.g. the number of chapters it uploads).
+        """
         async with self._lifecycle_lock:
             if not self.running:
                 raise RuntimeError("Upload queue is not running")
@@ -142,17 +515,59 @@ class UploadQueue:
             job = Job(
                 id=job_id,
                 task=task,
-                args=args,
-                kwargs=kwargs
+                args=tuple(args),
+                kwargs=kwargs or {},
+                priority=JobPriority(priority),
+                group=group,
+                cost=max(cost, 0.0),
+                task_name=self._task_name(task)
             )
 
+            if self.store is not None and job.task_name is not None:
+                payload = {"args": list(job.args), "kwargs": job.kwargs}
+                try:
+                    json.dumps(payload)
+                except (TypeError, ValueError):
+                    logger.warning(f"Job {job_id} has arguments that cannot be stored; it will not survive a restart")
+                    job.task_name = None
+                else:
+                    self.store.save_job(job_id, QUEUE_SOURCE, job.task_name, job.status.value,
+                                        seq=self._job_counter, payload=payload, priority=job.priority,
+                                        group=group, cost=job.cost, created_at=job.created_at)
+
             self._prune_finished_jobs()
-            self.jobs[job_id] = job
-            await self.queue.put(job)
+            self._track(job)
+            self.queue.put_nowait(job)
 
             logger.debug(f"Job {job_id} added to queue")
             return job_id
     
+    def bump_priority(self, job_id: str, priority: Optional[int] = None) -> bool:
+        """
+        Raise a pending job's priority (one level by default)
+        
+        The job goes ahead of its group's other jobs at the new level. Returns
+        False when the job is unknown or no longer pending.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.status != JobStatus.PENDING:
+            return False
+        if priority is None:
+            priority = min(job.priority + 1, max(JobPriority))
+        if not self.queue.reprioritize(job, JobPriority(priority)):
+            return False
+        self._persist(job, priority=int(priority))
+        logger.debug(f"Job {job_id} moved to {JobPriority(priority).name} priority")
+        return True
+    
+    def set_group_weight(self, group: str, weight: float):
+        """Share of queue throughput for a group relative to others of the same priority"""
+        self.queue.set_weight(group, weight)
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Get a job (to subscribe to its events) while it is still tracked"""
+        return self.jobs.get(job_id)
+    
     async def get_job_status(self, job_id: str) -> Optional[JobStatus]:
         """Get the status of a job"""
         if job_id in self.jobs:
@@ -165,22 +580,35 @@ class UploadQueue:
             return self.jobs[job_id].result
         return None
     
-    async def wait_for_job(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
-        """Wait for a job to complete"""
-        start_time = time.time()
-        
-        while job_id in self.jobs:
-            job = self.jobs[job_id]
-            
-            if job.status in [JobStatus.COMPLETED, JobStatus.FAILED]:
-                return job
-            
-            if timeout and (time.time() - start_time) > timeout:
-                raise asyncio.TimeoutError(f"Job {job_id} timed out")
-            
-            await asyncio.sleep(0.1)
+    def get_history(self, limit: int = 100, offset: int = 0,
+                    status: Optional[JobStatus] = None) -> List[Dict[str, Any]]:
+        """
+        Finished jobs, most recent first
         
-        return None
+        Read from the job store when there is one, so history is not limited
+        to the finished jobs still kept in memory.
+        """
+        if self.store is not None:
+            return self.store.history(QUEUE_SOURCE, status.value if status else None, limit, offset)
+        finished = sorted((job for job in self.jobs.values() if job.finished and (status is None or job.status == status)),
+                          key=lambda job: job.completed_at or 0.0, reverse=True)
+        return [
+            {"job_id": job.id, "kind": job.task_name, "status": job.status.value, "priority": int(job.priority),
+             "grp": job.group, "cost": job.cost, "progress": job.progress, "error": job.error,
+             "result": job.result, "created_at": job.created_at, "started_at": job.started_at,
+             "completed_at": job.completed_at}
+            for job in finished[offset:offset + limit]
+        ]
+    
+    async def wait_for_job(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Wait for a job to complete (None for unknown jobs)"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        try:
+            return await job.wait(timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"Job {job_id} timed out")
     
     async def _worker(self, worker_name: str):
         """Worker coroutine"""
@@ -190,17 +618,15 @@ class UploadQueue:
             while self.running:
                 # Get job from queue
                 job = await self.queue.get()
-                
-                if job is None:  # Stop signal
-                    break
 
                 if job.status != JobStatus.PENDING:
-                    self.queue.task_done()
                     continue
                 
                 # Process job
                 job.status = JobStatus.RUNNING
                 job.started_at = time.time()
+                token = current_job.set(job)
+                self._persist(job, JobStatus.RUNNING, started_at=job.started_at)
                 
                 try:
                     logger.debug(f"{worker_name} processing {job.id}")
@@ -211,21 +637,19 @@ class UploadQueue:
                     else:
                         result = await asyncio.to_thread(job.task, *job.args, **job.kwargs)
                     
-                    job.result = result
-                    job.status = JobStatus.COMPLETED
-                    job.completed_at = time.time()
+                    job.finish(JobStatus.COMPLETED, result=result)
+                    self._persist_outcome(job)
                     
                     logger.debug(f"{worker_name} completed {job.id}")
                     
                 except Exception as e:
-                    job.status = JobStatus.FAILED
-                    job.error = str(e)
-                    job.completed_at = time.time()
+                    job.finish(JobStatus.FAILED, error=str(e))
+                    self._persist_outcome(job)
                     
                     logger.error(f"{worker_name} failed {job.id}: {e}")
                 
                 finally:
-                    self.queue.task_done()
+                    current_job.reset(token)
                     self._prune_finished_jobs()
         
         except asyncio.CancelledError:
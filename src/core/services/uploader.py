@@ -1,13 +1,57 @@
 from pathlib import Path
+import asyncio
 import time
-from typing import List, Dict, Optional, Any, cast
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List, Dict, NamedTuple, Optional, Any, Sequence, Tuple, Union, cast
 from loguru import logger
 
-from core.models import Manga, Chapter, ChapterUploadResult
+from core.models import Manga, Chapter, ChapterUploadResult, UploadResult
 from core.hosts import BaseHost
-from utils.helpers import sanitize_filename
+from core.hosts.journal import UploadJournal, ChapterJournal
+from .optimizer import ImageOptimizer
+from utils.helpers import sanitize_filename, format_file_size
 from utils.json_updater import JSONUpdater
 
+# (image slots, chapter slots) shared by the pipelined chapters of one host
+HostSlots = Tuple[Optional[asyncio.Semaphore], Optional[asyncio.Semaphore]]
+ImageCallback = Callable[[Path, Union[UploadResult, BaseException]], None]
+
+
+@asynccontextmanager
+async def _holding(slots: Optional[asyncio.Semaphore]) -> AsyncIterator[None]:
+    """Hold a semaphore when one is given"""
+    if slots is None:
+        yield
+    else:
+        async with slots:
+            yield
+
+
+def _uploaded(outcome: Union[UploadResult, BaseException]) -> bool:
+    return isinstance(outcome, UploadResult) and outcome.success
+
+
+class UploadChain(NamedTuple):
+    """Hosts one upload goes through: the primary host first, then failover hosts"""
+    hosts: Tuple[BaseHost, ...]
+    mirror: bool = False
+    
+    @property
+    def targets(self) -> Tuple[BaseHost, ...]:
+        """Hosts receiving every chapter (one, or two in mirror mode)"""
+        return self.hosts[:2] if self.mirror else self.hosts[:1]
+    
+    @property
+    def fallbacks(self) -> Tuple[BaseHost, ...]:
+        """Hosts taking the pages the targets failed, in order"""
+        return self.hosts[len(self.targets):]
+    
+    @property
+    def upload_budget(self) -> int:
+        """Smallest known upload size limit across the chain (0 = none)"""
+        limits = [host.max_upload_bytes for host in self.hosts if host.max_upload_bytes > 0]
+        return min(limits) if limits else 0
+
 
 class MangaUploaderService:
     """Main service for handling manga uploads"""
@@ -15,6 +59,11 @@ class MangaUploaderService:
     def __init__(self):
         self.hosts: Dict[str, BaseHost] = {}
         self.current_host: Optional[BaseHost] = None
+        # Default upload chain (the primary host first, then failover hosts) for calls that pass none
+        self.host_chain: List[BaseHost] = []
+        self.mirror = False
+        self.journal: Optional[UploadJournal] = None
+        self.optimizer: Optional[ImageOptimizer] = None
         logger.info("MangaUploaderService initialized")
     
     def register_host(self, name: str, host: BaseHost):
@@ -30,40 +79,324 @@ class MangaUploaderService:
         """Set the active host for uploads"""
         if name in self.hosts:
             self.current_host = self.hosts[name]
+            self.host_chain = [self.current_host]
+            self.mirror = False
             logger.info(f"Active host set to: {name}")
             return True
         logger.error(f"Host not found: {name}")
         return False
     
-    async def upload_manga(self, manga: Manga, chapters: List[Chapter]) -> Dict[str, ChapterUploadResult]:
-        """Upload selected chapters of a manga"""
-        if not self.current_host:
-            raise ValueError("No host selected")
+    def resolve_chain(self, names: Sequence[str], mirror: bool = False) -> Optional[UploadChain]:
+        """
+        The upload chain for an ordered list of registered host names
         
-        results = {}
+        The first host is the primary one. Images it fails to upload fail over to
+        the next hosts in order. With ``mirror``, the first two hosts receive every
+        chapter at once and the second one's URLs are kept as a mirror group.
+        Unknown hosts are left out; None when no host is registered.
+        """
+        chain: List[BaseHost] = []
+        for name in names:
+            host = self.hosts.get(name)
+            if host is None:
+                logger.warning(f"Host not found, left out of the upload chain: {name}")
+            elif host not in chain:
+                chain.append(host)
+        if not chain:
+            logger.error(f"No registered host in upload chain: {list(names)}")
+            return None
+        return UploadChain(tuple(chain), mirror and len(chain) > 1)
+    
+    def set_hosts(self, names: Sequence[str], mirror: bool = False) -> bool:
+        """Upload through an ordered list of hosts by default (see ``resolve_chain``)"""
+        chain = self.resolve_chain(names, mirror)
+        if chain is None:
+            return False
         
-        for chapter in chapters:
-            logger.info(f"Processing chapter: {chapter.name}")
-            
-            # Get images for the chapter
-            images = chapter.images
-            if not images:
-                logger.warning(f"No images found in chapter: {chapter.name}")
+        self.current_host = chain.hosts[0]
+        self.host_chain = list(chain.hosts)
+        self.mirror = chain.mirror
+        logger.info(f"Upload chain set to: {' -> '.join(host.name for host in chain.hosts)}"
+                    f"{' (mirroring to ' + chain.hosts[1].name + ')' if chain.mirror else ''}")
+        return True
+    
+    def _chain_for(self, hosts: Optional[Sequence[str]], mirror: bool) -> UploadChain:
+        """The chain an upload call goes through: ``hosts`` when given, the default chain otherwise"""
+        if hosts is None:
+            if not self.host_chain:
+                raise ValueError("No host selected")
+            return UploadChain(tuple(self.host_chain), self.mirror)
+        chain = self.resolve_chain(hosts, mirror)
+        if chain is None:
+            raise ValueError(f"No registered host in upload chain: {list(hosts)}")
+        return chain
+    
+    def set_journal(self, journal: Optional[UploadJournal]):
+        """Install (or remove with None) the durable per-image progress journal"""
+        self.journal = journal
+    
+    def set_optimizer(self, optimizer: Optional[ImageOptimizer]):
+        """Install (or remove with None) the pre-upload image optimization stage"""
+        self.optimizer = optimizer
+    
+    async def _prepare_images(self, chapter: Chapter, chain: UploadChain) -> Tuple[List[Path], int]:
+        """Pages to upload for a chapter (optimized when enabled) and the bytes saved"""
+        if self.optimizer is None or not chapter.images:
+            return chapter.images, 0
+        
+        report = await self.optimizer.optimize_chapter(chapter.images, chain.upload_budget)
+        if report.bytes_saved:
+            logger.info(f"Optimized {report.optimized_files}/{len(chapter.images)} images in {chapter.name}: "
+                        f"{format_file_size(report.original_bytes)} -> {format_file_size(report.optimized_bytes)} "
+                        f"({report.cache_hits} cached)")
+        return report.paths, report.bytes_saved
+    
+    def _chapter_journal(self, manga: Manga, chapter: Chapter, host: BaseHost) -> Optional[ChapterJournal]:
+        if self.journal is None:
+            return None
+        return self.journal.chapter(str(manga.path), chapter.name, host.name)
+    
+    async def _fail_over(self, chapter: Chapter, images: List[Path],
+                         results: List[Union[UploadResult, BaseException]],
+                         fallbacks: Sequence[BaseHost],
+                         slots_for: Optional[Callable[[BaseHost], HostSlots]],
+                         journal: Optional[ChapterJournal] = None) -> List[Union[UploadResult, BaseException]]:
+        """
+        Upload the pages that failed to the next hosts in the chain, in order
+        
+        Pages are recorded in the chapter's ``journal`` like the primary host's, so
+        a resumed upload keeps the URLs a fallback host already returned.
+        """
+        for position, fallback in enumerate(fallbacks):
+            failed = [i for i, outcome in enumerate(results) if not _uploaded(outcome)]
+            if not failed:
+                break
+            if not fallback.is_available:
+                logger.warning(f"Skipping {fallback.name} for failover of {chapter.name}: circuit open")
                 continue
             
-            # Upload chapter
-            result = await self.current_host.upload_chapter(
-                chapter_name=chapter.name,
-                images=images
-            )
-            
-            results[chapter.name] = result
-            
+            logger.warning(f"Failing over {len(failed)} images of {chapter.name} to {fallback.name}")
+            image_slots = slots_for(fallback)[0] if slots_for is not None else None
+            async with fallback.chapter_session(chapter.name):
+                # Only the last available host in the chain waits out its own open circuit
+                can_fail_over = any(later.is_available for later in fallbacks[position + 1:])
+                retried = await fallback.upload_images([images[i] for i in failed], journal, image_slots,
+                                                       fail_fast=can_fail_over)
+            for index, outcome in zip(failed, retried):
+                if _uploaded(outcome):
+                    results[index] = outcome
+        return results
+    
+    async def _upload_to_host(self, host: BaseHost, manga: Manga, chapter: Chapter, images: List[Path],
+                              fallbacks: Sequence[BaseHost],
+                              slots_for: Optional[Callable[[BaseHost], HostSlots]],
+                              on_result: Optional[ImageCallback] = None) -> ChapterUploadResult:
+        """Upload a chapter to one host, failing pages over to ``fallbacks``, and create its album"""
+        image_slots, chapter_slots = slots_for(host) if slots_for is not None else (None, None)
+        journal = self._chapter_journal(manga, chapter, host)
+        # The chapter slot comes first so waiting chapters hold no host session (e.g. a gallery)
+        async with _holding(chapter_slots):
+            async with host.chapter_session(chapter.name):
+                logger.info(f"Processing chapter: {chapter.name} ({len(images)} images) on {host.name}")
+                backup = next((fallback for fallback in fallbacks if fallback.is_available), None)
+                image_results = await host.upload_images(images, journal, image_slots, on_result, backup,
+                                                         fail_fast=backup is not None)
+                image_results = await self._fail_over(chapter, images, image_results, fallbacks, slots_for,
+                                                      journal)
+                result = await host.finalize_chapter(chapter.name, images, image_results)
+        if journal is not None:
+            await journal.finish(result)
+        return result
+    
+    async def _upload_chapter(self, manga: Manga, chapter: Chapter, images: List[Path], chain: UploadChain,
+                              slots_for: Optional[Callable[[BaseHost], HostSlots]] = None,
+                              on_result: Optional[ImageCallback] = None) -> ChapterUploadResult:
+        """
+        Upload a chapter to every target host of ``chain`` at once
+        
+        The result of the first host that uploaded every page becomes the chapter
+        result; other complete uploads are attached to it as mirrors. ``on_result``
+        follows the first target's pages.
+        """
+        targets = chain.targets
+        fallbacks = chain.fallbacks
+        outcomes = await asyncio.gather(
+            *(self._upload_to_host(host, manga, chapter, images, fallbacks, slots_for,
+                                   on_result if host is targets[0] else None) for host in targets),
+            return_exceptions=True
+        )
+        
+        results: List[ChapterUploadResult] = []
+        for host, outcome in zip(targets, outcomes):
+            if isinstance(outcome, ChapterUploadResult):
+                results.append(outcome)
+            else:
+                logger.error(f"Uploading {chapter.name} to {host.name} failed: {type(outcome).__name__}: {outcome}")
+        if not results:
+            raise cast(BaseException, outcomes[0])
+        
+        primary = next((result for result in results if result.success), results[0])
+        for result in results:
+            if result is primary:
+                continue
+            if result.success:
+                primary.mirrors[result.host] = result.image_urls
+            else:
+                logger.warning(f"Mirror of {chapter.name} on {result.host} is incomplete and was left out")
+        return primary
+    
+    def get_resumable_chapters(self, manga: Manga, host: Optional[str] = None) -> List[Chapter]:
+        """Chapters of ``manga`` with an interrupted or partially failed upload on ``host`` (the active one by default)"""
+        if host is None and self.current_host is not None:
+            host = self.current_host.name
+        if self.journal is None or host is None:
+            return []
+        names = set(self.journal.get_resumable_chapters(str(manga.path), host))
+        return [chapter for chapter in manga.chapters if chapter.name in names]
+    
+    async def resume_manga(self, manga: Manga, pipeline_depth: int = 1,
+                           max_concurrent_images: Optional[int] = None,
+                           hosts: Optional[Sequence[str]] = None,
+                           mirror: bool = False) -> Dict[str, ChapterUploadResult]:
+        """
+        Continue every unfinished chapter of a manga from the journal
+        
+        Only pages without a journaled URL are uploaded; the others are merged
+        back into each chapter result in their original order.
+        """
+        chapters = self.get_resumable_chapters(manga, hosts[0] if hosts else None)
+        if not chapters:
+            logger.info(f"Nothing to resume for {manga.title}")
+            return {}
+        
+        logger.info(f"Resuming {len(chapters)} chapters of {manga.title}")
+        return await self.upload_manga(manga, chapters, pipeline_depth, max_concurrent_images,
+                                       hosts=hosts, mirror=mirror)
+    
+    async def upload_manga(self, manga: Manga, chapters: List[Chapter], pipeline_depth: int = 1,
+                           max_concurrent_images: Optional[int] = None,
+                           on_result: Optional[ImageCallback] = None,
+                           hosts: Optional[Sequence[str]] = None,
+                           mirror: bool = False) -> Dict[str, ChapterUploadResult]:
+        """
+        Upload selected chapters of a manga
+        
+        Args:
+            manga: Manga being uploaded
+            chapters: Chapters to upload, in natural order
+            pipeline_depth: Number of chapters allowed in flight at once; 1 uploads strictly
+                one chapter after another
+            max_concurrent_images: Global cap on images dispatched across all in-flight
+                chapters (defaults to the host's max_workers)
+            on_result: Called with each page and its outcome as soon as it completes
+                (e.g. for progress reporting)
+            hosts: Names of the hosts to upload through, primary first (see ``resolve_chain``);
+                the default chain set with ``set_host``/``set_hosts`` when omitted
+            mirror: Mirror every chapter to the second of ``hosts``
+        
+        When a journal is installed, chapters interrupted earlier continue from the
+        pages already uploaded. With an upload chain, failed pages fail over to the
+        next hosts and mirror uploads run side by side. The chain is fixed for the
+        whole call, so concurrent uploads through other chains do not affect it.
+        """
+        chain = self._chain_for(hosts, mirror)
+        
+        if pipeline_depth > 1:
+            return await self._upload_manga_pipelined(manga, chapters, chain, pipeline_depth,
+                                                      max_concurrent_images, on_result)
+        
+        results = {}
+        # Optimize the next chapter while the current one uploads
+        next_prepared = asyncio.ensure_future(self._prepare_images(chapters[0], chain)) if chapters else None
+        
+        try:
+            for index, chapter in enumerate(chapters):
+                logger.info(f"Processing chapter: {chapter.name}")
+                
+                prepared = cast(asyncio.Future, next_prepared)
+                next_prepared = None
+                if index + 1 < len(chapters):
+                    next_prepared = asyncio.ensure_future(self._prepare_images(chapters[index + 1], chain))
+                
+                # Get images for the chapter
+                images, bytes_saved = await prepared
+                if not images:
+                    logger.warning(f"No images found in chapter: {chapter.name}")
+                    continue
+                
+                # Upload chapter
+                result = await self._upload_chapter(manga, chapter, images, chain, on_result=on_result)
+                result.bytes_saved = bytes_saved
+                
+                results[chapter.name] = result
+                
+                if result.success:
+                    logger.success(f"Chapter uploaded successfully: {chapter.name}")
+                else:
+                    logger.error(f"Failed uploads in chapter {chapter.name}: {result.failed_uploads}")
+        finally:
+            # A failed or cancelled upload must not leave the prefetch running (or its error unretrieved)
+            if next_prepared is not None:
+                next_prepared.cancel()
+                await asyncio.gather(next_prepared, return_exceptions=True)
+        
+        return results
+    
+    async def _upload_manga_pipelined(self, manga: Manga, chapters: List[Chapter], chain: UploadChain,
+                                      pipeline_depth: int, max_concurrent_images: Optional[int],
+                                      on_result: Optional[ImageCallback] = None) -> Dict[str, ChapterUploadResult]:
+        """
+        Upload several chapters through one shared image pool
+        
+        The next chapter starts feeding images while the previous one drains its
+        stragglers, so the host never idles at chapter boundaries. Each chapter's
+        album is created as soon as its last image lands, and results are returned
+        in the original chapter order. At most ``pipeline_depth`` chapters are
+        optimized or uploading at a time; the others wait before any work starts.
+        """
+        host = chain.hosts[0]
+        # Every host in the chain gets its own pipeline of chapter and image slots
+        host_slots: Dict[str, HostSlots] = {}
+        
+        def slots_for(target: BaseHost) -> HostSlots:
+            if target.name not in host_slots:
+                image_limit = max(1, max_concurrent_images or target.max_workers)
+                host_slots[target.name] = (asyncio.Semaphore(image_limit), asyncio.Semaphore(pipeline_depth))
+            return host_slots[target.name]
+        
+        logger.info(f"Pipelined upload of {len(chapters)} chapters "
+                    f"(depth={pipeline_depth}, max images in flight={max(1, max_concurrent_images or host.max_workers)})")
+        
+        pipeline = asyncio.Semaphore(pipeline_depth)
+        
+        async def upload_chapter(chapter: Chapter) -> Optional[ChapterUploadResult]:
+            async with pipeline:
+                images, bytes_saved = await self._prepare_images(chapter, chain)
+                if not images:
+                    logger.warning(f"No images found in chapter: {chapter.name}")
+                    return None
+                
+                result = await self._upload_chapter(manga, chapter, images, chain, slots_for, on_result)
+            result.bytes_saved = bytes_saved
             if result.success:
                 logger.success(f"Chapter uploaded successfully: {chapter.name}")
             else:
                 logger.error(f"Failed uploads in chapter {chapter.name}: {result.failed_uploads}")
+            return result
         
+        tasks = [asyncio.ensure_future(upload_chapter(chapter)) for chapter in chapters]
+        try:
+            chapter_results = await asyncio.gather(*tasks)
+        finally:
+            # The first failure (or a cancellation) stops the chapters still waiting or uploading
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        results = {}
+        for chapter, result in zip(chapters, chapter_results):
+            if result is not None:
+                results[chapter.name] = result
         return results
     
     async def generate_metadata(self, manga: Manga, upload_results: Dict[str, ChapterUploadResult], 
@@ -110,7 +443,9 @@ class MangaUploaderService:
                 "volume": "",
                 "last_updated": exact_timestamp,
                 "groups": {
-                    group_name: result.image_urls  # Use group name instead of "default"
+                    group_name: result.image_urls,  # Use group name instead of "default"
+                    # Complete copies on mirror hosts, e.g. "MyScan (Imgbox)"
+                    **{f"{group_name} ({host})": urls for host, urls in result.mirrors.items()}
                 }
             }
         
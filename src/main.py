@@ -1,5 +1,6 @@
 import sys
 import asyncio
+import multiprocessing
 from pathlib import Path
 from PySide6.QtGui import QGuiApplication
 from PySide6.QtQml import QQmlApplicationEngine
@@ -107,4 +108,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Frozen builds re-run this module in the image transcoding workers
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
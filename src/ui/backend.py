@@ -8,8 +8,9 @@ import time
 from typing import Any, List, Optional, cast
 
 from core.config import ConfigManager
+from core.hosts import BaseHost
 from core.services.uploader import MangaUploaderService
-from core.services.queue import UploadQueue
+from core.services.queue import UploadQueue, current_job
 from ui.models import GitHubFolderListModel
 from ui.handlers import ConfigHandler, HostManager, MangaManager, GitHubManager
 from loguru import logger
@@ -120,6 +121,10 @@ class Backend(QObject):
         
         # Initialize services
         self._init_hosts()
+        self._init_upload_ledger()
+        self._init_upload_journal()
+        self._init_job_store()
+        self._init_image_optimizer()
         
         # CRITICAL: Initialize GitHub folders on startup if configured
         self._init_github_folders()
@@ -608,7 +613,7 @@ class Backend(QObject):
     @Slot()
     def _initialize_async_services_legacy(self):
         """Initialize async services after event loop is ready"""
-        scheduled = self._schedule_task(self.upload_queue.start())
+        scheduled = self._schedule_task(self._start_upload_queue())
         if scheduled is None:
             logger.debug("Legacy async service init skipped (event loop unavailable)")
     
@@ -1482,6 +1487,29 @@ class Backend(QObject):
             logger.error(f"Error getting performance summary: {e}")
             return {"grade": "Error", "error": str(e)}
     
+    @Slot(result='QVariant')
+    def getUploadTelemetry(self):
+        """Get per-host upload latency/throughput statistics for QML"""
+        try:
+            return self.performance_service.get_upload_telemetry()
+        except Exception as e:
+            logger.error(f"Error getting upload telemetry: {e}")
+            return {}
+    
+    @Slot(result='QVariant')
+    def getHostHealth(self):
+        """Get circuit-breaker state and health score of every enabled host for QML"""
+        try:
+            return self.host_manager.get_host_health()
+        except Exception as e:
+            logger.error(f"Error getting host health: {e}")
+            return {}
+    
+    @Slot(str, result=bool)
+    def exportUploadTelemetry(self, export_path: str):
+        """Export per-host upload telemetry to a JSON file"""
+        return self.performance_service.export_upload_telemetry(Path(export_path))
+    
     @Slot(result='QVariant')
     def getOptimizationSuggestions(self):
         """Get optimization suggestions for QML"""
@@ -1982,7 +2010,7 @@ class Backend(QObject):
     @Slot()
     def initialize_async_services(self):
         """Initialize async services after event loop is ready"""
-        scheduled = self._schedule_task(self.upload_queue.start())
+        scheduled = self._schedule_task(self._start_upload_queue())
         if scheduled is None:
             logger.debug("Async service init skipped (event loop unavailable)")
     
@@ -2093,43 +2121,64 @@ class Backend(QObject):
                 self._emit_processing_finished()
             return False
     
+    async def _start_upload_queue(self):
+        """Start the upload queue and follow the jobs it resumed from the previous session"""
+        await self.upload_queue.start()
+        for job in self.upload_queue.take_rehydrated():
+            logger.info(f"Resuming upload job {job.id} ({job.group})")
+            self._emit_processing_started()
+            await self._follow_upload_job(job.id)
+
     async def _queue_upload(self, selected_chapters: List[str]):
         """Queue upload job"""
         try:
-            job_id = await self.upload_queue.add_job(
+            current_manga = self.manga_manager.current_manga
+            # Each manga gets its fair share of the queue, weighted by how many chapters it sends.
+            # Title and host are stored with the job so a resumed job uploads the same way.
+            job_id = await self.upload_queue.schedule_job(
                 self._upload_async,
-                selected_chapters
+                (selected_chapters,),
+                {
+                    "manga_path": str(current_manga.path) if current_manga else None,
+                    "metadata": self._upload_metadata,
+                    "manga_title": current_manga.title if current_manga else None,
+                    "host": self.host_manager.selectedHost
+                },
+                group=current_manga.title if current_manga else "default",
+                cost=max(1, len(selected_chapters))
             )
-            self._current_job_id = job_id
-            monitor_task = self._schedule_task(self._monitor_job(job_id))
-            if monitor_task is None:
-                # Fallback: monitor in this task so UI state can still be finalized.
-                await self._monitor_job(job_id)
-            else:
-                self._current_upload_monitor_task = monitor_task
+            await self._follow_upload_job(job_id)
         except Exception as e:
             self.error.emit(f"Erro ao enfileirar upload: {str(e)}")
             self._emit_processing_finished()
+
+    async def _follow_upload_job(self, job_id: str):
+        """Report a queued job's progress and outcome to the UI"""
+        self._current_job_id = job_id
+        job = self.upload_queue.get_job(job_id)
+        if job is not None:
+            job.subscribe("progress", lambda job: self._on_upload_progress(job.id, job.progress))
+        monitor_task = self._schedule_task(self._monitor_job(job_id))
+        if monitor_task is None:
+            # Fallback: monitor in this task so UI state can still be finalized.
+            await self._monitor_job(job_id)
+        else:
+            self._current_upload_monitor_task = monitor_task
     
     async def _monitor_job(self, job_id: str):
-        """Monitor upload job progress"""
+        """Wait for the upload job to finish and update the UI (progress arrives through job events)"""
         try:
-            while True:
-                try:
-                    job = await self.upload_queue.wait_for_job(job_id, timeout=1.0)
-                    if job:
-                        if job.status.value == "completed":
-                            self._upload_progress = 1.0
-                            self.progressChanged.emit(1.0)
-                            self._emit_processing_finished()
-                            break
-                        elif job.status.value == "failed":
-                            self.error.emit(f"Upload failed: {job.error}")
-                            self._emit_processing_finished()
-                            break
-                except asyncio.TimeoutError:
-                    pass
-                await asyncio.sleep(0.5)
+            job = await self.upload_queue.wait_for_job(job_id)
+            if job is None:
+                logger.warning(f"Upload job {job_id} is no longer tracked by the queue")
+                self._emit_processing_finished()
+            elif job.status.value == "completed":
+                self._upload_progress = 1.0
+                self.progressChanged.emit(1.0)
+                self._emit_processing_finished()
+            elif job.status.value == "failed":
+                self.error.emit(f"Upload failed: {job.error}")
+                self._emit_processing_finished()
         finally:
             if self._current_job_id == job_id:
                 self._current_job_id = None
@@ -2137,36 +2186,61 @@ class Backend(QObject):
             if self._current_upload_monitor_task is current_task:
                 self._current_upload_monitor_task = None
     
-    async def _upload_async(self, selected_chapters: List[str]):
+    async def _upload_async(self, selected_chapters: List[str], manga_path: Optional[str] = None,
+                            metadata: Optional[dict] = None, manga_title: Optional[str] = None,
+                            host: Optional[str] = None):
         """Async upload handler"""
-        from core.models import Chapter
+        from core.models import Chapter, Manga
 
         current_manga = self.manga_manager.current_manga
+        if manga_path and (current_manga is None or str(current_manga.path) != manga_path):
+            # Job queued for another manga, or rehydrated after a restart
+            current_manga = Manga(title=manga_title or Path(manga_path).name, path=Path(manga_path))
+        if metadata is None:
+            metadata = self._upload_metadata
         if current_manga is None:
             raise ValueError("Nenhum mangá selecionado")
 
-        chapters_to_upload = []
-        for chapter_name in selected_chapters:
-            chapter_path = current_manga.path / chapter_name
-            if chapter_path.exists():
-                chapter = Chapter(name=chapter_name, path=chapter_path, images=[])
-                chapters_to_upload.append(chapter)
+        chapter_paths = [current_manga.path / chapter_name for chapter_name in selected_chapters]
+        found = await asyncio.to_thread(lambda: [path.exists() for path in chapter_paths])
+        chapters_to_upload = [
+            Chapter(name=chapter_name, path=chapter_path, images=[])
+            for chapter_name, chapter_path, exists in zip(selected_chapters, chapter_paths, found)
+            if exists
+        ]
 
         if not chapters_to_upload:
             raise ValueError("Nenhum capítulo válido selecionado")
 
-        # Set host in uploader service
-        current_host = self.host_manager.get_current_host()
+        # Upload to the host the job was queued for, not whichever one is selected now
+        host_name = host or self.host_manager.selectedHost
+        current_host = self.host_manager.get_host(host_name)
         if not current_host:
             raise ValueError("Nenhum host configurado")
 
-        self.uploader_service.register_host(self.host_manager.selectedHost, current_host)
-        self.uploader_service.set_host(self.host_manager.selectedHost)
+        self.uploader_service.register_host(host_name, current_host)
+        # The chain goes with this upload only; batch uploads share the uploader with their own chains
+        upload_chain = self._upload_chain(host_name)
+
+        # Report per-image progress to the queue job; metadata and GitHub take the last 5%
+        job = current_job.get()
+        total_images = max(1, sum(len(chapter.images) for chapter in chapters_to_upload))
+        finished_images = 0
+
+        def on_image_result(image: Path, outcome: Any) -> None:
+            nonlocal finished_images
+            finished_images += 1
+            if job is not None:
+                job.set_progress(0.95 * finished_images / total_images)
 
         # Upload
         results = await self.uploader_service.upload_manga(
             current_manga,
-            chapters_to_upload
+            chapters_to_upload,
+            pipeline_depth=self.config_manager.config.upload_pipeline_depth,
+            on_result=on_image_result,
+            hosts=upload_chain,
+            mirror=self.config_manager.config.mirror_uploads
         )
 
         # Generate metadata
@@ -2177,7 +2251,7 @@ class Backend(QObject):
             results,
             output_path,
             update_mode,
-            self._upload_metadata
+            metadata
         )
 
         self._last_json_path = saved_json_path
@@ -2324,6 +2398,61 @@ class Backend(QObject):
 
         self._sync_uploader_hosts_from_manager()
 
+    def _init_upload_ledger(self) -> None:
+        """Install the persistent upload ledger shared by all hosts"""
+        if not self.config_manager.config.upload_ledger_enabled:
+            BaseHost.set_ledger(None)
+            return
+        try:
+            from core.hosts.ledger import UploadLedger
+            ledger_path = self.config_manager.config_path.parent / "upload_ledger.db"
+            BaseHost.set_ledger(UploadLedger(ledger_path))
+        except Exception as e:
+            logger.error(f"Error initializing upload ledger: {e}")
+
+    def _init_image_optimizer(self) -> None:
+        """Install the optional pre-upload optimization stage"""
+        config = self.config_manager.config
+        if not config.image_optimization:
+            self.uploader_service.set_optimizer(None)
+            return
+        try:
+            from core.services.optimizer import ImageOptimizer, OptimizationOptions
+            options = OptimizationOptions(
+                output_format=config.optimize_format,
+                quality=config.optimize_quality,
+                strip_metadata=config.optimize_strip_metadata
+            )
+            cache_dir = self.config_manager.config_path.parent / "optimized"
+            self.uploader_service.set_optimizer(ImageOptimizer(cache_dir, options))
+        except Exception as e:
+            logger.error(f"Error initializing image optimizer: {e}")
+
+    def _init_upload_journal(self) -> None:
+        """Install the per-image progress journal used to resume interrupted chapters"""
+        if not self.config_manager.config.resumable_uploads:
+            self.uploader_service.set_journal(None)
+            return
+        try:
+            from core.hosts.journal import UploadJournal
+            journal_path = self.config_manager.config_path.parent / "upload_journal.db"
+            self.uploader_service.set_journal(UploadJournal(journal_path))
+        except Exception as e:
+            logger.error(f"Error initializing upload journal: {e}")
+
+    def _init_job_store(self) -> None:
+        """Persist queued and batch jobs so unfinished ones are picked up again after a restart"""
+        self.upload_queue.register_task("upload_chapters", self._upload_async)
+        if not self.config_manager.config.durable_jobs:
+            return
+        try:
+            from core.services.job_store import JobStore
+            store = JobStore(self.config_manager.config_path.parent / "jobs.db")
+            self.upload_queue.set_store(store)
+            self.batch_service.set_store(store)
+        except Exception as e:
+            logger.error(f"Error initializing job store: {e}")
+
     def _sync_uploader_hosts_from_manager(self) -> None:
         """Sync uploader host registry with HostManager instances."""
         for host_name in self.host_manager.host_list:
@@ -2331,7 +2460,27 @@ class Backend(QObject):
             if host_instance:
                 self.uploader_service.register_host(host_name, host_instance)
 
-        self.uploader_service.set_host(self.config_manager.config.selected_host)
+        self._apply_upload_chain()
+
+    def _upload_chain(self, primary: Optional[str] = None) -> List[str]:
+        """``primary`` (the selected host by default) followed by the failover hosts, registered with the uploader"""
+        config = self.config_manager.config
+        primary = primary or config.selected_host
+        chain = [primary]
+        for host_name in config.failover_hosts:
+            host_instance = self.host_manager.get_host(host_name)
+            if host_instance and host_name not in chain:
+                self.uploader_service.register_host(host_name, host_instance)
+                chain.append(host_name)
+        return chain
+
+    def _apply_upload_chain(self, primary: Optional[str] = None) -> None:
+        """Make the upload chain of ``primary`` the uploader's default one"""
+        chain = self._upload_chain(primary)
+        if len(chain) == 1:
+            self.uploader_service.set_host(chain[0])
+        else:
+            self.uploader_service.set_hosts(chain, mirror=self.config_manager.config.mirror_uploads)
     
     def _init_github_folders(self):
         """Initialize GitHub folders on startup if configured - CRITICAL"""
@@ -2394,6 +2543,10 @@ class Backend(QObject):
     def _init_batch_service(self):
         """Initialize batch processing service"""
         try:
+            # Batch uploads run through the interactive uploader and its host limiters
+            # Settings are read per item, so changes saved while jobs run apply to the next item
+            self.batch_service.set_uploader(self.uploader_service, config=lambda: self.config_manager.config)
+            
             # Set up batch service callbacks
             self.batch_service.set_callbacks(
                 job_progress_callback=self._on_batch_job_progress,
@@ -2510,6 +2663,43 @@ class Backend(QObject):
                     await github_service.close()
                 except Exception as exc:
                     logger.warning(f"Error closing GitHub service during shutdown: {exc}")
+
+            try:
+                await BaseHost.close_sessions()
+            except Exception as exc:
+                logger.warning(f"Error closing host sessions during shutdown: {exc}")
+
+            ledger = BaseHost.ledger
+            if ledger is not None:
+                BaseHost.set_ledger(None)
+                try:
+                    ledger.close()
+                except Exception as exc:
+                    logger.warning(f"Error closing upload ledger during shutdown: {exc}")
+
+            try:
+                from utils.transcode import transcoder
+                transcoder.shutdown()
+            except Exception as exc:
+                logger.warning(f"Error stopping transcoding pool during shutdown: {exc}")
+
+            journal = self.uploader_service.journal
+            if journal is not None:
+                self.uploader_service.set_journal(None)
+                try:
+                    journal.close()
+                except Exception as exc:
+                    logger.warning(f"Error closing upload journal during shutdown: {exc}")
+
+            job_store = self.upload_queue.store
+            if job_store is not None:
+                self.upload_queue.set_store(None)
+                self.batch_service.set_store(None)
+                try:
+                    await job_store.flush()
+                    job_store.close()
+                except Exception as exc:
+                    logger.warning(f"Error closing job store during shutdown: {exc}")
         finally:
             self._is_shutting_down = False
             logger.info("Backend shutdown finished")
@@ -2539,7 +2729,8 @@ class Backend(QObject):
                 await asyncio.gather(monitor_task, return_exceptions=True)
             self._current_upload_monitor_task = None
 
-            await self.upload_queue.stop()
+            # A stop request drops the queued jobs instead of keeping them for the next session
+            await self.upload_queue.stop(discard=True)
             await self.upload_queue.start()
 
             self._current_job_id = None
@@ -1,7 +1,7 @@
 """Host management handler for UI backend"""
 
 from PySide6.QtCore import QObject, Signal, Property
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from core.config import ConfigManager
 from core.hosts import (
     BaseHost, CatboxHost, ImgurHost, ImgBBHost, LensdumpHost, 
@@ -125,15 +125,51 @@ class HostManager(QObject):
         """Get a specific host instance"""
         return self.hosts.get(host_name)
     
-    def get_enabled_hosts(self) -> List[str]:
-        """Get list of enabled host names"""
+    def get_concurrency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the converged adaptive concurrency for every initialized host"""
+        return {
+            host_name: host.get_concurrency_stats().to_dict()
+            for host_name, host in self.hosts.items()
+        }
+    
+    def get_enabled_hosts(self, healthy_only: bool = False, by_health: bool = False) -> List[str]:
+        """
+        Get list of enabled host names
+        
+        Args:
+            healthy_only: Leave out hosts whose circuit breaker is open (requests fail fast)
+            by_health: Order by health score, healthiest first, instead of list order
+        """
         enabled_hosts = []
         for host_name in self.host_list:
             host_config = self.config_manager.config.hosts.get(host_name)
             if host_config and host_config.enabled:
+                host = self.hosts.get(host_name)
+                if healthy_only and host is not None and not host.is_available:
+                    continue
                 enabled_hosts.append(host_name)
+        if by_health:
+            enabled_hosts.sort(key=lambda name: -self.get_health_score(name))
         return enabled_hosts
     
+    def get_health_score(self, host_name: str) -> float:
+        """Health of a host from 0 (circuit open) to 1 (healthy); 0 for unknown hosts"""
+        host = self.hosts.get(host_name)
+        return host.health_score() if host is not None else 0.0
+    
+    def get_host_health(self) -> Dict[str, Dict[str, Any]]:
+        """Get circuit-breaker state and health score of every enabled host"""
+        health: Dict[str, Dict[str, Any]] = {}
+        for host_name in self.get_enabled_hosts():
+            host = self.hosts.get(host_name)
+            if host is None:
+                continue
+            stats = host.get_circuit_stats()
+            health[host_name] = stats.to_dict() if stats is not None else {
+                "host": host_name, "state": "disabled", "health": 1.0
+            }
+        return health
+    
     def _init_hosts(self):
         """Initialize all host instances"""
         self.hosts.clear()
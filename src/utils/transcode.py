@@ -0,0 +1,139 @@
+"""
+Image transcoding for hosts that reject some formats
+Pillow runs in a process pool and results stay in memory, so no temporary files are written
+"""
+
+import asyncio
+import io
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from loguru import logger
+
+JPEG_QUALITY = 95
+
+T = TypeVar('T')
+
+
+def transcode_to_jpeg(filepath: str, quality: int = JPEG_QUALITY) -> bytes:
+    """Decode an image and re-encode it as JPEG (runs in a worker process)"""
+    from PIL import Image
+
+    with Image.open(filepath) as img:
+        # JPEG has no alpha channel or palette
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+class ImageTranscoder:
+    """
+    Process-pool transcoder shared by every host
+
+    The pool is only created on first use. When worker processes cannot be
+    spawned (or the pool breaks), work falls back to a thread pool: Pillow
+    releases the GIL while encoding, so this is slower but still off the loop.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor: Optional[Executor] = None
+        self.use_processes = True
+
+    def _fall_back_to_threads(self, reason: BaseException):
+        logger.warning(f"Transcoding process pool unavailable, using threads instead: {reason}")
+        self.use_processes = False
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="transcode")
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                    logger.debug(f"Transcoding pool started with {self.max_workers} workers")
+                except (OSError, NotImplementedError, ImportError) as exc:
+                    self._fall_back_to_threads(exc)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="transcode")
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a picklable, module-level function in the pool"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        except (BrokenProcessPool, OSError) as exc:
+            if not self.use_processes or not isinstance(self._executor, ProcessPoolExecutor):
+                raise
+            # Worker processes failed to start (e.g. a frozen build) or died
+            self._fall_back_to_threads(exc)
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    async def to_jpeg(self, filepath: Path, quality: int = JPEG_QUALITY) -> bytes:
+        """Transcode a file to JPEG bytes without blocking the event loop"""
+        return await self.run(transcode_to_jpeg, str(filepath), quality)
+
+    def shutdown(self):
+        """Stop the worker processes (a later call to to_jpeg starts a new pool)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+transcoder = ImageTranscoder()
+
+
+class TranscodePrefetcher:
+    """
+    Transcodes the pages of one chapter ahead of their upload
+
+    Each ``get`` also schedules the next ``depth`` pages that need conversion,
+    so the pool works on upcoming pages while the current ones are uploading.
+    A prefetched result is handed out once and then dropped.
+    """
+
+    def __init__(self, images: List[Path], depth: int = 4, quality: int = JPEG_QUALITY,
+                 transcoder: ImageTranscoder = transcoder):
+        self.images = images
+        self.depth = max(0, depth)
+        self.quality = quality
+        self.transcoder = transcoder
+        self._position = {image: index for index, image in enumerate(images)}
+        self._pending: Dict[Path, asyncio.Future] = {}
+        self._next = 0
+
+    def _schedule(self, image: Path):
+        if image not in self._pending:
+            self._pending[image] = asyncio.ensure_future(self.transcoder.to_jpeg(image, self.quality))
+
+    def _prefetch_after(self, index: int):
+        end = min(len(self.images), index + 1 + self.depth)
+        start = max(self._next, index + 1)
+        for upcoming in self.images[start:end]:
+            self._schedule(upcoming)
+        self._next = max(self._next, end)
+
+    async def get(self, image: Path) -> bytes:
+        """JPEG bytes for ``image``, scheduling the following pages in the background"""
+        self._schedule(image)
+        index = self._position.get(image)
+        if index is not None:
+            self._prefetch_after(index)
+        return await self._pending.pop(image)
+
+    def cancel(self):
+        """Drop prefetched work that was never consumed (e.g. the chapter was aborted)"""
+        for future in self._pending.values():
+            if not future.done():
+                future.cancel()
+            elif not future.cancelled():
+                # Mark failures as retrieved so they are not reported as unhandled
+                future.exception()
+        self._pending.clear()
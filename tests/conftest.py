@@ -1,13 +1,90 @@
 """Pytest bootstrap for local package imports.
 
-Keeps test execution consistent when run from repository root.
+Keeps test execution consistent when run from repository root, and provides
+the in-memory host the upload tests share.
 """
 
 from pathlib import Path
+import asyncio
 import sys
+from typing import Any, Callable, Collection, Dict, List, Optional, Union
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+from core.hosts import BaseHost  # noqa: E402
+from core.models import UploadResult  # noqa: E402
+
+
+class FakeHost(BaseHost):
+    """
+    In-memory host for upload tests
+
+    Args:
+        config: Host options, as for a real host
+        name: Host name (defaults to "Fake"); keys telemetry, ledger entries and upload chains
+        delay: Seconds each upload takes, or a function of the page
+        fail: Pages that fail with ``status_code``: file names, or a predicate checked
+            once the upload's delay has passed
+        failures: Number of first uploads that fail with ``status_code``
+        status_code: HTTP status of the failed uploads
+        album: Whether ``create_album`` returns an album URL
+        domain: Domain of the returned URLs
+
+    ``started`` lists pages as they are sent, ``uploaded`` the ones that succeeded;
+    ``events`` interleaves "start:<chapter>/<page>" with "album:<title>" entries.
+    """
+
+    def __init__(self, config: Dict[str, Any], name: str = "Fake",
+                 delay: Union[float, Callable[[Path], float]] = 0.0,
+                 fail: Union[Collection[str], Callable[[Path], bool]] = (), failures: int = 0,
+                 status_code: int = 503, album: bool = False, domain: str = "example.invalid"):
+        super().__init__(config)
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.failures = failures
+        self.status_code = status_code
+        self.album = album
+        self.domain = domain
+        self.started: List[str] = []
+        self.uploaded: List[str] = []
+        self.events: List[str] = []
+        self.albums: List[List[str]] = []
+        self.active = 0
+        self.peak = 0
+
+    def url_for(self, filepath: Path) -> str:
+        return f"https://{self.domain}/{filepath.name}"
+
+    def _fails(self, filepath: Path) -> bool:
+        if self.failures > 0:
+            self.failures -= 1
+            return True
+        if callable(self.fail):
+            return self.fail(filepath)
+        return filepath.name in self.fail
+
+    async def upload_image(self, filepath: Path) -> UploadResult:
+        self.started.append(filepath.name)
+        self.events.append(f"start:{filepath.parent.name}/{filepath.name}")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            delay = self.delay(filepath) if callable(self.delay) else self.delay
+            await asyncio.sleep(delay)
+            if self._fails(filepath):
+                return UploadResult(url="", filename=filepath.name, success=False,
+                                    error=f"HTTP {self.status_code}", status_code=self.status_code)
+            self.uploaded.append(filepath.name)
+            return UploadResult(url=self.url_for(filepath), filename=filepath.name)
+        finally:
+            self.active -= 1
+
+    async def create_album(self, title: str, description: str, image_ids: List[str]) -> Optional[str]:
+        self.events.append(f"album:{title}")
+        self.albums.append(image_ids)
+        return f"https://{self.domain}/album/{title}" if self.album else None
@@ -1,8 +1,34 @@
 import asyncio
+import json
 from pathlib import Path
+from typing import List
 
-from core.models import Manga
+from core.config import AppConfig
+from core.models import Chapter, Manga
+from core.services import MangaUploaderService
 from core.services.batch_service import BatchJobStatus, BatchService
+from core.services.job_store import JobStore
+from tests.conftest import FakeHost
+
+
+def _upload_service(tmp_path: Path, pages: int = 3):
+    host = FakeHost({"max_workers": 1, "min_workers": 1, "rate_limit": 0}, name="Counting", delay=0.01, album=True)
+    uploader = MangaUploaderService()
+    uploader.register_host("Counting", host)
+    uploader.set_host("Counting")
+    service = BatchService(max_concurrent_jobs=1, max_concurrent_items=1)
+    config = AppConfig(output_folder=tmp_path / "output", upload_pipeline_depth=1)
+    service.set_uploader(uploader, config=lambda: config)
+
+    manga_list = []
+    for title in ("A", "B"):
+        chapter_dir = tmp_path / title / "Cap 1"
+        chapter_dir.mkdir(parents=True)
+        for page in range(pages):
+            (chapter_dir / f"{page}.jpg").write_bytes(b"x")
+        manga = Manga(title=title, path=tmp_path / title)
+        manga_list.append({"manga": manga, "chapters": manga.chapters})
+    return service, host, service.create_upload_job("batch", manga_list)
 
 
 async def test_submit_job_sets_queued_and_blocks_duplicate(tmp_path: Path) -> None:
@@ -156,3 +182,115 @@ async def test_metadata_item_pauses_if_paused_mid_flight(tmp_path: Path) -> None
     await task
 
     assert job.items[0].status == BatchJobStatus.PAUSED
+
+
+async def test_jobs_survive_restart_through_job_store(tmp_path: Path) -> None:
+    store = JobStore(tmp_path / "jobs.db")
+    service = BatchService(max_concurrent_jobs=1, max_concurrent_items=1, store=store)
+
+    chapters = [Chapter(name="Cap 1", path=tmp_path / "M7" / "Cap 1", images=[])]
+    running_id = service.create_upload_job("uploads", [{"manga": Manga(title="M7", path=tmp_path / "M7"),
+                                                        "chapters": chapters}], hosts=["Catbox", "Imgbox"], mirror=True)
+    done_id = service.create_metadata_job("meta", [Manga(title="M8", path=tmp_path / "M8")], {"title": "x"})
+    running = service.get_job(running_id)
+    running.status = BatchJobStatus.RUNNING
+    running.items[0].status = BatchJobStatus.RUNNING
+    service._persist(running)
+    service.cancel_job(done_id)
+    assert service.delete_job(done_id)
+    await store.flush()
+    store.close()
+
+    # A new process reopens the store: the interrupted job comes back paused
+    store = JobStore(tmp_path / "jobs.db")
+    restarted = BatchService(max_concurrent_jobs=1, max_concurrent_items=1, store=store)
+    await restarted.start_service()
+
+    job = restarted.get_job(running_id)
+    assert job is not None and job.status == BatchJobStatus.PAUSED
+    assert job.items[0].status == BatchJobStatus.PAUSED
+    assert job.items[0].chapters_selected == ["Cap 1"]
+    assert job.items[0].hosts == ["Catbox", "Imgbox"] and job.items[0].mirror
+    assert restarted.get_job(done_id) is None
+    await store.flush()
+    assert [entry["job_id"] for entry in restarted.get_job_history()] == [done_id]
+    assert [event["status"] for event in store.get_events(running_id)] == ["pending", "running", "paused"]
+
+    await restarted.stop_service()
+    store.close()
+
+
+async def test_upload_items_upload_pages_and_report_progress(tmp_path: Path) -> None:
+    service, host, job_id = _upload_service(tmp_path)
+    progress: List[float] = []
+    service.set_callbacks(job_progress_callback=lambda _, value: progress.append(value))
+    job = service.get_job(job_id)
+    job.status = BatchJobStatus.QUEUED
+
+    await service._process_job(job_id, "test-worker")
+
+    assert job.status == BatchJobStatus.COMPLETED
+    assert len(host.uploaded) == 6
+    chapter = job.items[0].upload_results["Cap 1"]
+    assert chapter["image_urls"] == [f"https://example.invalid/{page}.jpg" for page in range(3)]
+    assert chapter["album_url"].endswith("/Cap 1")
+    metadata = json.loads(Path(job.items[1].metadata_path).read_text(encoding="utf-8"))
+    assert metadata["title"] == "B"
+    assert next(iter(metadata["chapters"].values()))["groups"]["default"] == chapter["image_urls"]
+    # One update per page, then one per finished item
+    assert len(progress) == 8
+    assert progress == sorted(progress) and progress[-1] == 100.0
+
+
+async def test_upload_items_keep_their_chain_when_the_default_host_changes(tmp_path: Path) -> None:
+    service, host, job_id = _upload_service(tmp_path)
+    other = FakeHost({"rate_limit": 0}, name="Other")
+    service.uploader.register_host("Other", other)
+    # An interactive upload elsewhere switches the uploader's default host
+    service.uploader.set_host("Other")
+    job = service.get_job(job_id)
+    job.status = BatchJobStatus.QUEUED
+
+    await service._process_job(job_id, "test-worker")
+
+    assert job.status == BatchJobStatus.COMPLETED
+    assert [item.hosts for item in job.items] == [["Counting"], ["Counting"]]
+    assert len(host.uploaded) == 6 and other.uploaded == []
+
+
+async def test_upload_items_read_settings_saved_after_the_service_was_set_up(tmp_path: Path) -> None:
+    service, _, job_id = _upload_service(tmp_path)
+    config = service.config()
+    config.output_folder = tmp_path / "saved"
+    job = service.get_job(job_id)
+    job.status = BatchJobStatus.QUEUED
+
+    await service._process_job(job_id, "test-worker")
+
+    assert job.status == BatchJobStatus.COMPLETED
+    assert all(Path(item.metadata_path).parent.parent == tmp_path / "saved" for item in job.items)
+
+
+async def test_pause_between_images_then_resume(tmp_path: Path) -> None:
+    service, host, job_id = _upload_service(tmp_path, pages=6)
+    job = service.get_job(job_id)
+
+    def pause_after_two_pages(_: str, __: float) -> None:
+        if len(host.uploaded) == 2:
+            service.pause_job(job_id)
+
+    service.set_callbacks(job_progress_callback=pause_after_two_pages)
+    job.status = BatchJobStatus.QUEUED
+    await service._process_job(job_id, "test-worker")
+
+    assert job.status == BatchJobStatus.PAUSED
+    assert job.items[0].status == BatchJobStatus.PAUSED
+    assert len(host.uploaded) == 2 and job.items[0].progress < 50
+
+    service.set_callbacks()
+    assert service.resume_job(job_id)
+    job.status = BatchJobStatus.QUEUED
+    await service._process_job(job_id, "test-worker")
+
+    assert job.status == BatchJobStatus.COMPLETED
+    assert all(item.progress == 100.0 for item in job.items)
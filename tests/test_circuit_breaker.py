@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from core.hosts.limiters import CircuitBreaker, CircuitState
+from tests.conftest import FakeHost
+
+
+def test_breaker_opens_probes_and_closes(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("core.hosts.limiters.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("Host", consecutive_failures=3, open_seconds=10)
+
+    breaker.record(False, 0.1, host_fault=False)  # A rejected file says nothing about the host
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record(False, 0.1)
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow_request()
+    assert breaker.health() == 0.0
+
+    # After the cool-down a single probe is let through; its failure doubles the wait
+    now[0] += 10
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record(False, 0.1)
+    assert breaker.get_stats().open_remaining == 20
+
+    now[0] += 20
+    assert breaker.allow_request()
+    breaker.record(True, 0.1)
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.health() == 1.0
+    assert breaker.get_stats().rejected == 2
+
+
+def test_slow_calls_open_the_breaker() -> None:
+    breaker = CircuitBreaker("Host", min_calls=4, slow_call_seconds=30)
+
+    for _ in range(4):
+        breaker.record(True, 45.0)
+
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_slow_threshold_grows_with_page_size() -> None:
+    breaker = CircuitBreaker("Host", min_calls=4, slow_call_seconds=30, slow_call_min_throughput=100_000)
+
+    # 10 MB at 150 KB/s takes ~67s: slow in absolute terms, but not for its size
+    for _ in range(4):
+        breaker.record(True, 67.0, nbytes=10_000_000)
+
+    assert breaker.slow_threshold(10_000_000) == 130.0
+    assert breaker.state is CircuitState.CLOSED
+
+
+async def test_single_host_waits_for_the_probe_instead_of_failing_the_chapter(tmp_path: Path) -> None:
+    pages = []
+    for i in range(10):
+        page = tmp_path / f"{i}.jpg"
+        page.write_bytes(b"x")
+        pages.append(page)
+    host = FakeHost({"max_workers": 1, "min_workers": 1, "rate_limit": 0, "max_retries": 0,
+                     "breaker_open_seconds": 0.1}, failures=5)
+
+    results = await host.upload_images(pages)
+
+    # The fifth failure opened the circuit; the other pages waited for it to close
+    assert [result.success for result in results] == [False] * 5 + [True] * 5
+    assert host.circuit.state is CircuitState.CLOSED
+    assert host.circuit.get_stats().times_opened == 1
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from pathlib import Path
+
+from core.hosts import BaseHost, ImgurHost
+from core.hosts.limiters import CreditScheduler
+from core.hosts.telemetry import TelemetryRegistry
+from core.models import UploadResult
+
+
+async def test_reservations_stop_workers_racing_past_the_budget() -> None:
+    scheduler = CreditScheduler("test")
+    scheduler.update("user", remaining=30, limit=30, reset_at=time.time() + 0.3)
+
+    dispatched = []
+
+    async def worker(i: int) -> None:
+        await scheduler.reserve({"user": 10})
+        dispatched.append((i, time.time()))
+
+    started = time.time()
+    tasks = [asyncio.create_task(worker(i)) for i in range(4)]
+    await asyncio.sleep(0.1)
+
+    # Only three uploads fit in the remaining 30 credits; the fourth waits for the reset.
+    assert len(dispatched) == 3
+    for _ in range(3):
+        scheduler.release({"user": 10})
+    scheduler.update("user", remaining=0)
+
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=2)
+    assert dispatched[-1][1] - started >= 0.25
+    assert scheduler.get_stats()["waits"] == 1
+
+
+async def test_scarce_budget_is_paced_until_reset() -> None:
+    scheduler = CreditScheduler("test", low_watermark=0.5)
+    scheduler.update("post", remaining=4, limit=100, reset_at=time.time() + 0.4)
+
+    started = time.time()
+    for _ in range(3):
+        await scheduler.reserve({"post": 1})
+        scheduler.release({"post": 1})
+        scheduler.pools["post"].remaining -= 1
+
+    # 4 requests left for 0.4s: roughly 0.1s, then 0.13s, between dispatches.
+    assert time.time() - started >= 0.2
+
+
+def test_imgur_headers_feed_the_scheduler() -> None:
+    host = ImgurHost({"client_id": "x", "rate_limit": 0})
+    host._update_rate_limits({
+        "X-RateLimit-UserLimit": "500",
+        "X-RateLimit-UserRemaining": "120",
+        "X-RateLimit-UserReset": str(int(time.time()) + 3600),
+        "X-RateLimit-ClientRemaining": "9000",
+        "X-Post-Rate-Limit-Remaining": "40",
+        "X-Post-Rate-Limit-Reset": "600",
+    })
+
+    pools = host.get_credit_stats()["pools"]
+    assert pools["user"]["remaining"] == 120
+    assert pools["user"]["limit"] == 500
+    assert pools["client"]["remaining"] == 9000
+    assert pools["post"]["reset_at"] > time.time() + 590
+    assert host.user_remaining == 120
+
+
+class InstantImgur(ImgurHost):
+    """Imgur host whose requests answer immediately"""
+
+    async def upload_image(self, filepath: Path) -> UploadResult:
+        return UploadResult(url=f"https://i.imgur.invalid/{filepath.name}", filename=filepath.name)
+
+
+async def test_credit_wait_happens_before_the_slot_and_the_timer(tmp_path: Path) -> None:
+    host = InstantImgur({"client_id": "x", "rate_limit": 0, "max_workers": 1, "min_workers": 1})
+    host.credits.update("user", remaining=0, limit=100, reset_at=time.time() + 0.2)
+    pages = []
+    for i in range(2):
+        page = tmp_path / f"{i}.jpg"
+        page.write_bytes(b"x")
+        pages.append(page)
+
+    BaseHost.telemetry_registry, previous = TelemetryRegistry(), BaseHost.telemetry_registry
+    try:
+        started = time.monotonic()
+        results = await asyncio.gather(*(host.upload_with_limits(page) for page in pages))
+        elapsed = time.monotonic() - started
+        samples = host.telemetry.recent_samples()
+    finally:
+        BaseHost.telemetry_registry = previous
+
+    assert all(result.success for result in results)
+    # Both waiters slept through the same reset instead of queueing behind one lock
+    assert 0.2 <= elapsed < 0.35
+    assert len(samples) == 2 and all(sample.duration < 0.05 for sample in samples)
+    assert host.get_credit_stats()["pools"]["user"]["reserved"] == 0
@@ -0,0 +1,58 @@
+from pathlib import Path
+from typing import Any, Dict, List
+
+from core.hosts import GofileHost
+from core.hosts.gofile import _ServerUnavailable
+
+
+class FakeGofileHost(GofileHost):
+    """Gofile host with the HTTP calls replaced by an in-memory server farm"""
+
+    def __init__(self, config, down=()):
+        super().__init__(config)
+        self.down = set(down)
+        self.server_fetches = 0
+        self.posts: List[tuple] = []
+
+    async def _fetch_servers(self) -> List[str]:
+        self.server_fetches += 1
+        return ["store3", "store7"]
+
+    async def _post_file(self, upload_url: str, filepath: Path, fields: Dict[str, str]) -> Dict[str, Any]:
+        server = upload_url.split("//")[1].split(".")[0]
+        self.posts.append((server, filepath.name, dict(fields)))
+        if server in self.down:
+            raise _ServerUnavailable("HTTP 503: busy", status_code=503)
+        data = {"code": "abc", "downloadPage": "https://gofile.io/d/folder1",
+                "fileId": f"id-{filepath.stem}", "fileName": filepath.name, "parentFolder": "folder-1"}
+        if "folderId" not in fields:
+            data["guestToken"] = "guest-token"
+        return {"status": "ok", "data": data}
+
+
+async def test_chapter_pages_share_one_folder_and_one_request_each(tmp_path: Path) -> None:
+    host = FakeGofileHost({"max_workers": 4, "rate_limit": 0})
+    images = [tmp_path / f"{i}.jpg" for i in range(1, 6)]
+
+    result = await host.upload_chapter("ch1", images)
+
+    assert result.success
+    assert result.album_url == "https://gofile.io/d/folder1"
+    assert result.image_urls[0] == "https://store3.gofile.io/download/id-1/1.jpg"
+    assert host.server_fetches == 1
+    assert len(host.posts) == 5
+    assert host.posts[0][2] == {}
+    assert all(fields == {"token": "guest-token", "folderId": "folder-1"} for _, _, fields in host.posts[1:])
+
+
+async def test_failed_server_fails_over_to_next_cached_one(tmp_path: Path) -> None:
+    host = FakeGofileHost({"max_workers": 1, "rate_limit": 0, "retry_base_delay": 0}, down={"store3"})
+    images = [tmp_path / "1.jpg", tmp_path / "2.jpg"]
+
+    result = await host.upload_chapter("ch1", images)
+
+    # The first page hit the dead server and was retried on the alternative.
+    assert result.success
+    assert result.retries == 1
+    assert [server for server, _, _ in host.posts] == ["store3", "store7", "store7"]
+    assert host.server_fetches == 1
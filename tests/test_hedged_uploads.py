@@ -0,0 +1,68 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import Collection, List
+
+from core.hosts import BaseHost
+from core.hosts.telemetry import TelemetryRegistry
+from tests.conftest import FakeHost
+
+
+def _stalling_host(config, name: str = "Stalling", stalls: Collection[str] = ()) -> FakeHost:
+    """Host whose first request for a stalling page hangs"""
+    stalling = set(stalls)
+
+    def delay(page: Path) -> float:
+        if page.name in stalling:
+            stalling.discard(page.name)
+            return 5
+        return 0.01
+
+    return FakeHost({"rate_limit": 0, "hedge_uploads": True, "hedge_min_samples": 5, **config},
+                    name=name, delay=delay)
+
+
+def _pages(tmp_path: Path, names: List[str]) -> List[Path]:
+    pages = []
+    for name in names:
+        page = tmp_path / name
+        page.write_bytes(b"x")
+        pages.append(page)
+    return pages
+
+
+async def test_stalled_upload_is_hedged_on_the_same_host(tmp_path: Path) -> None:
+    BaseHost.telemetry_registry, previous = TelemetryRegistry(), BaseHost.telemetry_registry
+    try:
+        host = _stalling_host({"max_workers": 2}, stalls={"9.jpg"})
+        pages = _pages(tmp_path, [f"{i}.jpg" for i in range(10)])
+
+        started = time.monotonic()
+        result = await host.upload_chapter("ch", pages)
+        stats = host.telemetry.get_stats()
+    finally:
+        BaseHost.telemetry_registry = previous
+
+    assert result.success
+    assert time.monotonic() - started < 2
+    assert host.started.count("9.jpg") == 2
+    assert (stats.hedges, stats.hedge_wins) == (1, 1)
+
+
+async def test_hedges_go_to_backup_and_respect_the_chapter_cap(tmp_path: Path) -> None:
+    BaseHost.telemetry_registry, previous = TelemetryRegistry(), BaseHost.telemetry_registry
+    try:
+        host = _stalling_host({"max_workers": 3, "hedge_budget": 0.05}, stalls={"8.jpg", "9.jpg"})
+        backup = _stalling_host({}, name="Backup")
+        pages = _pages(tmp_path, [f"{i}.jpg" for i in range(10)])
+
+        task = asyncio.ensure_future(host.upload_images(pages, backup=backup))
+        await asyncio.sleep(1)
+        hedged = [p for p in ("8.jpg", "9.jpg") if p in backup.started]
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    finally:
+        BaseHost.telemetry_registry = previous
+
+    # One hedge allowed per chapter: one stalled page went to the backup, the other still waits
+    assert len(hedged) == 1
@@ -0,0 +1,115 @@
+import json
+from pathlib import Path
+from typing import Collection, List
+
+import pytest
+
+from core.hosts.journal import UploadJournal
+from core.models import Chapter, Manga
+from core.services import MangaUploaderService
+from tests.conftest import FakeHost
+
+
+def _host(name: str, config=None, rejects: Collection[str] = ()) -> FakeHost:
+    """Host that rejects a fixed set of pages with a 503 and creates albums"""
+    return FakeHost({"rate_limit": 0, "max_retries": 0, **(config or {})}, name=name, fail=set(rejects),
+                    album=True, domain=f"{name.lower()}.invalid")
+
+
+def _manga(root: Path, pages: List[str]) -> Manga:
+    chapter = Chapter(name="ch1", path=root / "ch1", images=[root / "ch1" / page for page in pages])
+    return Manga(title="M", path=root, chapters=[chapter])
+
+
+@pytest.mark.parametrize("pipeline_depth", [1, 2])
+async def test_failed_pages_fail_over_down_the_chain(tmp_path: Path, pipeline_depth: int) -> None:
+    primary = _host("Primary", rejects={"2.jpg", "3.jpg"})
+    backup = _host("Backup", rejects={"3.jpg"})
+    last = _host("LastResort")
+    service = MangaUploaderService()
+    for host in (primary, backup, last):
+        service.register_host(host.name, host)
+    assert service.set_hosts(["Primary", "Backup", "LastResort"])
+
+    manga = _manga(tmp_path, ["1.jpg", "2.jpg", "3.jpg"])
+    result = (await service.upload_manga(manga, manga.chapters, pipeline_depth=pipeline_depth))["ch1"]
+
+    assert result.success
+    assert result.image_urls == ["https://primary.invalid/1.jpg", "https://backup.invalid/2.jpg",
+                                 "https://lastresort.invalid/3.jpg"]
+    assert result.failover_uploads == 2
+    # Only the primary's own page joins its album; fallbacks create none
+    assert primary.albums == [["1.jpg"]]
+    assert backup.albums == last.albums == []
+
+
+async def test_mirror_mode_stores_a_mirror_group(tmp_path: Path) -> None:
+    primary = _host("Primary")
+    backup = _host("Backup")
+    service = MangaUploaderService()
+    for host in (primary, backup):
+        service.register_host(host.name, host)
+    service.set_hosts(["Primary", "Backup"], mirror=True)
+
+    manga = _manga(tmp_path, ["1.jpg", "2.jpg"])
+    results = await service.upload_manga(manga, manga.chapters)
+    output = await service.generate_metadata(manga, results, tmp_path / "out" / "M.json",
+                                             custom_metadata={"group": "Scan"})
+
+    assert results["ch1"].album_url == "https://primary.invalid/album/ch1"
+    assert backup.albums == [["1.jpg", "2.jpg"]]
+    groups = json.loads(output.read_text(encoding="utf-8"))["chapters"]["000"]["groups"]
+    assert groups == {
+        "Scan": ["https://primary.invalid/1.jpg", "https://primary.invalid/2.jpg"],
+        "Scan (Backup)": ["https://backup.invalid/1.jpg", "https://backup.invalid/2.jpg"],
+    }
+
+
+async def test_open_circuit_fails_fast_to_the_backup(tmp_path: Path) -> None:
+    pages = [f"{i}.jpg" for i in range(12)]
+    primary = _host("Primary", {"max_workers": 1}, rejects=pages)
+    backup = _host("Backup")
+    service = MangaUploaderService()
+    for host in (primary, backup):
+        service.register_host(host.name, host)
+    service.set_hosts(["Primary", "Backup"])
+    manga = _manga(tmp_path, pages)
+    result = (await service.upload_manga(manga, manga.chapters))["ch1"]
+
+    assert result.success
+    assert result.failover_uploads == len(pages)
+    # The circuit opened after five failures; the remaining pages were not sent
+    assert len(primary.started) == 5
+    assert not primary.is_available
+    assert primary.get_circuit_stats().rejected == len(pages) - 5
+
+
+async def test_failover_pages_are_journaled_for_resume(tmp_path: Path) -> None:
+    manga = _manga(tmp_path, ["1.jpg", "2.jpg", "3.jpg"])
+    (tmp_path / "ch1").mkdir()
+    for page in manga.chapters[0].images:
+        page.write_bytes(page.name.encode())
+
+    primary = _host("Primary", rejects={"2.jpg", "3.jpg"})
+    backup = _host("Backup", rejects={"3.jpg"})
+    service = MangaUploaderService()
+    for host in (primary, backup):
+        service.register_host(host.name, host)
+    service.set_hosts(["Primary", "Backup"])
+    service.set_journal(UploadJournal(tmp_path / "journal.db"))
+    assert not (await service.upload_manga(manga, manga.chapters))["ch1"].success
+
+    # The next run only sends the page no host took; the backup's URL is kept
+    primary.fail.clear()
+    primary.uploaded.clear()
+    primary.albums.clear()
+    result = (await service.upload_manga(manga, manga.chapters))["ch1"]
+    service.journal.close()
+
+    assert result.success
+    assert primary.uploaded == ["3.jpg"]
+    assert result.image_urls == ["https://primary.invalid/1.jpg", "https://backup.invalid/2.jpg",
+                                 "https://primary.invalid/3.jpg"]
+    # The journaled backup page is still credited to the backup and kept out of the primary's album
+    assert result.failover_uploads == 1
+    assert primary.albums == [["1.jpg", "3.jpg"]]
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+
+from core.hosts import BaseHost, CatboxHost, ImgurHost, PixeldrainHost
+from core.hosts.sessions import HttpClientRegistry, SessionPoolOptions, SessionRegistry, http2_available
+
+
+async def test_same_host_and_base_url_reuses_session() -> None:
+    registry = SessionRegistry()
+
+    first = registry.get_session("Pixeldrain", "https://pixeldrain.com/api/file")
+    second = registry.get_session("Pixeldrain", "https://pixeldrain.com/api/file/abc")
+    other_origin = registry.get_session("Pixeldrain", "https://api.pixeldrain.com/x")
+    other_host = registry.get_session("Gofile", "https://pixeldrain.com/api/file")
+
+    assert first is second
+    assert other_origin is not first
+    assert other_host is not first
+    assert registry.session_count == 3
+
+    await registry.close_all()
+    assert first.closed and other_origin.closed and other_host.closed
+    assert registry.session_count == 0
+
+
+async def test_closed_session_is_recreated() -> None:
+    registry = SessionRegistry()
+
+    first = registry.get_session("Lensdump", "https://lensdump.com/api/1/upload")
+    await first.close()
+    second = registry.get_session("Lensdump", "https://lensdump.com/api/1/upload")
+
+    assert second is not first
+    assert not second.closed
+    await registry.close_all()
+
+
+def test_session_of_a_finished_event_loop_is_closed_when_replaced() -> None:
+    registry = SessionRegistry()
+    url = "https://pixeldrain.com/api/file"
+
+    async def get_session():
+        return registry.get_session("Pixeldrain", url)
+
+    old = asyncio.run(get_session())
+
+    async def replace():
+        new = registry.get_session("Pixeldrain", url)
+        await asyncio.sleep(0.01)
+        assert old.closed and not new.closed
+        await registry.close_all()
+        return new
+
+    assert asyncio.run(replace()).closed
+
+
+async def test_session_of_a_loop_running_elsewhere_is_closed_on_that_loop() -> None:
+    registry = SessionRegistry()
+    url = "https://lensdump.com/api/1/upload"
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    thread.start()
+
+    async def get_session():
+        return registry.get_session("Lensdump", url)
+
+    try:
+        old = asyncio.run_coroutine_threadsafe(get_session(), other_loop).result(timeout=5)
+        new = registry.get_session("Lensdump", url)
+        await asyncio.sleep(0.05)
+
+        assert new is not old and old.closed
+        await registry.close_all()
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join(timeout=5)
+        other_loop.close()
+
+
+async def test_hosts_share_process_wide_registry() -> None:
+    host_a = PixeldrainHost({"pool_size": 4})
+    host_b = PixeldrainHost({})
+
+    session = host_a.get_session(host_a.api_url)
+
+    assert host_b.get_session(host_b.api_url) is session
+    assert host_a.session_options.pool_size == 4
+
+    await BaseHost.close_sessions()
+    assert session.closed
+
+
+async def test_httpx_hosts_share_tuned_client_and_close_on_shutdown() -> None:
+    catbox_a = CatboxHost({"pool_size": 6, "http2": True})
+    catbox_b = CatboxHost({"http2": True})
+    imgur = ImgurHost({})
+
+    client = catbox_a.http_client
+
+    assert catbox_b.http_client is client
+    assert imgur.http_client is not client
+    # HTTP/2 only when the optional h2 package can negotiate it; HTTP/1.1 otherwise
+    assert client._transport._pool._http2 is http2_available()
+    assert client._transport._pool._max_connections == 6
+
+    await BaseHost.close_sessions()
+    assert client.is_closed
+    assert catbox_a.http_client is not client
+    await BaseHost.close_sessions()
+
+
+async def test_http2_is_opt_in() -> None:
+    registry = HttpClientRegistry()
+
+    client = registry.get_client("ImgHippo", SessionPoolOptions())
+
+    assert client._transport._pool._http2 is False
+    await registry.close_all()
+    assert registry.client_count == 0
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+from PIL import Image
+
+from core.hosts import ImgboxHost
+
+
+class FakeGallery:
+    """Stand-in for pyimgbox.Gallery that records creation and uploads"""
+
+    instances: List["FakeGallery"] = []
+
+    def __init__(self, title=None):
+        self.title = title
+        self.created = False
+        self.closed = False
+        self.create_calls = 0
+        self.uploads: List[str] = []
+        self.threads = set()
+        FakeGallery.instances.append(self)
+
+    @property
+    def url(self):
+        return f"https://imgbox.invalid/g/{self.title}" if self.created else None
+
+    async def create(self):
+        self.create_calls += 1
+        await asyncio.sleep(0.01)
+        self.created = True
+
+    async def upload(self, filepath):
+        self.threads.add(threading.get_ident())
+        await asyncio.sleep(0.01)
+        self.uploads.append(Path(filepath).name)
+        return SimpleNamespace(success=True, image_url=f"https://imgbox.invalid/i/{Path(filepath).name}")
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def _host() -> ImgboxHost:
+    host = ImgboxHost({"max_workers": 4, "rate_limit": 0})
+    host._pyimgbox = SimpleNamespace(Gallery=FakeGallery)
+    return host
+
+
+async def test_chapter_uses_one_gallery_on_the_running_loop(tmp_path: Path) -> None:
+    FakeGallery.instances.clear()
+    images = [tmp_path / f"{i}.jpg" for i in range(1, 7)]
+
+    result = await _host().upload_chapter("Chapter 1", images)
+
+    assert len(FakeGallery.instances) == 1
+    gallery = FakeGallery.instances[0]
+    assert gallery.create_calls == 1
+    assert sorted(gallery.uploads) == sorted(image.name for image in images)
+    assert gallery.threads == {threading.get_ident()}
+    assert gallery.closed
+    assert result.album_url == "https://imgbox.invalid/g/Chapter 1"
+    assert result.image_urls[-1] == "https://imgbox.invalid/i/6.jpg"
+
+
+async def test_standalone_image_gets_its_own_gallery(tmp_path: Path) -> None:
+    FakeGallery.instances.clear()
+
+    result = await _host().upload_image(tmp_path / "cover.jpg")
+
+    assert result.success
+    assert [g.title for g in FakeGallery.instances] == ["Upload cover"]
+    assert FakeGallery.instances[0].create_calls == 1
+    assert FakeGallery.instances[0].closed
+
+
+async def test_webp_pages_are_prefetched_as_jpeg_bytes(tmp_path: Path, monkeypatch) -> None:
+    FakeGallery.instances.clear()
+    images = []
+    for i in range(1, 6):
+        page = tmp_path / f"{i}.webp"
+        Image.new("RGBA", (8, 8), (255, 0, 0, 128)).save(page, "WEBP")
+        images.append(page)
+
+    received = {}
+
+    async def upload(self, filepath):
+        spooled = Path(filepath)
+        received[spooled] = spooled.read_bytes()
+        return SimpleNamespace(success=True, image_url=f"https://imgbox.invalid/i/{spooled.name}")
+
+    monkeypatch.setattr(FakeGallery, "upload", upload)
+    result = await _host().upload_chapter("Chapter 1", images)
+
+    assert result.success
+    # Converted pages go through the public upload API as temporary JPEGs named after the page
+    assert sorted(path.name for path in received) == [f"{i}.jpg" for i in range(1, 6)]
+    assert all(data.startswith(b"\xff\xd8") for data in received.values())
+    assert not any(path.exists() for path in received)
+    assert not list(tmp_path.glob("*.jpg"))
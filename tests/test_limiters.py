@@ -0,0 +1,105 @@
+import asyncio
+from pathlib import Path
+
+from core.hosts.limiters import AdaptiveConcurrencyLimiter, HostRateLimiter, TokenBucket, is_congestion_signal
+from core.models import UploadResult
+from tests.conftest import FakeHost
+
+
+def test_congestion_classification() -> None:
+    assert is_congestion_signal(UploadResult(url="", filename="a", success=False, status_code=503))
+    assert is_congestion_signal(UploadResult(url="", filename="a", success=False, error="HTTP 429: x"))
+    assert is_congestion_signal(UploadResult(url="", filename="a", success=False, error="Read timed out"))
+    assert not is_congestion_signal(UploadResult(url="", filename="a", success=False, status_code=400))
+    assert not is_congestion_signal(UploadResult(url="u", filename="a"))
+
+
+def test_additive_increase_and_multiplicative_decrease() -> None:
+    limiter = AdaptiveConcurrencyLimiter("test", min_limit=1, max_limit=8, initial_limit=2)
+
+    for _ in range(40):
+        limiter.record(0.1, success=True)
+    assert limiter.limit == 8
+
+    limiter.record(0.1, success=False, congested=True)
+    assert limiter.limit == 4
+    # A second failure within the same round-trip window is ignored.
+    limiter.record(0.1, success=False, congested=True)
+    assert limiter.limit == 4
+
+    stats = limiter.get_stats()
+    assert stats.congestion_events == 2
+    assert stats.decreases == 1
+
+
+def test_slow_responses_do_not_grow_limit() -> None:
+    limiter = AdaptiveConcurrencyLimiter("test", min_limit=1, max_limit=8, initial_limit=2)
+    limiter.record(0.1, success=True)
+    start = limiter.get_stats().limit
+
+    for _ in range(20):
+        limiter.record(1.0, success=True)
+
+    assert limiter.limit == start
+
+
+async def test_acquire_blocks_at_current_limit() -> None:
+    limiter = AdaptiveConcurrencyLimiter("test", min_limit=1, max_limit=1)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    await limiter.release()
+    await asyncio.wait_for(waiter, timeout=1)
+    assert limiter.in_flight == 1
+
+
+async def test_upload_chapter_backs_off_on_throttling(tmp_path: Path) -> None:
+    # Throttles (HTTP 429) while more than two uploads are in flight
+    host = FakeHost({"max_workers": 6, "min_workers": 1, "rate_limit": 0}, delay=0.01, status_code=429)
+    host.fail = lambda page: host.active > 2
+    images = [tmp_path / f"{i}.jpg" for i in range(30)]
+
+    await host.upload_chapter("ch", images)
+
+    stats = host.get_concurrency_stats()
+    assert stats.congestion_events > 0
+    assert stats.decreases > 0
+    assert 1 <= stats.limit <= 6
+
+
+async def test_token_bucket_allows_burst_then_paces() -> None:
+    bucket = TokenBucket(rate=50.0, capacity=5)
+    loop = asyncio.get_running_loop()
+
+    started = loop.time()
+    await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+    assert loop.time() - started < 0.05
+
+    started = loop.time()
+    await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+    assert loop.time() - started >= 0.08
+
+
+async def test_bytes_bucket_lets_oversized_request_through_after_refill() -> None:
+    limiter = HostRateLimiter("test", bytes_per_second=1000.0)
+
+    assert await limiter.acquire(500) == 0.0
+    waited = await limiter.acquire(600)
+
+    assert 0.05 <= waited <= 0.2
+    assert limiter.get_stats().throttled == 1
+
+
+def test_host_rate_budget_resolution() -> None:
+    legacy = FakeHost({"max_workers": 4, "rate_limit": 2.0})
+    explicit = FakeHost({"max_workers": 4, "rate_limit": 2.0, "requests_per_second": 10, "burst": 3})
+    unlimited = FakeHost({"rate_limit": 0})
+
+    assert legacy.rate_limiter.requests_per_second == 2.0
+    assert legacy.rate_limiter.burst == 4
+    assert explicit.rate_limiter.requests_per_second == 10
+    assert explicit.rate_limiter.burst == 3
+    assert not unlimited.rate_limiter.enabled
@@ -0,0 +1,77 @@
+from pathlib import Path
+from typing import Dict
+
+from PIL import Image
+
+from core.models import Chapter, Manga
+from core.services import MangaUploaderService
+from core.services.optimizer import ImageOptimizer, OptimizationOptions
+from tests.conftest import FakeHost
+
+
+class SizeRecordingHost(FakeHost):
+    """Fake host that also records the size of every file it receives"""
+
+    def __init__(self, config):
+        super().__init__(config, name="Sizes")
+        self.received: Dict[str, int] = {}
+
+    def url_for(self, filepath: Path) -> str:
+        self.received[filepath.name] = filepath.stat().st_size
+        return super().url_for(filepath)
+
+
+def _uncompressed_png(path: Path, size=(256, 256)) -> Path:
+    image = Image.new("RGB", size, (250, 250, 250))
+    for x in range(0, size[0], 8):
+        image.putpixel((x, x % size[1]), (0, 0, 0))
+    image.save(path, "PNG", compress_level=0)
+    return path
+
+
+async def test_png_is_recompressed_and_cached(tmp_path: Path) -> None:
+    page = _uncompressed_png(tmp_path / "001.png")
+    optimizer = ImageOptimizer(tmp_path / "cache")
+
+    report = await optimizer.optimize_chapter([page])
+    again = await optimizer.optimize_chapter([page])
+
+    assert report.paths[0].name == "001.png"
+    assert report.paths[0] != page
+    assert report.bytes_saved > 0
+    assert again.cache_hits == 1
+    assert again.paths == report.paths
+    with Image.open(report.paths[0]) as img:
+        assert img.getpixel((8, 8)) == (0, 0, 0)
+
+
+async def test_size_budget_forces_lossy_output(tmp_path: Path) -> None:
+    page = tmp_path / "002.png"
+    Image.effect_noise((512, 512), 80).convert("RGB").save(page, "PNG")
+    optimizer = ImageOptimizer(tmp_path / "cache", OptimizationOptions(quality=90))
+
+    path, cached = await optimizer.optimize(page, max_bytes=60_000)
+
+    assert not cached
+    assert path.suffix == ".jpg"
+    assert path.stat().st_size <= 60_000
+
+
+async def test_service_uploads_optimized_pages_and_reports_savings(tmp_path: Path) -> None:
+    chapter_dir = tmp_path / "manga" / "ch1"
+    chapter_dir.mkdir(parents=True)
+    pages = [_uncompressed_png(chapter_dir / f"{i}.png") for i in range(1, 4)]
+    chapter = Chapter(name="ch1", path=chapter_dir, images=pages)
+    manga = Manga(title="M", path=tmp_path / "manga", chapters=[chapter])
+
+    host = SizeRecordingHost({"max_workers": 3, "rate_limit": 0})
+    service = MangaUploaderService()
+    service.register_host("Sizes", host)
+    service.set_host("Sizes")
+    service.set_optimizer(ImageOptimizer(tmp_path / "cache"))
+
+    results = await service.upload_manga(manga, [chapter])
+
+    assert results["ch1"].bytes_saved == sum(p.stat().st_size for p in pages) - sum(host.received.values())
+    assert results["ch1"].bytes_saved > 0
+    assert results["ch1"].image_urls[0].endswith("/1.png")
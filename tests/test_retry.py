@@ -0,0 +1,83 @@
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.hosts.retry import RetryPolicy, is_retryable
+from core.models import UploadResult
+from tests.conftest import FakeHost
+
+
+class FlakyHost(FakeHost):
+    """Fake host that replays a scripted list of outcomes per page"""
+
+    def __init__(self, config, script: Dict[str, List[UploadResult]]):
+        super().__init__({"circuit_breaker": False, **config}, name="Flaky")
+        self.script = script
+
+    async def upload_image(self, filepath: Path) -> UploadResult:
+        outcomes = self.script.get(filepath.name, [])
+        if not outcomes:
+            return await super().upload_image(filepath)
+        self.started.append(filepath.name)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _failure(status: Optional[int] = None, error: str = "", retry_after: Optional[float] = None) -> UploadResult:
+    return UploadResult(url="", filename="x", success=False, error=error,
+                        status_code=status, retry_after=retry_after)
+
+
+def _pages(tmp_path: Path, count: int) -> List[Path]:
+    pages = []
+    for i in range(count):
+        page = tmp_path / f"{i}.jpg"
+        page.write_bytes(b"x")
+        pages.append(page)
+    return pages
+
+
+def test_outcome_classification() -> None:
+    assert is_retryable(_failure(503))
+    assert is_retryable(_failure(429))
+    assert not is_retryable(_failure(404))
+    assert not is_retryable(_failure(error="File not found"))
+    assert is_retryable(_failure(error="ConnectError: [Errno 111] Connection refused"))
+    assert is_retryable(_failure(error="Server error '502 Bad Gateway' for url 'https://x'"))
+    assert is_retryable(_failure(error=""))
+    assert is_retryable(_failure(error="HTTP 503: upstream unavailable"))
+    assert not is_retryable(_failure(error="HTTP 400: image exceeds 5000 px"))
+    assert not is_retryable(_failure(error="Invalid API key (request id 5021)"))
+    assert RetryPolicy(base_delay=1.0).delay(0, retry_after=5.0) >= 5.0
+
+
+async def test_transient_failures_are_retried_and_permanent_ones_are_not(tmp_path: Path) -> None:
+    pages = _pages(tmp_path, 3)
+    host = FlakyHost({"rate_limit": 0, "retry_base_delay": 0}, {
+        "0.jpg": [_failure(503), ConnectionResetError("reset by peer")],
+        "1.jpg": [_failure(400, "HTTP 400: bad image")],
+        "2.jpg": [_failure(429, "rate limited", retry_after=0.2)],
+    })
+
+    started = time.monotonic()
+    result = await host.upload_chapter("ch", pages)
+
+    assert Counter(host.started) == {"0.jpg": 3, "1.jpg": 1, "2.jpg": 2}
+    assert time.monotonic() - started >= 0.2
+    assert result.failed_uploads == ["x"]
+    assert result.retries == 3
+
+
+async def test_chapter_retry_budget_caps_retries(tmp_path: Path) -> None:
+    pages = _pages(tmp_path, 6)
+    host = FlakyHost({"rate_limit": 0, "retry_base_delay": 0, "max_retries": 5, "retry_budget": 0.5},
+                     {page.name: [_failure(500)] * 10 for page in pages})
+
+    result = await host.upload_chapter("ch", pages)
+
+    assert not result.success
+    assert result.retries == 3
+    assert len(host.started) == 6 + 3
@@ -0,0 +1,52 @@
+import base64
+import json
+import os
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from utils.streaming import Base64FileStream
+
+
+async def _collect(stream: Base64FileStream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+async def test_json_body_matches_in_memory_encoding(tmp_path: Path) -> None:
+    image = tmp_path / "page.png"
+    raw = os.urandom(10_001)
+    image.write_bytes(raw)
+
+    stream = Base64FileStream.json(image, "image", {"type": "base64"}, chunk_size=1000)
+    body = await _collect(stream)
+
+    assert json.loads(body) == {"type": "base64", "image": base64.b64encode(raw).decode()}
+    assert len(body) == stream.content_length
+    # Re-iterable so retries can resend the same body.
+    assert await _collect(stream) == body
+
+
+async def test_data_uri_and_chunk_size_bound(tmp_path: Path) -> None:
+    image = tmp_path / "page.jpg"
+    raw = os.urandom(50_000)
+    image.write_bytes(raw)
+
+    stream = Base64FileStream.json(image, "source", mime_type="image/jpeg", chunk_size=4096)
+    chunks = [chunk async for chunk in stream]
+
+    payload = json.loads(b"".join(chunks))
+    assert payload["source"] == "data:image/jpeg;base64," + base64.b64encode(raw).decode()
+    assert max(len(chunk) for chunk in chunks[1:-1]) <= 4 * (4095 // 3)
+
+
+async def test_form_body_is_urlencoded(tmp_path: Path) -> None:
+    image = tmp_path / "page.webp"
+    raw = bytes(range(256)) * 40
+    image.write_bytes(raw)
+
+    stream = Base64FileStream.form(image, "image", {"key": "k+1", "name": "page"})
+    body = await _collect(stream)
+
+    parsed = parse_qs(body.decode(), strict_parsing=True)
+    assert parsed["key"] == ["k+1"]
+    assert parsed["image"] == [base64.b64encode(raw).decode()]
+    assert stream.content_length is None
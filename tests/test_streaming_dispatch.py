@@ -0,0 +1,75 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import FakeHost
+
+
+def _host(config) -> FakeHost:
+    """Host whose later pages finish first"""
+    return FakeHost(config, delay=lambda page: 0.02 if page.stem == "0" else 0.001)
+
+
+async def test_results_stream_as_they_complete_with_bounded_tasks(tmp_path: Path) -> None:
+    host = _host({"max_workers": 3, "min_workers": 3, "rate_limit": 0})
+    images = [tmp_path / f"{i}.jpg" for i in range(200)]
+    baseline = len(asyncio.all_tasks())
+
+    seen = []
+    max_tasks = 0
+    async for index, outcome in host.iter_upload_images(images):
+        seen.append(index)
+        max_tasks = max(max_tasks, len(asyncio.all_tasks()) - baseline)
+        if len(seen) == 5:
+            # Results are yielded while most pages have not been dispatched yet.
+            assert len(host.started) < 20
+
+    assert sorted(seen) == list(range(200))
+    assert seen[0] != 0
+    assert max_tasks <= 3
+
+
+async def test_upload_chapter_reports_each_image(tmp_path: Path) -> None:
+    host = _host({"max_workers": 2, "rate_limit": 0})
+    images = [tmp_path / f"{i}.jpg" for i in range(10)]
+    progress = []
+
+    result = await host.upload_chapter("ch", images, on_result=lambda image, outcome: progress.append(image.name))
+
+    assert sorted(progress) == sorted(image.name for image in images)
+    assert result.image_urls[-1].endswith("/9.jpg")
+
+
+async def test_abandoning_the_iterator_stops_dispatch(tmp_path: Path) -> None:
+    host = _host({"max_workers": 2, "rate_limit": 0})
+    images = [tmp_path / f"{i}.jpg" for i in range(100)]
+
+    stream = host.iter_upload_images(images)
+    async for _ in stream:
+        break
+    await stream.aclose()
+    started = len(host.started)
+    await asyncio.sleep(0.05)
+
+    assert len(host.started) == started < 10
+
+
+class _DispatcherKilled(BaseException):
+    """Escapes the per-page error handling, like a KeyboardInterrupt inside a worker"""
+
+
+async def test_a_dead_dispatcher_fails_the_stream_instead_of_hanging(tmp_path: Path) -> None:
+    host = _host({"max_workers": 2, "rate_limit": 0})
+    images = [tmp_path / f"{i}.jpg" for i in range(10)]
+    upload = host.upload_image
+
+    async def upload_image(filepath: Path):
+        if filepath.stem == "3":
+            raise _DispatcherKilled()
+        return await upload(filepath)
+
+    host.upload_image = upload_image  # type: ignore[method-assign]
+
+    with pytest.raises(_DispatcherKilled):
+        await asyncio.wait_for(host.upload_images(images), timeout=5)
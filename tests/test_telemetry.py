@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+from core.hosts import BaseHost
+from core.hosts.telemetry import RollingHistogram, TelemetryRegistry
+from core.services.performance_service import PerformanceService
+from tests.conftest import FakeHost
+
+
+def test_histogram_percentiles_and_window() -> None:
+    histogram = RollingHistogram(window=60, slot=10)
+    for value in range(1, 101):
+        histogram.add(value / 100, now=1000.0)
+
+    assert abs(histogram.percentile(50, now=1000.0) - 0.5) / 0.5 < 0.2
+    assert abs(histogram.percentile(95, now=1000.0) - 0.95) / 0.95 < 0.2
+    assert histogram.count(now=1059.0) == 100
+    assert histogram.count(now=1061.0) == 0
+
+
+async def test_uploads_are_recorded_and_exported(tmp_path: Path) -> None:
+    registry = TelemetryRegistry()
+    BaseHost.telemetry_registry, previous = registry, BaseHost.telemetry_registry
+    try:
+        images = []
+        for i in range(8):
+            page = tmp_path / f"{i}.jpg"
+            page.write_bytes(b"x" * 1000)
+            images.append(page)
+
+        # Page 3 always fails with a 503
+        host = FakeHost({"max_workers": 4, "rate_limit": 0, "max_retries": 1, "retry_base_delay": 0},
+                        name="Metered", fail={"3.jpg"})
+        await host.upload_chapter("ch", images)
+    finally:
+        BaseHost.telemetry_registry = previous
+
+    service = PerformanceService(upload_telemetry=registry)
+    stats = service.get_upload_telemetry()["Metered"]
+    assert stats["requests"] == 9
+    assert stats["failures"] == 2
+    assert stats["retries"] == 1
+    assert stats["bytes_sent"] == 7000
+    assert stats["status_codes"] == {"ok": 7, "503": 2}
+    assert stats["latency_p95"] > 0
+    assert service.get_upload_host_ranking()[0]["host"] == "Metered"
+
+    export_path = tmp_path / "telemetry.json"
+    assert service.export_upload_telemetry(export_path)
+    exported = json.loads(export_path.read_text())
+    assert len(exported["hosts"]["Metered"]["samples"]) == 9
@@ -0,0 +1,61 @@
+import asyncio
+from pathlib import Path
+
+from PIL import Image
+
+from utils import transcode
+from utils.transcode import ImageTranscoder, TranscodePrefetcher
+
+
+class CountingTranscoder(ImageTranscoder):
+    """Transcoder that records which files were submitted to the pool"""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = []
+
+    async def to_jpeg(self, filepath: Path, quality: int = 95) -> bytes:
+        self.submitted.append(filepath.name)
+        return await super().to_jpeg(filepath, quality)
+
+
+async def test_prefetcher_converts_ahead_in_order(tmp_path: Path) -> None:
+    images = []
+    for i in range(6):
+        page = tmp_path / f"{i}.webp"
+        Image.new("RGB", (4, 4), (0, i * 40, 0)).save(page, "WEBP")
+        images.append(page)
+
+    transcoder = CountingTranscoder()
+    prefetcher = TranscodePrefetcher(images, depth=2, transcoder=transcoder)
+    try:
+        data = await prefetcher.get(images[0])
+        await asyncio.sleep(0)
+        assert data[:2] == b"\xff\xd8"
+        assert transcoder.submitted == ["0.webp", "1.webp", "2.webp"]
+
+        await prefetcher.get(images[1])
+        # Let the newly scheduled conversion start
+        await asyncio.sleep(0)
+        assert transcoder.submitted == ["0.webp", "1.webp", "2.webp", "3.webp"]
+    finally:
+        prefetcher.cancel()
+        transcoder.shutdown()
+
+
+async def test_falls_back_to_threads_when_processes_cannot_start(tmp_path: Path, monkeypatch) -> None:
+    page = tmp_path / "0.png"
+    Image.new("RGBA", (4, 4)).save(page, "PNG")
+
+    def no_processes(*args, **kwargs):
+        raise OSError("cannot spawn worker processes")
+
+    monkeypatch.setattr(transcode, "ProcessPoolExecutor", no_processes)
+    transcoder = ImageTranscoder(max_workers=1)
+    try:
+        data = await transcoder.to_jpeg(page)
+    finally:
+        transcoder.shutdown()
+
+    assert data[:2] == b"\xff\xd8"
+    assert transcoder.use_processes is False
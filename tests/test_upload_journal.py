@@ -0,0 +1,76 @@
+import asyncio
+from pathlib import Path
+from typing import Collection
+
+from core.hosts import BaseHost
+from core.hosts.journal import UploadJournal
+from core.models import Chapter, Manga, UploadResult
+from core.services import MangaUploaderService
+from tests.conftest import FakeHost
+
+
+def _host(config, stall: Collection[str] = ()) -> FakeHost:
+    """Host that hangs on the pages in ``stall`` until the upload is cancelled"""
+    return FakeHost(config, name="Interruptible", delay=lambda page: 3600 if page.name in stall else 0)
+
+
+def _service(tmp_path: Path, host: BaseHost) -> MangaUploaderService:
+    service = MangaUploaderService()
+    service.register_host("Interruptible", host)
+    service.set_host("Interruptible")
+    service.set_journal(UploadJournal(tmp_path / "journal.db"))
+    return service
+
+
+async def test_resume_uploads_only_missing_pages(tmp_path: Path) -> None:
+    chapter_dir = tmp_path / "ch1"
+    chapter_dir.mkdir()
+    pages = [f"{i}.jpg" for i in range(1, 11)]
+    for page in pages:
+        (chapter_dir / page).write_bytes(page.encode())
+    chapter = Chapter(name="ch1", path=chapter_dir, images=[chapter_dir / page for page in pages])
+    manga = Manga(title="M", path=tmp_path, chapters=[chapter])
+
+    host = _host({"max_workers": 10, "rate_limit": 0}, stall={"9.jpg", "10.jpg"})
+    service = _service(tmp_path, host)
+
+    # The app goes away while two pages are still uploading.
+    task = asyncio.create_task(service.upload_manga(manga, [chapter]))
+    while len(host.uploaded) < 8:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    task.cancel()
+    service.journal.close()
+
+    host = _host({"max_workers": 10, "rate_limit": 0})
+    service = _service(tmp_path, host)
+    assert [c.name for c in service.get_resumable_chapters(manga)] == ["ch1"]
+
+    results = await service.resume_manga(manga)
+
+    assert sorted(host.uploaded) == ["10.jpg", "9.jpg"]
+    assert results["ch1"].success
+    assert results["ch1"].image_urls == [f"https://example.invalid/{page}" for page in pages]
+    assert service.get_resumable_chapters(manga) == []
+
+
+async def test_edited_page_is_uploaded_again(tmp_path: Path) -> None:
+    chapter_dir = tmp_path / "ch1"
+    chapter_dir.mkdir()
+    (chapter_dir / "1.jpg").write_bytes(b"one")
+    (chapter_dir / "2.jpg").write_bytes(b"two")
+    chapter = Chapter(name="ch1", path=chapter_dir, images=[chapter_dir / "1.jpg", chapter_dir / "2.jpg"])
+    manga = Manga(title="M", path=tmp_path, chapters=[chapter])
+
+    host = _host({"max_workers": 2, "rate_limit": 0})
+    service = _service(tmp_path, host)
+    journal = service.journal.chapter(str(manga.path), "ch1", host.name)
+    await journal.begin(chapter.images)
+    await journal.record(chapter.images[0], UploadResult(url="https://example.invalid/old", filename="1.jpg"))
+    await journal.record(chapter.images[1], UploadResult(url="https://example.invalid/2.jpg", filename="2.jpg"))
+    (chapter_dir / "1.jpg").write_bytes(b"one, retouched")
+
+    results = await service.resume_manga(manga)
+
+    assert host.uploaded == ["1.jpg"]
+    assert results["ch1"].image_urls[0] == "https://example.invalid/1.jpg"
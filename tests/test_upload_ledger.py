@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from core.hosts import BaseHost
+from core.hosts.ledger import UploadLedger
+from tests.conftest import FakeHost
+
+
+async def test_repeat_upload_reuses_ledger_urls(tmp_path: Path) -> None:
+    pages = []
+    for i in range(3):
+        page = tmp_path / f"{i}.jpg"
+        page.write_bytes(f"page-{i}".encode())
+        pages.append(page)
+    duplicate = tmp_path / "copy.jpg"
+    duplicate.write_bytes(b"page-0")
+
+    ledger = UploadLedger(tmp_path / "ledger.db")
+    BaseHost.set_ledger(ledger)
+    try:
+        host = FakeHost({"rate_limit": 0})
+        first = await host.upload_chapter("ch", pages)
+        assert len(host.uploaded) == 3
+
+        # Identical bytes under another name, plus a changed page.
+        pages[2].write_bytes(b"page-2-edited")
+        second = await host.upload_chapter("ch", [duplicate, pages[1], pages[2]])
+
+        assert sorted(host.uploaded) == ["0.jpg", "1.jpg", "2.jpg", "2.jpg"]
+        # Natural order puts copy.jpg last; its URL is the one hosted for 0.jpg.
+        assert second.image_urls == [
+            "https://example.invalid/1.jpg",
+            "https://example.invalid/2.jpg",
+            "https://example.invalid/0.jpg",
+        ]
+        assert first.image_urls[0] == "https://example.invalid/0.jpg"
+
+        # Ledger is per host.
+        other = FakeHost({"rate_limit": 0}, name="Other")
+        await other.upload_chapter("ch", [pages[0]])
+        assert other.uploaded == ["0.jpg"]
+
+        assert ledger.get_statistics()["entries"] == 5
+    finally:
+        BaseHost.set_ledger(None)
+        ledger.close()
+
+
+async def test_ledger_persists_across_instances(tmp_path: Path) -> None:
+    page = tmp_path / "1.png"
+    page.write_bytes(b"data")
+
+    ledger = UploadLedger(tmp_path / "ledger.db")
+    await ledger.record(page, "Catbox", "https://files.example.invalid/a.png")
+    ledger.close()
+
+    reopened = UploadLedger(tmp_path / "ledger.db")
+    assert await reopened.lookup(page, "Catbox") == "https://files.example.invalid/a.png"
+    assert await reopened.lookup(page, "Imgur") is None
+    reopened.close()
@@ -1,6 +1,9 @@
 import asyncio
+import threading
+import time
 
-from core.services.queue import UploadQueue
+from core.services.job_store import JobStore, QUEUE_SOURCE
+from core.services.queue import FairShareJobQueue, Job, JobPriority, JobStatus, UploadQueue, current_job
 
 
 async def test_concurrent_start_does_not_duplicate_workers() -> None:
@@ -32,3 +35,213 @@ async def test_add_job_rejected_after_concurrent_stop() -> None:
     assert queue.running is False
     assert add_failed is True or any(job.status.value in {"failed", "completed"} for job in queue.jobs.values())
     assert all(job.status.value != "pending" for job in queue.jobs.values())
+
+
+async def test_waiters_and_subscribers_are_notified_on_completion() -> None:
+    queue = UploadQueue(max_concurrent=1)
+    await queue.start()
+    release = asyncio.Event()
+    events = []
+
+    async def task() -> str:
+        job = current_job.get()
+        job.set_progress(0.5)
+        await release.wait()
+        return "done"
+
+    job_id = await queue.add_job(task)
+    job = queue.get_job(job_id)
+    job.subscribe("progress", lambda j: events.append(("progress", j.progress)))
+    job.subscribe("completed", lambda j: events.append(("completed", j.result)))
+    job.subscribe("failed", lambda j: events.append(("failed", j.error)))
+    waiter = asyncio.create_task(queue.wait_for_job(job_id))
+
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    release.set()
+    finished = await asyncio.wait_for(waiter, timeout=0.05)
+
+    assert finished is job and job.status is JobStatus.COMPLETED
+    assert events == [("progress", 0.5), ("completed", "done")]
+    # Late subscribers to the outcome are called back at once
+    late = []
+    job.subscribe("completed", late.append)
+    assert late == [job]
+
+    await queue.stop()
+
+
+async def test_stop_fails_waiting_jobs_immediately() -> None:
+    queue = UploadQueue(max_concurrent=1)
+    await queue.start()
+    blocker = asyncio.Event()
+
+    running_id = await queue.add_job(blocker.wait)
+    pending_id = await queue.add_job(blocker.wait)
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(queue.wait_for_job(job_id)) for job_id in (running_id, pending_id)]
+    await asyncio.sleep(0)
+
+    await queue.stop()
+    jobs = await asyncio.wait_for(asyncio.gather(*waiters), timeout=0.1)
+
+    assert [job.status for job in jobs] == [JobStatus.FAILED, JobStatus.FAILED]
+    assert jobs[1].error == "Queue stopped before processing"
+
+
+async def test_priorities_and_fair_share_between_groups() -> None:
+    queue = UploadQueue(max_concurrent=1)
+    await queue.start()
+    gate = asyncio.Event()
+    order = []
+
+    async def record(name: str) -> None:
+        order.append(name)
+
+    await queue.add_job(gate.wait)
+    await asyncio.sleep(0)
+    for i in range(4):
+        await queue.schedule_job(record, (f"backlog-{i}",), group="Backlog")
+    await queue.schedule_job(record, ("weekly-0",), group="Weekly")
+    await queue.schedule_job(record, ("weekly-1",), group="Weekly")
+    hot_id = await queue.schedule_job(record, ("hot",), group="Hot", priority=JobPriority.URGENT)
+    late_id = await queue.schedule_job(record, ("late",), group="Backlog", priority=JobPriority.LOW)
+
+    assert queue.bump_priority(late_id, JobPriority.HIGH)
+    assert queue.get_job(late_id).priority is JobPriority.HIGH
+    gate.set()
+    await queue.wait_for_job(late_id)
+    await asyncio.gather(*(queue.wait_for_job(job_id) for job_id in list(queue.jobs)))
+
+    # Urgent first, then the bumped job, then the two mangas alternate instead of FIFO
+    assert order == ["hot", "late", "backlog-0", "weekly-0", "backlog-1", "weekly-1", "backlog-2", "backlog-3"]
+    assert not queue.bump_priority(hot_id)
+
+    await queue.stop()
+
+
+def _job(job_id: str, **fields) -> Job:
+    return Job(id=job_id, task=print, args=(), kwargs={}, **fields)
+
+
+async def test_weights_costs_and_aging() -> None:
+    queue = FairShareJobQueue(aging_seconds=60)
+    queue.set_weight("Backlog", 2)
+    for i in range(4):
+        queue.put_nowait(_job(f"b{i}", group="Backlog"))
+    queue.put_nowait(_job("big", group="Batch", cost=2))
+    queue.put_nowait(_job("w0", group="Weekly"))
+    queue.put_nowait(_job("w1", group="Weekly"))
+    stale = _job("old", priority=JobPriority.LOW)
+    queue.put_nowait(stale)
+    stale.queued_at = time.monotonic() - 61
+
+    order = [queue.get_nowait().id for _ in range(queue.qsize())]
+
+    # Backlog earns two jobs per round, the 2-unit job needs two rounds, and the
+    # stale low-priority job ages into NORMAL and takes its turn there
+    assert order == ["b0", "b1", "w0", "old", "b2", "b3", "big", "w1"]
+    assert queue.empty()
+
+
+async def test_durable_jobs_resume_after_restart(tmp_path) -> None:
+    ran = []
+
+    async def upload(chapter: str, host: str = "Catbox") -> str:
+        ran.append((chapter, host))
+        return f"{chapter}@{host}"
+
+    store = JobStore(tmp_path / "jobs.db")
+    queue = UploadQueue(max_concurrent=1, store=store)
+    queue.register_task("upload", upload)
+    await queue.start()
+    done_id = await queue.schedule_job(upload, ("Cap 1",))
+    await queue.wait_for_job(done_id)
+    gate = asyncio.Event()
+    await queue.add_job(gate.wait)  # Not registered: lives in memory only
+    pending_id = await queue.schedule_job(upload, ("Cap 2",), {"host": "Imgur"}, group="M", priority=JobPriority.HIGH)
+    await queue.stop()
+    store.close()
+
+    store = JobStore(tmp_path / "jobs.db")
+    restarted = UploadQueue(max_concurrent=1, store=store)
+    restarted.register_task("upload", upload)
+    await restarted.start()
+    assert [job.id for job in restarted.take_rehydrated()] == [pending_id]
+    assert restarted.take_rehydrated() == []
+    job = await restarted.wait_for_job(pending_id)
+
+    assert job.status is JobStatus.COMPLETED and job.result == "Cap 2@Imgur"
+    assert job.priority is JobPriority.HIGH and job.group == "M"
+    assert ran == [("Cap 1", "Catbox"), ("Cap 2", "Imgur")]
+    assert await restarted.add_job(upload, "Cap 3") == "job-4"
+    await store.flush()
+    history = restarted.get_history()
+    assert [entry["job_id"] for entry in history][-2:] == [pending_id, done_id]
+    assert history[-1]["result"] == "Cap 1@Catbox"
+
+    await restarted.stop()
+    store.close()
+
+
+async def test_job_store_commits_in_order_off_the_event_loop(tmp_path) -> None:
+    store = JobStore(tmp_path / "jobs.db")
+    threads = []
+    write = store._write_sync
+
+    def recording_write(statements):
+        threads.append(threading.get_ident())
+        return write(statements)
+
+    store._write_sync = recording_write
+    store.save_job("job-1", QUEUE_SOURCE, "upload", "pending")
+    store.update_job("job-1", "running", started_at=1.0)
+    store.update_job("job-1", "completed", completed_at=2.0)
+    await store.flush()
+
+    assert len(threads) == 3 and threading.get_ident() not in threads
+    assert [event["status"] for event in store.get_events("job-1")] == ["pending", "running", "completed"]
+    assert store.get_job("job-1")["status"] == "completed"
+    store.close()
+
+
+class _UnscannableJobs(dict):
+    """Job table that fails the test if retention walks over every job"""
+
+    def _scan(self, *args):
+        raise AssertionError("finished-job retention scanned the whole job table")
+
+    __iter__ = keys = values = items = _scan
+
+
+def test_finished_job_retention_evicts_oldest_completions_without_scanning() -> None:
+    queue = UploadQueue()
+    queue.max_finished_jobs = 3
+    queue.jobs = _UnscannableJobs()
+    pending = _job("pending")
+    jobs = [_job(f"job-{i}") for i in range(6)]
+    for job in (pending, *jobs):
+        queue._track(job)
+
+    # Jobs finish in reverse submission order; completion order decides what is evicted
+    for job in reversed(jobs):
+        job.finish(JobStatus.COMPLETED)
+        queue._prune_finished_jobs()
+        assert len(queue._finished) <= queue.max_finished_jobs
+
+    assert list(queue._finished) == ["job-2", "job-1", "job-0"]
+    assert sorted(dict.keys(queue.jobs)) == ["job-0", "job-1", "job-2", "pending"]
+
+
+async def test_finished_jobs_expire_after_ttl() -> None:
+    queue = UploadQueue(finished_job_ttl=60)
+    old, recent, pending = _job("old"), _job("recent"), _job("pending")
+    for job in (old, recent, pending):
+        queue._track(job)
+    old.finish(JobStatus.COMPLETED)
+    recent.finish(JobStatus.FAILED, error="boom")
+    queue._finished["old"] = time.time() - 61
+
+    queue._prune_finished_jobs()
+
+    assert list(queue.jobs) == ["recent", "pending"]
@@ -0,0 +1,47 @@
+from pathlib import Path
+from typing import List
+
+from core.models import UploadResult
+from tests.conftest import FakeHost
+
+
+def _chapter(root: Path, sizes: List[int]) -> List[Path]:
+    root.mkdir(parents=True, exist_ok=True)
+    pages = []
+    for i, size in enumerate(sizes, start=1):
+        page = root / f"{i}.jpg"
+        page.write_bytes(b"x" * size)
+        pages.append(page)
+    return pages
+
+
+async def test_pages_go_out_in_natural_order_by_default(tmp_path: Path) -> None:
+    pages = _chapter(tmp_path, [10, 500, 20, 500, 3000])
+    host = FakeHost({"rate_limit": 0, "max_workers": 1})
+
+    await host.upload_chapter("ch", pages)
+
+    assert host.started == [f"{i}.jpg" for i in range(1, 6)]
+
+
+async def test_largest_pages_go_first_but_urls_stay_in_natural_order(tmp_path: Path) -> None:
+    pages = _chapter(tmp_path, [10, 500, 20, 500, 3000])
+    host = FakeHost({"rate_limit": 0, "max_workers": 1, "upload_order": "largest_first"})
+
+    result = await host.upload_chapter("ch", pages)
+
+    assert host.started == ["5.jpg", "2.jpg", "4.jpg", "3.jpg", "1.jpg"]
+    assert result.image_urls == [f"https://example.invalid/{i}.jpg" for i in range(1, 6)]
+
+
+async def test_largest_first_puts_a_trailing_spread_and_journaled_pages_ahead(tmp_path: Path) -> None:
+    # 40 ordinary pages and a double-page spread at the end of the chapter
+    pages = _chapter(tmp_path, [100_000] * 40 + [3_000_000])
+    host = FakeHost({"rate_limit": 0, "max_workers": 4, "upload_order": "largest_first"})
+
+    order = await host.dispatch_order(pages, completed={"7.jpg": UploadResult(url="https://example.invalid/7.jpg",
+                                                                             filename="7.jpg", success=True)})
+
+    # Journaled pages finish at once, then the spread starts before any ordinary page
+    assert [index for index, _ in order[:2]] == [6, 40]
+    assert [index for index, _ in order[2:]] == [i for i in range(40) if i != 6]
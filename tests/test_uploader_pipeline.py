@@ -0,0 +1,151 @@
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, List, Tuple
+
+import pytest
+
+from core.models import Chapter, Manga
+from core.services import MangaUploaderService
+from core.services.uploader import UploadChain
+from tests.conftest import FakeHost
+
+
+class SessionHost(FakeHost):
+    """Fake host that counts the chapter sessions open at once"""
+
+    def __init__(self, config):
+        super().__init__(config, name="Session", delay=0.01)
+        self.sessions = 0
+        self.peak_sessions = 0
+
+    @asynccontextmanager
+    async def chapter_session(self, chapter_name: str) -> AsyncIterator[None]:
+        self.sessions += 1
+        self.peak_sessions = max(self.peak_sessions, self.sessions)
+        try:
+            yield
+        finally:
+            self.sessions -= 1
+
+
+def _chapter(root: Path, name: str, pages: List[str]) -> Chapter:
+    return Chapter(name=name, path=root / name, images=[root / name / page for page in pages])
+
+
+async def test_pipelined_upload_overlaps_chapters_and_keeps_order(tmp_path: Path) -> None:
+    # The last page of the first chapter is a straggler
+    host = FakeHost({"max_workers": 4, "min_workers": 4, "rate_limit": 0}, name="Recording",
+                    delay=lambda page: 0.2 if page.name == "slow.jpg" else 0.01, album=True)
+    service = MangaUploaderService()
+    service.register_host("Recording", host)
+    service.set_host("Recording")
+
+    chapters = [
+        _chapter(tmp_path, "ch1", ["1.jpg", "2.jpg", "slow.jpg"]),
+        _chapter(tmp_path, "ch2", ["1.jpg", "2.jpg", "10.jpg"]),
+    ]
+    manga = Manga(title="M", path=tmp_path, chapters=chapters)
+
+    results = await service.upload_manga(manga, chapters, pipeline_depth=2, max_concurrent_images=3)
+
+    assert list(results) == ["ch1", "ch2"]
+    assert results["ch2"].image_urls[-1].endswith("/10.jpg")
+    assert results["ch1"].album_url.endswith("/ch1")
+    # Chapter 2 started while chapter 1's straggler was still uploading.
+    assert host.events.index("start:ch2/1.jpg") < host.events.index("album:ch1")
+    assert host.peak <= 3
+
+
+async def test_pipelined_upload_prepares_only_chapters_holding_a_slot(tmp_path: Path) -> None:
+    host = SessionHost({"max_workers": 4, "rate_limit": 0})
+    service = MangaUploaderService()
+    service.register_host("Session", host)
+    service.set_host("Session")
+    preparing = peak_prepared = 0
+
+    async def prepare_images(chapter: Chapter, chain: UploadChain) -> Tuple[List[Path], int]:
+        nonlocal preparing, peak_prepared
+        preparing += 1
+        peak_prepared = max(peak_prepared, preparing)
+        await asyncio.sleep(0.01)
+        return chapter.images, 0
+
+    async def upload_chapter(*args, **kwargs):
+        nonlocal preparing
+        try:
+            return await upload(*args, **kwargs)
+        finally:
+            preparing -= 1
+
+    upload = service._upload_chapter
+    service._prepare_images = prepare_images  # type: ignore[method-assign]
+    service._upload_chapter = upload_chapter  # type: ignore[method-assign]
+    chapters = [_chapter(tmp_path, f"ch{i}", ["1.jpg", "2.jpg"]) for i in range(6)]
+    manga = Manga(title="M", path=tmp_path, chapters=chapters)
+
+    results = await service.upload_manga(manga, chapters, pipeline_depth=2)
+
+    assert list(results) == [f"ch{i}" for i in range(6)]
+    assert peak_prepared == 2
+    assert host.peak_sessions == 2
+
+
+async def test_sequential_upload_cancels_the_prefetch_on_failure(tmp_path: Path) -> None:
+    service = MangaUploaderService()
+    host = FakeHost({"rate_limit": 0}, name="Recording")
+    service.register_host("Recording", host)
+    service.set_host("Recording")
+    prefetch_cancelled = asyncio.Event()
+
+    async def prepare_images(chapter: Chapter, chain: UploadChain) -> Tuple[List[Path], int]:
+        if chapter.name == "ch1":
+            return chapter.images, 0
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            prefetch_cancelled.set()
+            raise
+        return chapter.images, 0
+
+    async def upload_chapter(*args, **kwargs):
+        raise RuntimeError("host went away")
+
+    service._prepare_images = prepare_images  # type: ignore[method-assign]
+    service._upload_chapter = upload_chapter  # type: ignore[method-assign]
+    chapters = [_chapter(tmp_path, "ch1", ["1.jpg"]), _chapter(tmp_path, "ch2", ["1.jpg"])]
+
+    with pytest.raises(RuntimeError):
+        await service.upload_manga(Manga(title="M", path=tmp_path, chapters=chapters), chapters)
+
+    assert prefetch_cancelled.is_set()
+
+
+async def test_pipelined_upload_cancels_the_other_chapters_on_failure(tmp_path: Path) -> None:
+    service = MangaUploaderService()
+    host = FakeHost({"rate_limit": 0}, name="Recording")
+    service.register_host("Recording", host)
+    service.set_host("Recording")
+    started: List[str] = []
+    cancelled: List[str] = []
+
+    async def upload_chapter(manga: Manga, chapter: Chapter, *args, **kwargs):
+        started.append(chapter.name)
+        if chapter.name == "ch1":
+            await asyncio.sleep(0.01)
+            raise RuntimeError("host went away")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(chapter.name)
+            raise
+
+    service._upload_chapter = upload_chapter  # type: ignore[method-assign]
+    chapters = [_chapter(tmp_path, f"ch{i}", ["1.jpg"]) for i in range(1, 4)]
+
+    with pytest.raises(RuntimeError):
+        await service.upload_manga(Manga(title="M", path=tmp_path, chapters=chapters), chapters, pipeline_depth=2)
+
+    # Every other chapter that got a slot is cancelled (and awaited) before the error surfaces
+    assert started[:2] == ["ch1", "ch2"]
+    assert cancelled == started[1:]